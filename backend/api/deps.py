@@ -2,10 +2,31 @@ from typing import Annotated
 from fastapi import Depends
 from sqlmodel import Session
 
-from db import get_session
+from db import engine, get_session
 
+# Сессия блокирующая: обработчики с SessionDep объявляются через def и выполняются в пуле потоков.
+# Асинхронный код (хранилище изображений) они вызывают через anyio.from_thread.run
 SessionDep = Annotated[Session, Depends(get_session)]
 
+from general.bus import create_bus
 from general.connection_manager import ConnectionManager
 
-manager = ConnectionManager()
+manager = ConnectionManager(bus=create_bus())
+
+from general.metrics import instrument_manager
+
+instrument_manager(manager)
+
+from general.outbox import OutboxDispatcher
+from general.stock_channel import StockChannel
+
+stock_channel = StockChannel()
+dispatcher = OutboxDispatcher(engine, manager, stock=stock_channel)
+
+from general.profiler import RequestProfiler
+
+profiler = RequestProfiler()
+
+from general.loop_monitor import LoopMonitor
+
+loop_monitor = LoopMonitor()
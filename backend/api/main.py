@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from api.routs import brand, category, item, cover, images, user, login, buy, websocket
+from api.routs import brand, category, item, cover, images, user, login, buy, websocket, events, stock, metrics, profiler
 
 api_router = APIRouter()
 api_router.include_router(brand.router)
@@ -12,3 +12,7 @@ api_router.include_router(user.router)
 api_router.include_router(login.router)
 api_router.include_router(buy.router)
 api_router.include_router(websocket.router)
+api_router.include_router(events.router)
+api_router.include_router(stock.router)
+api_router.include_router(metrics.router)
+api_router.include_router(profiler.router)
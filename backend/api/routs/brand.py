@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlmodel import select
+from pydantic import TypeAdapter
 
 from models.brand import Brand, BrandCreate, BrandRead, BrandUpdate
 from api.deps import SessionDep
 from general.permission_checker import PermissionChecker
+from general.listing import read_rows
+from general.serialization import serialize
 from general.auth import Role
 
 router = APIRouter(
@@ -11,6 +13,8 @@ router = APIRouter(
     tags=["Бренды"],
 )
 
+brands_list = TypeAdapter(list[BrandRead])
+
 @router.post("/", response_model=BrandRead)
 def create_brand(
     brand: BrandCreate,
@@ -29,8 +33,8 @@ def read_brands(
     session: SessionDep,
     authorize: bool = Depends(PermissionChecker(roles=[Role.MANAGER, Role.ADMIN]))
 ):
-    brands = session.exec(select(Brand)).all()
-    return brands
+    brands = read_rows(session, Brand, BrandRead)
+    return serialize(brands_list, brands)
 
 
 @router.get("/{brand_id}", response_model=BrandRead)
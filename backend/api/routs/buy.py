@@ -6,7 +6,8 @@ from api.deps import SessionDep
 from general.auth import Role, get_current_active_user
 from general.permission_checker import PermissionChecker
 
-from api.deps import manager
+from api.deps import dispatcher
+from general.outbox import add_purchase_event
 
 router = APIRouter(
     prefix="/buy",
@@ -35,14 +36,12 @@ async def buy_item(
     item_data = item.model_dump(exclude_unset=True)
     item_db.sqlmodel_update(item_data)
     session.add(item_db)
+    # Уведомление менеджерам записывается в журнал в одной транзакции со списанием товара
+    add_purchase_event(session, current_user.username, item_db, quantity)
     session.commit()
     session.refresh(item_db)
 
-    # Отправляем уведомление всем менеджерам
-    await manager.notify_managers_about_buying(
-        current_user.username,
-        item_db.name,
-        quantity,
-    )
+    # Рассылка журнала без ожидания очередного опроса
+    dispatcher.wake()
 
     return item_db
@@ -1,16 +1,20 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlmodel import select
+from pydantic import TypeAdapter
 
 from models.category import Category, CategoryCreate, CategoryRead, CategoryUpdate
 from api.deps import SessionDep
 from general.auth import Role
 from general.permission_checker import PermissionChecker
+from general.listing import read_rows
+from general.serialization import serialize
 
 router = APIRouter(
     prefix="/categories",
     tags=["Категории"],
 )
 
+categories_list = TypeAdapter(list[CategoryRead])
+
 @router.post("/", response_model=CategoryRead)
 def create_category(
     category: CategoryCreate,
@@ -29,8 +33,8 @@ def read_categories(
     session: SessionDep,
     authorize: bool = Depends(PermissionChecker(roles=[Role.MANAGER, Role.ADMIN]))
 ):
-    categories = session.exec(select(Category)).all()
-    return categories
+    categories = read_rows(session, Category, CategoryRead)
+    return serialize(categories_list, categories)
 
 
 @router.get("/{category_id}", response_model=CategoryRead)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, status
+from anyio import from_thread
 
 from models.item import Item, ItemReadImages, CoverUpdate
 from models.cover import Cover
@@ -27,7 +28,7 @@ def create_cover(
     if item.cover_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="У товара уже есть обложка")
 
-    file_name = image_upload(file)
+    file_name = from_thread.run(image_upload, file)
     if not file_name:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Не удалось загрузить изображение")
 
@@ -55,7 +56,7 @@ def delete_cover(
     if not cover:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Обложка товара не найдена")
 
-    if not image_delete(cover.name):
+    if not from_thread.run(image_delete, cover.name):
         raise HTTPException(status_code=500, detail="Не удалось удалить обложку товара")
 
     session.delete(cover)
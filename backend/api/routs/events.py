@@ -0,0 +1,60 @@
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from models.user import UserRead
+from general.auth import Role, get_current_active_user
+from general.connection_manager import parse_topics
+from general.permission_checker import PermissionChecker
+from general.sse import SSEConnection
+
+from api.deps import dispatcher, manager
+
+router = APIRouter(
+    tags=["Уведомления"],
+)
+
+
+# Лента уведомлений менеджеров через Server-Sent Events: те же события и подписки, что и в /ws
+@router.get("/events")
+async def stream_events(
+    last_event_id: int | None = None,
+    topics: str | None = None,
+    last_event_id_header: Annotated[int | None, Header(alias="Last-Event-ID")] = None,
+    current_user: UserRead = Depends(get_current_active_user),
+    authorize: bool = Depends(PermissionChecker(roles=[Role.MANAGER]))
+):
+    try:
+        subscriptions = parse_topics(topics)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    connection = SSEConnection()
+    if not await manager.connect(connection, current_user.username, subscriptions):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Слишком много подключений")
+
+    # Браузер при переподключении передаёт номер последнего события в заголовке
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    async def events():
+        replay = None
+        try:
+            if resume_from is not None:
+                replay = asyncio.create_task(dispatcher.replay(connection, resume_from))
+            yield "retry: 3000\n\n"
+            async for frame in connection.frames():
+                # Клиент SSE не отвечает на ping, живым его делает успешная отправка
+                manager.touch(connection)
+                yield frame
+        finally:
+            if replay:
+                replay.cancel()
+            manager.disconnect(connection)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
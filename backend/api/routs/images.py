@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, File, status
+from typing import Annotated
+from anyio import from_thread
 
+import config
 from models.item import Item, ItemReadImages, Image, ImageCreate
 from api.deps import SessionDep
-from general.image import ImageFile, image_upload, image_delete
+from general.image import ImageFile, image_upload, images_upload, image_delete
 from general.auth import Role
 from general.permission_checker import PermissionChecker
 
@@ -22,7 +25,7 @@ def create_image(
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Товар не найден")
 
-    file_name = image_upload(file)
+    file_name = from_thread.run(image_upload, file)
     if not file_name:
         raise HTTPException(status_code=500, detail="Не удалось загрузить изображение")
 
@@ -36,6 +39,38 @@ def create_image(
     return item
 
 
+@router.post("/batch/{item_id}", response_model=ItemReadImages)
+def create_images(
+    item_id: int,
+    files: Annotated[list[ImageFile], File()],
+    session: SessionDep,
+    authorize: bool = Depends(PermissionChecker(roles=[Role.MANAGER, Role.ADMIN]))
+):
+    item = session.get(Item, item_id)
+    if not item:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Товар не найден")
+
+    if len(files) > config.MAX_FILES_PER_UPLOAD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"За один раз можно загрузить не более {config.MAX_FILES_PER_UPLOAD} изображений"
+        )
+
+    file_names = from_thread.run(images_upload, files)
+    if not file_names:
+        raise HTTPException(status_code=500, detail="Не удалось загрузить изображения")
+
+    # Все записи добавляются одной транзакцией
+    session.add_all(
+        Image.model_validate(ImageCreate(name=file_name, item_id=item_id))
+        for file_name in file_names
+    )
+    session.commit()
+
+    session.refresh(item)
+    return item
+
+
 @router.delete("/{image_id}")
 def delete_image(
     image_id: int,
@@ -46,7 +81,7 @@ def delete_image(
     if not image:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Изображение не найдено")
 
-    if not image_delete(image.name):
+    if not from_thread.run(image_delete, image.name):
         raise HTTPException(status_code=500, detail="Невозможно удалить изображение")
 
     session.delete(image)
@@ -1,12 +1,23 @@
-from fastapi import APIRouter, HTTPException, Query, Depends, status
-from typing import Annotated, List
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated, List, Literal
+import asyncio, tempfile
+from anyio import from_thread
+from pydantic import TypeAdapter
 from sqlmodel import select
 from sqlalchemy import func
 
-from models.item import Item, ItemCreate, ItemRead, ItemReadImages, ItemUpdate, ItemAdd, ItemsPagination
-from api.deps import SessionDep
+from models.item import Item, ItemCreate, ItemRead, ItemReadImages, ItemUpdate, ItemAdd, ItemsPagination, ItemBulkUpdate, ItemBulkResult, ItemRestock, ItemRestockResult
+from api.deps import SessionDep, dispatcher
 from general.auth import Role
 from general.image import image_delete
+from general.item_import import ItemImporter
+from general.item_export import iter_export
+from general.item_bulk import restock, update_by_filter, update_by_ids
+from general.listing import item_dict, item_query
+from general.outbox import add_stock_event
+from general.serialization import serialize
+import config
 from general.permission_checker import PermissionChecker
 
 router = APIRouter(
@@ -14,6 +25,9 @@ router = APIRouter(
     tags=["Товары"],
 )
 
+items_pagination = TypeAdapter(ItemsPagination)
+items_list = TypeAdapter(list[ItemRead])
+
 @router.post("/", response_model=ItemReadImages)
 def create_item(
     item: ItemCreate,
@@ -27,6 +41,38 @@ def create_item(
     return db_item
 
 
+# Массовый импорт товаров из CSV или NDJSON, переданного телом запроса.
+# Поля строки: name, description, price, quantity, brand или brand_id, category или category_id.
+# Ответ - NDJSON: первая строка с итогом, далее ошибки по номерам строк
+@router.post("/import")
+async def import_items(
+    request: Request,
+    session: SessionDep,
+    format: Literal["csv", "ndjson"] | None = None,
+    authorize: bool = Depends(PermissionChecker(roles=[Role.ADMIN]))
+):
+    if format is None:
+        format = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+
+    # Тело читается потоком во временный файл, в памяти остаётся не больше IMPORT_SPOOL_SIZE
+    upload = tempfile.SpooledTemporaryFile(max_size=config.IMPORT_SPOOL_SIZE)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > config.IMPORT_MAX_SIZE:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Файл слишком большой")
+            upload.write(chunk)
+        upload.seek(0)
+
+        # Разбор и вставка синхронные, выполняются вне цикла событий
+        report = await asyncio.to_thread(lambda: ItemImporter(session).run(upload, format))
+    finally:
+        upload.close()
+
+    return StreamingResponse(report.lines(), media_type="application/x-ndjson")
+
+
 @router.get("/", response_model=ItemsPagination)
 def read_items(
     session: SessionDep,
@@ -34,19 +80,38 @@ def read_items(
     limit: Annotated[int, Query(le=100)] = 20,
     search: str = "",
 ):
-    query = select(Item)
-    total_query = select(func.count()).select_from(Item)
-    
+    conditions = []
     if search:
-        search_condition = (Item.name.contains(search)) | (Item.description.contains(search))
-        query = query.where(search_condition)
-        total_query = total_query.where(search_condition)
-    
-    items = session.exec(query.offset(offset * limit).limit(limit)).all()
-    total = session.exec(total_query).one()
+        conditions.append((Item.name.contains(search)) | (Item.description.contains(search)))
+
+    # Строки Core сразу превращаются в словари ответа, объекты ORM не создаются
+    rows = session.exec(item_query(*conditions).offset(offset * limit).limit(limit)).all()
+    total = session.exec(select(func.count()).select_from(Item).where(*conditions)).one()
     pages = (total + limit - 1) // limit
 
-    return {"items": items, "total": total, "pages": pages}
+    return serialize(items_pagination, {"items": [item_dict(row) for row in rows], "total": total, "pages": pages})
+
+
+# Выгрузка всего каталога в NDJSON или CSV, при gzip=true - сжатым файлом.
+# Строки читаются пакетами из курсора и сразу отправляются, память не зависит от размера каталога
+@router.get("/export")
+def export_items(
+    session: SessionDep,
+    format: Literal["csv", "ndjson"] = "ndjson",
+    gzip: bool = False,
+    authorize: bool = Depends(PermissionChecker(roles=[Role.MANAGER, Role.ADMIN]))
+):
+    engine = session.get_bind()
+    # Соединение сессии не удерживается, выгрузка открывает своё
+    session.close()
+
+    filename = f"catalog.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else ("text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson")
+    return StreamingResponse(
+        iter_export(engine, format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{item_id}", response_model=ItemReadImages)
@@ -57,6 +122,47 @@ def read_item(item_id: int, session: SessionDep):
     return item_db
 
 
+# Массовое изменение товаров в одной транзакции:
+# {"items": {id: поля}} или {"filter": {...}, "price": {"operation": ..., "value": ...}, "fields": {...}}
+@router.patch("/bulk", response_model=ItemBulkResult)
+def bulk_update_items(
+    bulk: ItemBulkUpdate,
+    session: SessionDep,
+    authorize: bool = Depends(PermissionChecker(roles=[Role.MANAGER, Role.ADMIN]))
+):
+    if (bulk.items is None) == (bulk.filter is None):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Укажите либо список товаров, либо фильтр")
+
+    not_found = []
+    if bulk.items is not None:
+        if bulk.price is not None or bulk.fields is not None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Выражение цены применяется только с фильтром")
+        updated, not_found = update_by_ids(session, bulk.items)
+    else:
+        updated = update_by_filter(session, bulk.filter, bulk.price, bulk.fields)
+    session.commit()
+    return {"updated": updated, "not_found": not_found}
+
+
+# Поставка на склад: пополнение остатков многих товаров в одной транзакции.
+# Товары, которых нет или у которых будет превышен потолок количества, не меняются и возвращаются в rejected
+@router.patch("/add", response_model=ItemRestockResult)
+def restock_items(
+    delivery: list[ItemRestock],
+    session: SessionDep,
+    authorize: bool = Depends(PermissionChecker(roles=[Role.MANAGER, Role.ADMIN]))
+):
+    if len(delivery) > config.RESTOCK_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Не больше {config.RESTOCK_MAX_ITEMS} строк в одной поставке")
+    updated, rejected = restock(session, delivery)
+    if updated:
+        rejected_ids = {row["item_id"] for row in rejected}
+        add_stock_event(session, {row.item_id for row in delivery} - rejected_ids)
+    session.commit()
+    dispatcher.wake()
+    return {"updated": updated, "rejected": rejected}
+
+
 @router.patch("/{item_id}", response_model=ItemReadImages)
 def update_item(
     item_id: int,
@@ -93,7 +199,9 @@ def update_quantity(
     item_data = item.model_dump(exclude_unset=True)
     item_db.sqlmodel_update(item_data)
     session.add(item_db)
+    add_stock_event(session, [item_id])
     session.commit()
+    dispatcher.wake()
     session.refresh(item_db)
     return item_db
 
@@ -112,11 +220,11 @@ def delete_item(
     images = item.images
 
     if cover:
-        image_delete(cover.name)
+        from_thread.run(image_delete, cover.name)
         session.delete(cover)
 
     for img in images:
-        image_delete(img.name)
+        from_thread.run(image_delete, img.name)
         session.delete(img)
 
     session.delete(item)
@@ -131,14 +239,16 @@ def get_similar_items(
     session: SessionDep,
     limit: int = 5,
 ):
-    item = session.get(Item, item_id)
+    item = session.exec(select(Item.id, Item.category_id, Item.price).where(Item.id == item_id)).first()
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Товар не найден")
 
-    all_items = session.exec(select(Item)).all()
-    similar_items = find_similar_items(all_items, item, limit)
+    # Кандидаты отбираются по индексу категории, а не загрузкой всего каталога.
+    # У строк Core есть id, category_id и price - этого достаточно для find_similar_items
+    candidates = session.exec(item_query(Item.category_id == item.category_id, Item.id != item.id)).all()
+    similar_items = find_similar_items(candidates, item, limit)
 
-    return similar_items
+    return serialize(items_list, [item_dict(row) for row in similar_items])
 
 
 def find_similar_items(all_items: List[Item], target_item: Item, limit: int = 5) -> List[Item]:
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from general.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter(
+    tags=["Мониторинг"],
+)
+
+
+# Метрики для Prometheus. Доступ к эндпоинту ограничивается на уровне сети, как и у /docs
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
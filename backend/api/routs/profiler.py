@@ -0,0 +1,62 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import FileResponse
+
+from models.profiler import ProfilerStatus, ProfilerTarget
+from general.auth import Role
+from general.permission_checker import PermissionChecker
+
+from api.deps import profiler
+
+router = APIRouter(
+    prefix="/admin/profiler",
+    tags=["Мониторинг"],
+)
+
+
+def profiler_status() -> ProfilerStatus:
+    target = profiler.target
+    if target is not None:
+        target = ProfilerTarget(route=target.route.path, method=target.method, requests=target.remaining, interval=target.interval)
+    return ProfilerStatus(target=target, profiles=profiler.profiles())
+
+
+# Включение профилировщика для следующих requests запросов к маршруту
+@router.post("/", response_model=ProfilerStatus)
+def arm_profiler(
+    target: ProfilerTarget,
+    request: Request,
+    authorize: bool = Depends(PermissionChecker(roles=[Role.ADMIN]))
+):
+    method = target.method.upper()
+    for route in request.app.routes:
+        if getattr(route, "path", None) == target.route and method in (getattr(route, "methods", None) or ()):
+            profiler.arm(route, method, target.requests, target.interval)
+            return profiler_status()
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Маршрут не найден")
+
+
+@router.get("/", response_model=ProfilerStatus)
+def read_profiler(
+    authorize: bool = Depends(PermissionChecker(roles=[Role.ADMIN]))
+):
+    return profiler_status()
+
+
+@router.delete("/", response_model=ProfilerStatus)
+def disarm_profiler(
+    authorize: bool = Depends(PermissionChecker(roles=[Role.ADMIN]))
+):
+    profiler.disarm()
+    return profiler_status()
+
+
+# Файл профиля открывается в https://www.speedscope.app
+@router.get("/{name}")
+def read_profile(
+    name: str,
+    authorize: bool = Depends(PermissionChecker(roles=[Role.ADMIN]))
+):
+    path = profiler.path(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Профиль не найден")
+    return FileResponse(path, media_type="application/json", filename=name)
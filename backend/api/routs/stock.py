@@ -0,0 +1,46 @@
+import asyncio, json
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from models.item import Item
+from api.deps import SessionDep, stock_channel
+
+router = APIRouter(
+    prefix="/items",
+    tags=["Наличие товара"],
+)
+
+
+def stock_message(item_id: int, quantity: int) -> str:
+    return f"event: stock\ndata: {json.dumps({'item_id': item_id, 'quantity': quantity})}\n\n"
+
+
+# Публичный поток остатка товара (Server-Sent Events) для страницы товара
+@router.get("/{item_id}/stock")
+async def stream_stock(item_id: int, session: SessionDep):
+    def read_quantity() -> int | None:
+        item_db = session.get(Item, item_id)
+        # Соединение с базой не удерживается на время потока
+        session.close()
+        return item_db.quantity if item_db else None
+
+    # Зритель регистрируется до чтения остатка, остаток читается в пуле потоков
+    stream = stock_channel.subscribe(item_id, lambda: asyncio.to_thread(read_quantity))
+    quantity = await anext(stream, None)
+    if quantity is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Товар не найден")
+
+    async def events():
+        try:
+            yield stock_message(item_id, quantity)
+            async for value in stream:
+                yield ": keep-alive\n\n" if value is None else stock_message(item_id, value)
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
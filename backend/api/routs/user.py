@@ -1,17 +1,21 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlmodel import select
+from pydantic import TypeAdapter
 
 from models.user import User, UserCreate, UserRead, UserUpdate
 from api.deps import SessionDep
 from general.password import get_password_hash
 from general.auth import Role, get_current_active_user
 from general.permission_checker import PermissionChecker
+from general.listing import read_rows
+from general.serialization import serialize
 
 router = APIRouter(
     prefix="/users",
     tags=["Пользователи"],
 )
 
+users_list = TypeAdapter(list[UserRead])
+
 @router.post("/", response_model=UserRead)
 def create_user(
     user: UserCreate,
@@ -31,8 +35,8 @@ def read_users(
     session: SessionDep,
     authorize: bool = Depends(PermissionChecker(roles=[Role.ADMIN]))
 ):
-    users = session.exec(select(User)).all()
-    return users
+    users = read_rows(session, User, UserRead)
+    return serialize(users_list, users)
 
 
 @router.get("/{user_id}", response_model=UserRead)
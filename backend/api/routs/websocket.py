@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
 
-from general.auth import Role
+from models.user import UserRead
+from general.auth import Role, get_current_active_user
 from general.permission_checker import PermissionChecker
+from general.connection_manager import parse_topics
 
-from api.deps import manager
+from api.deps import dispatcher, manager
 
 router = APIRouter(
     tags=["Уведомления"],
@@ -12,11 +14,28 @@ router = APIRouter(
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
+    last_event_id: int | None = None,
+    topics: str | None = None,
+    current_user: UserRead = Depends(get_current_active_user),
     authorize: bool = Depends(PermissionChecker(roles=[Role.MANAGER]))
 ):
-    await manager.connect(websocket)
+    # Подписки вида "category:1,brand:2,item:5,low_stock"; без них приходят все события
     try:
+        subscriptions = parse_topics(topics)
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not await manager.connect(websocket, current_user.username, subscriptions):
+        return
+    try:
+        # Клиент, переподключившийся после обрыва, получает пропущенные события
+        if last_event_id is not None:
+            await dispatcher.replay(websocket, last_event_id)
         while True:
-            await websocket.receive_text()
+            message = await websocket.receive_text()
+            manager.touch(websocket)
+            manager.handle_message(websocket, message)
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
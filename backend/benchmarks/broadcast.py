@@ -0,0 +1,121 @@
+"""Рассылка уведомлений по WebSocket: последовательная отправка и очереди подключений.
+
+    python -m benchmarks.run --suite broadcast --sockets 5000 --messages 10
+
+Запускается из каталога backend через benchmarks.run, результаты сравниваются с базовыми прогонами
+benchmarks/baselines/broadcast-<sockets>.json. Клиенты имитируются: случайная задержка сети,
+небольшая доля «зависших» и отключившихся. Для каждого способа рассылки в формате сценариев API
+записываются задержки одного вызова рассылки (p50, p95, p99) и число сообщений в секунду
+до доставки всем живым клиентам.
+"""
+from datetime import datetime, timezone
+import asyncio, json, platform, random, time
+
+from fastapi import WebSocketDisconnect
+
+from benchmarks.load import summarize
+
+# Доли зависших и отключившихся клиентов, максимальная задержка сети и таймаут отправки (с)
+STUCK_SHARE = 0.001
+DEAD_SHARE = 0.01
+LATENCY = 0.002
+SEND_TIMEOUT = 0.5
+QUEUE_SIZE = 100
+
+
+class FakeWebSocket:
+    """Имитация клиента: обычная задержка сети, «зависший» или отключившийся клиент"""
+
+    def __init__(self, latency: float, stuck: bool = False, dead: bool = False):
+        self.latency = latency
+        self.stuck = stuck
+        self.dead = dead
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+    async def send_text(self, message: str):
+        if self.dead:
+            raise WebSocketDisconnect()
+        await asyncio.sleep(3600 if self.stuck else self.latency)
+        self.received += 1
+
+
+def make_sockets(count: int, seed: int = 42) -> list[FakeWebSocket]:
+    rng = random.Random(seed)
+    sockets = []
+    for _ in range(count):
+        roll = rng.random()
+        sockets.append(FakeWebSocket(
+            latency=rng.uniform(0, LATENCY),
+            stuck=roll < STUCK_SHARE,
+            dead=STUCK_SHARE <= roll < STUCK_SHARE + DEAD_SHARE,
+        ))
+    return sockets
+
+
+# Прежняя реализация: последовательная отправка каждому клиенту
+async def sequential_broadcast(connections: list, message: str):
+    for connection in list(connections):
+        try:
+            await asyncio.wait_for(connection.send_text(message), SEND_TIMEOUT)
+        except (WebSocketDisconnect, asyncio.TimeoutError):
+            connections.remove(connection)
+
+
+async def wait_delivered(sockets: list[FakeWebSocket], messages: int):
+    healthy = [socket for socket in sockets if not socket.stuck and not socket.dead]
+    while any(socket.received < messages for socket in healthy):
+        await asyncio.sleep(0.001)
+
+
+async def run_sequential(sockets: int, messages: int) -> dict:
+    connections = make_sockets(sockets)
+    latencies = []
+    start = time.perf_counter()
+    for number in range(messages):
+        sent = time.perf_counter()
+        await sequential_broadcast(connections, f"сообщение {number}")
+        latencies.append(time.perf_counter() - sent)
+    return summarize(latencies, 0, time.perf_counter() - start)
+
+
+async def run_queued(sockets: int, messages: int) -> dict:
+    from general.connection_manager import ConnectionManager
+    clients = make_sockets(sockets)
+    manager = ConnectionManager(queue_size=QUEUE_SIZE, send_timeout=SEND_TIMEOUT, max_connections=sockets)
+    for client in clients:
+        await manager.connect(client)
+
+    latencies = []
+    start = time.perf_counter()
+    for number in range(messages):
+        sent = time.perf_counter()
+        await manager.broadcast(f"сообщение {number}")
+        latencies.append(time.perf_counter() - sent)
+    await wait_delivered(clients, messages)
+    result = summarize(latencies, 0, time.perf_counter() - start)
+
+    result["dropped"] = manager.dropped_messages
+    for client in list(manager.senders):
+        manager.disconnect(client)
+    return result
+
+
+async def benchmark(sockets: int, messages: int, commit: str | None = None) -> dict:
+    results = {}
+    for name, run in (("sequential", run_sequential), ("queued", run_queued)):
+        results[name] = await run(sockets, messages)
+        print(f"broadcast {sockets:>8} {name:10} {json.dumps(results[name])}", flush=True)
+    return {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sockets": sockets,
+        "messages": messages,
+        "scenarios": results,
+    }
@@ -0,0 +1,43 @@
+from pathlib import Path
+import shutil
+
+from sqlalchemy import create_engine, update
+
+from models.item import Item
+from general import seeder
+
+# Заполненные базы кэшируются и копируются перед каждым прогоном: покупки меняют остатки
+DATA_DIR = Path(__file__).parent / "data"
+
+USERS = 64
+PASSWORD = seeder.USER_PASSWORD
+# Поисковые запросы: частое слово и слово, которого нет в каталоге
+SEARCH_TERMS = ["Чехол", "отсутствует"]
+username = seeder.username
+
+
+def dataset_path(size: int) -> Path:
+    return DATA_DIR / f"catalog-{size}.db"
+
+
+def seed(path: Path, size: int, seed: int = 0):
+    """Каталог из size товаров и USERS пользователей. При одинаковом seed содержимое совпадает"""
+    engine = create_engine(f"sqlite:///{path}")
+    seeder.seed(engine, size, users=USERS, seed=seed)
+    # Остатка хватает на любое число покупок за прогон
+    with engine.begin() as connection:
+        connection.execute(update(Item.__table__).values(quantity=10 ** 7))
+    engine.dispose()
+
+
+def prepare(size: int, destination: Path) -> Path:
+    """Копия кэшированного каталога размера size. Каталог создаётся при первом обращении"""
+    template = dataset_path(size)
+    if not template.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        partial = template.with_suffix(".tmp")
+        partial.unlink(missing_ok=True)
+        seed(partial, size)
+        partial.rename(template)
+    shutil.copyfile(template, destination)
+    return destination
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import Callable
+import asyncio, random, time
+
+import httpx
+
+from benchmarks import dataset
+
+
+# Сценарий нагрузки: функция строит запрос (метод, путь, параметры httpx) по генератору
+# случайных чисел и номеру товара. auth - запросы от имени вошедшего пользователя
+@dataclass
+class Scenario:
+    name: str
+    request: Callable[[random.Random, int], tuple[str, str, dict]]
+    auth: bool = False
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in [
+        Scenario("items", lambda rng, size: ("GET", "/items/", {"params": {"offset": rng.randrange(size // 20 or 1), "limit": 20}})),
+        Scenario("search", lambda rng, size: ("GET", "/items/", {"params": {"search": rng.choice(dataset.SEARCH_TERMS), "limit": 20}})),
+        Scenario("item", lambda rng, size: ("GET", f"/items/{rng.randint(1, size)}", {})),
+        Scenario("similar", lambda rng, size: ("GET", f"/items/similar/{rng.randint(1, size)}", {})),
+        Scenario("buy", lambda rng, size: ("PATCH", f"/buy/{rng.randint(1, size)}", {"json": {"quantity": 1}}), auth=True),
+        Scenario("login", lambda rng, size: ("POST", "/login/", {
+            "data": {"username": dataset.username(rng.randrange(dataset.USERS)), "password": dataset.PASSWORD},
+        })),
+    ]
+}
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Перцентиль отсортированного списка (ближайший ранг)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Итог сценария: пропускная способность (запросов/с) и задержки в миллисекундах"""
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Ухудшения относительно базового прогона больше max_regression (доля): рост p95 или падение пропускной способности"""
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95"] and result["p95"] > base["p95"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {base['p95']} -> {result['p95']} мс")
+        if base["throughput"] and result["throughput"] < base["throughput"] * (1 - max_regression):
+            regressions.append(f"{name}: {base['throughput']} -> {result['throughput']} запросов/с")
+    return regressions
+
+
+async def login(client: httpx.AsyncClient, number: int) -> dict[str, str]:
+    """Заголовок Cookie пользователя. Cookie выдаются с флагом secure, поэтому передаются вручную"""
+    response = await client.post("/login/", data={"username": dataset.username(number), "password": dataset.PASSWORD})
+    response.raise_for_status()
+    return {"Cookie": "; ".join(f"{name}={value}" for name, value in response.cookies.items())}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    size: int,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    seed: int = 0,
+) -> dict:
+    """requests запросов сценария из concurrency параллельных клиентов"""
+    headers = [{}] * concurrency
+    if scenario.auth:
+        headers = [await login(client, number % dataset.USERS) for number in range(concurrency)]
+
+    async def worker(number: int, count: int, latencies: list[float] | None) -> int:
+        rng = random.Random(seed * 1000 + number)
+        errors = 0
+        for _ in range(count):
+            method, url, kwargs = scenario.request(rng, size)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers[number], **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if failed:
+                errors += 1
+            elif latencies is not None:
+                latencies.append(time.perf_counter() - start)
+        return errors
+
+    # Запросы делятся между клиентами поровну
+    def shares(total: int) -> list[int]:
+        return [total // concurrency + (number < total % concurrency) for number in range(concurrency)]
+
+    await asyncio.gather(*(worker(number, count, None) for number, count in enumerate(shares(warmup))))
+    latencies: list[float] = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(worker(number, count, latencies) for number, count in enumerate(shares(requests))))
+    return summarize(latencies, sum(errors), time.perf_counter() - start)
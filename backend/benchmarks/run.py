@@ -0,0 +1,154 @@
+"""Нагрузочный тест API на каталогах разного размера.
+
+    python -m benchmarks.run --size 10000 100000 --transport asgi uvicorn --concurrency 32
+    python -m benchmarks.run --suite broadcast --sockets 1000 5000
+
+Запускается из каталога backend. Результаты сравниваются с базовыми прогонами
+benchmarks/baselines/<transport>-<size>.json (API) и broadcast-<sockets>.json (рассылка
+по WebSocket, benchmarks.broadcast), --save записывает текущий прогон как базовый.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse, asyncio, json, platform, socket, subprocess, sys, tempfile, time
+
+import httpx
+
+from benchmarks import broadcast, dataset
+from benchmarks.load import SCENARIOS, compare, run_scenario
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+SUITES = ("api", "broadcast")
+TRANSPORTS = ("asgi", "uvicorn")
+SERVER_START_TIMEOUT = 30
+
+
+def baseline_path(transport: str, size: int) -> Path:
+    return BASELINE_DIR / f"{transport}-{size}.json"
+
+
+def check_baseline(path: Path, report: dict, load: tuple[str, ...], args) -> list[str]:
+    """Сохранение прогона как базового (--save) или ухудшения относительно базового прогона.
+    load - параметры нагрузки, которые должны совпадать для сравнения"""
+    if args.save:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+        return []
+    if not path.exists():
+        return []
+    baseline = json.loads(path.read_text())
+    # Прогоны с разной нагрузкой не сравниваются
+    if any(baseline[key] != report[key] for key in load):
+        print(f"{path.name}: базовый прогон с другими --{'/--'.join(load)}, сравнение пропущено")
+        return []
+    return [f"{path.stem} {line}" for line in compare(report["scenarios"], baseline["scenarios"], args.max_regression)]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Приложение в том же процессе: запросы идут через ASGITransport без сети, lifespan запускается вручную
+@asynccontextmanager
+async def asgi_client(database: Path, concurrency: int):
+    from benchmarks.server import load_app
+    app = load_app(str(database))
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            yield client
+
+
+# Настоящий uvicorn в отдельном процессе
+@asynccontextmanager
+async def uvicorn_client(database: Path, concurrency: int):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.server", "--database", str(database), "--port", str(port)])
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + SERVER_START_TIMEOUT
+            while True:
+                try:
+                    (await client.get("/items/", params={"limit": 1})).raise_for_status()
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("Сервер uvicorn не запустился")
+                    await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+
+CLIENTS = {"asgi": asgi_client, "uvicorn": uvicorn_client}
+
+
+async def benchmark(transport: str, size: int, args) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        database = dataset.prepare(size, Path(directory) / "store.db")
+        results = {}
+        async with CLIENTS[transport](database, args.concurrency) as client:
+            for name in args.scenarios:
+                results[name] = await run_scenario(
+                    client, SCENARIOS[name], size, args.requests, args.concurrency, warmup=args.warmup,
+                )
+                print(f"{transport:8} {size:>8} {name:8} {json.dumps(results[name])}", flush=True)
+    return {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "transport": transport,
+        "size": size,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": results,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API и рассылки уведомлений")
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=["api"], help="что измерять: API и/или рассылку по WebSocket")
+    parser.add_argument("--size", type=int, nargs="+", default=[10000], help="размеры каталога, например 10000 100000 1000000")
+    parser.add_argument("--transport", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS))
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16, help="число параллельных клиентов")
+    parser.add_argument("--requests", type=int, default=300, help="запросов на сценарий")
+    parser.add_argument("--warmup", type=int, default=50, help="запросов прогрева на сценарий (не учитываются)")
+    parser.add_argument("--sockets", type=int, nargs="+", default=[5000], help="клиентов WebSocket в рассылке")
+    parser.add_argument("--messages", type=int, default=10, help="сообщений в рассылке")
+    parser.add_argument("--save", action="store_true", help="сохранить прогон как базовый")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="допустимое ухудшение относительно базового прогона (доля)")
+    args = parser.parse_args(argv)
+
+    if "api" in args.suite and "asgi" in args.transport and len(args.size) > 1:
+        # Адрес базы подставляется при импорте приложения, в одном процессе - только один каталог
+        parser.error("asgi поддерживает один размер каталога за запуск")
+
+    regressions = []
+    if "api" in args.suite:
+        for size in args.size:
+            for transport in args.transport:
+                report = asyncio.run(benchmark(transport, size, args))
+                regressions += check_baseline(baseline_path(transport, size), report, ("concurrency", "requests"), args)
+    if "broadcast" in args.suite:
+        for sockets in args.sockets:
+            report = asyncio.run(broadcast.benchmark(sockets, args.messages, git_commit()))
+            regressions += check_baseline(BASELINE_DIR / f"broadcast-{sockets}.json", report, ("messages",), args)
+
+    if regressions:
+        print("Ухудшения относительно базового прогона:", *regressions, sep="\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Доля сериализации в задержке страницы каталога из 100 товаров до и после быстрого пути.
+
+    python -m benchmarks.serialization --size 10000 --requests 300
+
+Запускается из каталога backend. Для каждого режима (config.FAST_SERIALIZATION выключен и включён)
+измеряется задержка GET /items/?limit=100 через ASGITransport и отдельно время сериализации
+той же страницы: стандартный путь FastAPI (serialize_response и JSONResponse) или TypeAdapter.dump_json.
+"""
+from pathlib import Path
+import argparse, asyncio, json, random, tempfile, time
+
+from fastapi.routing import serialize_response
+from sqlmodel import Session
+from starlette.responses import JSONResponse
+
+from benchmarks import dataset
+from benchmarks.load import percentile
+
+# Режим -> значение config.FAST_SERIALIZATION
+MODES = {"standard": False, "fast": True}
+
+
+def load_page(engine, size: int, limit: int, page: int) -> dict:
+    """Страница каталога в том виде, в каком её сериализует read_items"""
+    from general.listing import item_dict, item_query
+    with Session(engine) as session:
+        rows = session.exec(item_query().offset(page * limit).limit(limit)).all()
+    return {"items": [item_dict(row) for row in rows], "total": size, "pages": (size + limit - 1) // limit}
+
+
+async def serialization_time(field, content: dict, fast: bool, rounds: int) -> float:
+    """Медиана времени сериализации страницы (с)"""
+    from api.routs.item import items_pagination
+    from general.serialization import dump_json
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        if fast:
+            dump_json(items_pagination, content)
+        else:
+            JSONResponse(await serialize_response(field=field, response_content=content)).body
+        times.append(time.perf_counter() - start)
+    return percentile(sorted(times), 0.50)
+
+
+async def request_latencies(client, pages: int, limit: int, requests: int, warmup: int, seed: int = 0) -> dict[str, float]:
+    """Медианы задержки последовательных запросов страниц (с) по режимам. Режимы чередуются
+    на каждой странице, чтобы прогрев кэшей и фоновая нагрузка одинаково влияли на оба"""
+    import config
+    rng = random.Random(seed)
+    latencies = {mode: [] for mode in MODES}
+    for number in range(warmup + requests):
+        params = {"offset": rng.randrange(pages), "limit": limit}
+        for mode, fast in MODES.items():
+            config.FAST_SERIALIZATION = fast
+            start = time.perf_counter()
+            response = await client.get("/items/", params=params)
+            response.raise_for_status()
+            if number >= warmup:
+                latencies[mode].append(time.perf_counter() - start)
+    return {mode: percentile(sorted(values), 0.50) for mode, values in latencies.items()}
+
+
+async def benchmark(args) -> dict:
+    from benchmarks.run import asgi_client
+    with tempfile.TemporaryDirectory() as directory:
+        database = dataset.prepare(args.size, Path(directory) / "store.db")
+        pages = max(args.size // args.limit, 1)
+        async with asgi_client(database, 1) as client:
+            latencies = await request_latencies(client, pages, args.limit, args.requests, args.warmup)
+
+        # Сериализация замеряется после остановки приложения: синхронный цикл замеров
+        # не должен выглядеть блокировкой для сторожа цикла событий
+        from db import engine
+        from main import app
+        route = next(route for route in app.routes if getattr(route, "path", None) == "/items/" and "GET" in route.methods)
+        content = load_page(engine, args.size, args.limit, pages // 2)
+        report = {}
+        for mode, fast in MODES.items():
+            serialization = await serialization_time(route.response_field, content, fast, args.requests)
+            report[mode] = {
+                "latency": round(latencies[mode] * 1000, 3),
+                "serialization": round(serialization * 1000, 3),
+                "share": round(serialization / latencies[mode], 3),
+            }
+            print(f"{mode:8} {json.dumps(report[mode])}", flush=True)
+        engine.dispose()
+    report["speedup"] = {
+        key: round(report["standard"][key] / report["fast"][key], 2) for key in ("latency", "serialization")
+    }
+    print(f"{'speedup':8} {json.dumps(report['speedup'])}")
+    return report
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Сериализация страницы каталога: стандартный и быстрый путь")
+    parser.add_argument("--size", type=int, default=10000, help="размер каталога")
+    parser.add_argument("--limit", type=int, default=100, help="товаров на странице")
+    parser.add_argument("--requests", type=int, default=300, help="запросов и замеров сериализации на режим")
+    parser.add_argument("--warmup", type=int, default=30, help="запросов прогрева на режим (не учитываются)")
+    args = parser.parse_args(argv)
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
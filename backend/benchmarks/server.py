@@ -0,0 +1,26 @@
+import argparse
+
+import uvicorn
+
+
+def load_app(database: str):
+    """Приложение, работающее с базой database вместо config.SQLITE_URL.
+    Адрес подменяется до первого импорта db, поэтому функция вызывается до импорта main"""
+    import config
+    config.SQLITE_URL = f"sqlite:///{database}"
+    from main import app
+    return app
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Сервер uvicorn для нагрузочного теста")
+    parser.add_argument("--database", required=True, help="файл базы данных SQLite")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args(argv)
+
+    uvicorn.run(load_app(args.database), host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
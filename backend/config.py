@@ -12,3 +12,145 @@ MAX_FILE_SIZE = 5 * 2 ** 20
 
 # Максимальная длина названия файла
 MAX_FILE_NAME = 255
+
+# Максимальное количество файлов в одном запросе пакетной загрузки
+MAX_FILES_PER_UPLOAD = 20
+
+# Максимальное число файлов, одновременно записываемых в хранилище
+UPLOAD_CONCURRENCY = 4
+
+# Хранилище изображений: "local" (каталог UPLOAD_FOLDER) или "s3"
+STORAGE_BACKEND = "local"
+
+# URL, по которому раздаются изображения из локального каталога
+UPLOAD_URL = "http://localhost/img/"
+
+# Параметры S3-совместимого хранилища (AWS S3, MinIO)
+S3_ENDPOINT = "http://localhost:9000"
+S3_BUCKET = "img"
+S3_REGION = "us-east-1"
+S3_ACCESS_KEY = ""
+S3_SECRET_KEY = ""
+# Публичный URL бакета (None - "<S3_ENDPOINT>/<S3_BUCKET>/")
+S3_PUBLIC_URL = None
+# Размер части при multipart-загрузке (не менее 5 MB для S3)
+S3_PART_SIZE = 5 * 2 ** 20
+
+# Поиск осиротевших изображений (python -m general.image_sweeper)
+# Период фоновой проверки в секундах (None - фоновая проверка отключена)
+IMAGE_SWEEP_INTERVAL = None
+# Удалять ли найденное при фоновой проверке (иначе только отчёт в лог)
+IMAGE_SWEEP_DELETE = False
+# Размер пакета и пауза между пакетами (с)
+IMAGE_SWEEP_BATCH_SIZE = 500
+IMAGE_SWEEP_PAUSE = 0.5
+# Файлы моложе этого возраста (с) не трогаем: их запись может ещё не попасть в БД
+IMAGE_SWEEP_MIN_AGE = 60 * 60
+# Максимальное число одновременных операций с хранилищем
+IMAGE_SWEEP_CONCURRENCY = 16
+
+# Уведомления по WebSocket
+# Максимальная длина очереди исходящих сообщений одного подключения
+WS_SEND_QUEUE_SIZE = 100
+# Максимальное время отправки одного сообщения (с), после которого клиент отключается
+WS_SEND_TIMEOUT = 5
+# Окно агрегации уведомлений о покупках, с (0 - без агрегации, разумно до 0.3).
+# Покупки одного товара за окно объединяются в одно сообщение
+WS_COALESCE_WINDOW = 0
+# Сколько последних покупателей передавать в объединённом сообщении
+WS_LAST_BUYERS = 5
+# Период отправки сообщения {"type": "ping"}, с (0 - не отправлять). Клиент отвечает любым сообщением
+WS_PING_INTERVAL = 25
+# Подключение, от которого ничего не приходило дольше этого времени (с), закрывается
+WS_IDLE_TIMEOUT = 60
+# Максимальное число подключений к одному воркеру и одного пользователя
+WS_MAX_CONNECTIONS = 10000
+WS_MAX_CONNECTIONS_PER_USER = 5
+# Остаток товара, при котором покупка попадает в тему low_stock
+WS_LOW_STOCK_THRESHOLD = 5
+
+# Шина уведомлений между воркерами: "local" (один процесс), "sqlite" или "redis".
+# С "local" каждый воркер сам читает журнал уведомлений (воркеры одной машины), с общей шиной
+# события журнала публикуются в неё один раз и доходят до воркеров на всех машинах
+BUS_BACKEND = "local"
+# Канал (имя канала Redis или значение поля channel в SQLite)
+BUS_CHANNEL = "notifications"
+# Адрес сервера Redis
+REDIS_URL = "redis://localhost:6379/0"
+# Файл SQLite для шины, период опроса (с) и время хранения сообщений (с)
+BUS_SQLITE_PATH = "bus.db"
+BUS_POLL_INTERVAL = 0.1
+BUS_RETENTION = 60
+
+# Массовый импорт товаров: строк в одном пакете вставки, максимальный размер файла (байт)
+# и размер буфера в памяти, после которого загрузка и отчёт записываются во временный файл
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_SIZE = 200 * 1024 * 1024
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+# Максимальное число строк в одной поставке (PATCH /items/add)
+RESTOCK_MAX_ITEMS = 10000
+
+# Выгрузка каталога: строк, читаемых из курсора за один раз
+EXPORT_BATCH_SIZE = 1000
+
+# Публичная рассылка остатков товара (SSE): не чаще одного обновления товара за интервал, с,
+# и период комментария keep-alive, с
+STOCK_UPDATE_INTERVAL = 1
+STOCK_KEEPALIVE = 15
+
+# Журнал уведомлений (notification_outbox): события о покупках записываются в той же транзакции,
+# что и списание товара, и рассылаются фоновой задачей каждого воркера.
+# Период опроса журнала (с) и число строк, читаемых за один запрос
+OUTBOX_POLL_INTERVAL = 0.2
+OUTBOX_BATCH_SIZE = 500
+# Сколько пропущенных событий максимум отправлять при переподключении с last_event_id
+OUTBOX_REPLAY_LIMIT = 1000
+# Время хранения событий в журнале, с
+OUTBOX_RETENTION = 24 * 60 * 60
+
+# Заполнение базы синтетическим каталогом (python -m general.seeder): строк в одной пакетной вставке
+SEED_BATCH_SIZE = 10000
+
+# Метрики Prometheus (GET /metrics). Границы корзин гистограмм: длительность запросов HTTP (с),
+# длительность запросов к БД (с), число запросов к БД за запрос HTTP, длительность рассылки уведомления (с),
+# задержка цикла событий (с)
+METRICS_HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+METRICS_QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+METRICS_BROADCAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+METRICS_LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+
+# Журнал медленных запросов к БД: запросы дольше порога (с) записываются с параметрами и маршрутом
+# (None - не записывать)
+SLOW_QUERY_THRESHOLD = 0.2
+# Поиск N+1 для разработки и тестов: о запросе с одинаковым текстом, выполненном за один запрос HTTP
+# больше QUERY_REPEAT_LIMIT раз, пишется предупреждение (None - проверка отключена).
+# При QUERY_REPEAT_RAISE вместо предупреждения выбрасывается RepeatedQueryError
+QUERY_REPEAT_LIMIT = None
+QUERY_REPEAT_RAISE = False
+
+# Профилировщик запросов (POST /admin/profiler): каталог профилей speedscope и сколько их хранить,
+# интервал выборки по умолчанию (с) и максимальное число запросов за одно включение
+PROFILER_DIR = "profiles"
+PROFILER_MAX_FILES = 100
+PROFILER_INTERVAL = 0.005
+PROFILER_MAX_REQUESTS = 100
+
+# Трассировка запросов (OpenTelemetry, формат OTLP/JSON): "file" - span пишутся в TRACING_FILE
+# построчно, "console" - в журнал, None - трассировка отключена.
+# Идентификатор запроса (X-Request-ID) передаётся в ответ и журнал доступа в любом случае
+TRACING_EXPORTER = None
+TRACING_FILE = "traces.jsonl"
+TRACING_SERVICE_NAME = "store-backend"
+
+# Сторож цикла событий: период проверки задержки (с) и порог (с), дольше которого синхронный код
+# в асинхронном обработчике считается блокировкой - в журнал пишутся маршрут и стек (None - отключено).
+# LOOP_BLOCK_RAISE - режим для тестов: запрос с блокировкой завершается LoopBlockedError
+LOOP_MONITOR_INTERVAL = 0.05
+LOOP_BLOCK_THRESHOLD = 0.1
+LOOP_BLOCK_RAISE = False
+
+# Списки (товары, пользователи, бренды, категории) проверяются и кодируются в JSON через TypeAdapter
+# pydantic сразу в байты, минуя стандартную сериализацию FastAPI (False - обычный путь)
+FAST_SERIALIZATION = True
@@ -3,9 +3,15 @@ from sqlmodel import Session, SQLModel, create_engine, text
 from models.user import User, Role
 from general.password import get_password_hash
 from config import SQLITE_URL
+from general.metrics import instrument_engine
+from general.query_log import enable_query_log
+from general.tracing import trace_engine
 
 connect_args = {"check_same_thread": False}
 engine = create_engine(SQLITE_URL, connect_args=connect_args)
+instrument_engine(engine)
+enable_query_log(engine)
+trace_engine(engine)
 
 def create_users():
     admin = User(username="admin", role=Role.ADMIN, password_hash=get_password_hash("adminadmin"))
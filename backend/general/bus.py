@@ -0,0 +1,167 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+import asyncio, logging, sqlite3, threading, time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+# Шина уведомлений между процессами (воркерами) приложения.
+# Каждое опубликованное сообщение доставляется обработчику handler во всех процессах,
+# включая тот, который его опубликовал.
+class Bus(ABC):
+    handler: Callable[[str], Awaitable[None]] | None = None
+    # Сообщение доходит до других процессов (иначе только до опубликовавшего)
+    shared: bool = True
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, message: str):
+        ...
+
+    async def deliver(self, message: str):
+        if self.handler is not None:
+            await self.handler(message)
+
+
+# Доставка внутри одного процесса (по умолчанию, при запуске с одним воркером)
+class LocalBus(Bus):
+    shared = False
+
+    async def publish(self, message: str):
+        await self.deliver(message)
+
+
+# Шина поверх общего файла SQLite: сообщения записываются в таблицу,
+# каждый процесс периодически читает новые строки
+class SQLiteBus(Bus):
+    def __init__(
+        self,
+        path: str,
+        channel: str = config.BUS_CHANNEL,
+        poll_interval: float = config.BUS_POLL_INTERVAL,
+        retention: float = config.BUS_RETENTION,
+    ):
+        self.path = path
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+        self._last_id = 0
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            if self._connection is None:
+                self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS bus_message ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, "
+                    "payload TEXT NOT NULL, created REAL NOT NULL)"
+                )
+            return self._connection.execute(sql, params).fetchall()
+
+    async def start(self):
+        rows = await asyncio.to_thread(self._execute, "SELECT COALESCE(MAX(id), 0) FROM bus_message")
+        self._last_id = rows[0][0]
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def publish(self, message: str):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO bus_message (channel, payload, created) VALUES (?, ?, ?)",
+            (self.channel, message, time.time()),
+        )
+
+    async def poll_once(self):
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT id, payload FROM bus_message WHERE id > ? AND channel = ? ORDER BY id",
+            (self._last_id, self.channel),
+        )
+        for row_id, payload in rows:
+            self._last_id = row_id
+            await self.deliver(payload)
+
+    async def _poll(self):
+        last_cleanup = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll_once()
+                # Старые сообщения уже прочитаны всеми процессами
+                if time.monotonic() - last_cleanup > self.retention:
+                    last_cleanup = time.monotonic()
+                    await asyncio.to_thread(
+                        self._execute,
+                        "DELETE FROM bus_message WHERE created < ?",
+                        (time.time() - self.retention,),
+                    )
+            except Exception:
+                logger.exception("Ошибка чтения шины уведомлений")
+
+
+# Шина поверх Redis Pub/Sub (подходит и для совместимых серверов: Valkey, KeyDB)
+class RedisBus(Bus):
+    def __init__(self, url: str = config.REDIS_URL, channel: str = config.BUS_CHANNEL, client=None):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.Redis.from_url(url)
+        self.redis = client
+        self.channel = channel
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.redis.aclose()
+
+    async def publish(self, message: str):
+        await self.redis.publish(self.channel, message)
+
+    async def _listen(self, pubsub):
+        while True:
+            try:
+                async for item in pubsub.listen():
+                    if item["type"] != "message":
+                        continue
+                    data = item["data"]
+                    await self.deliver(data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception:
+                # Соединение потеряно - клиент переподключится и восстановит подписку
+                logger.exception("Ошибка чтения шины уведомлений из Redis")
+                await asyncio.sleep(1)
+
+
+def create_bus() -> Bus:
+    if config.BUS_BACKEND == "redis":
+        return RedisBus()
+    if config.BUS_BACKEND == "sqlite":
+        return SQLiteBus(config.BUS_SQLITE_PATH)
+    return LocalBus()
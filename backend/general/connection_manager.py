@@ -1,33 +1,388 @@
-from fastapi import WebSocket, WebSocketDisconnect
-from typing import List
+from fastapi import WebSocket, WebSocketDisconnect, status
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+import asyncio
 import json
+import re
+import time
+
+import config
+from general.bus import Bus, LocalBus
+from general.metrics import WS_BROADCAST_SECONDS
+from general.tracing import tracer
+
+
+PING_MESSAGE = json.dumps({"type": "ping"})
+# Подключения без подписок получают все события
+ALL_TOPICS = "*"
+LOW_STOCK_TOPIC = "low_stock"
+EVENT_ATTRIBUTES = ("item_id", "category_id", "brand_id", "remaining")
+TOPIC_PATTERN = re.compile(r"(?:item|category|brand):\d+|low_stock")
+
+
+# Темы из строки вида "category:1,item:5,low_stock"; ValueError при неизвестной теме
+def parse_topics(value: str | list[str] | None) -> set[str]:
+    if not value:
+        return set()
+    topics = {topic.strip() for topic in (value.split(",") if isinstance(value, str) else value)}
+    topics.discard("")
+    invalid = [topic for topic in topics if not isinstance(topic, str) or not TOPIC_PATTERN.fullmatch(topic)]
+    if invalid:
+        raise ValueError(f"Неизвестные темы: {', '.join(map(str, invalid))}")
+    return topics
+
+
+# Темы события о покупке: "item:<id>", "category:<id>", "brand:<id>" и low_stock при малом остатке
+def event_topics(event: dict) -> set[str]:
+    topics = {f"{name}:{event[f'{name}_id']}" for name in ("item", "category", "brand") if event.get(f"{name}_id") is not None}
+    remaining = event.get("remaining")
+    if remaining is not None and remaining <= config.WS_LOW_STOCK_THRESHOLD:
+        topics.add(LOW_STOCK_TOPIC)
+    return topics
+
+
+# Покупки одного товара, накопленные за окно агрегации
+@dataclass
+class PurchaseBatch:
+    item: str
+    quantity: int = 0
+    purchases: int = 0
+    buyers: set[str] = field(default_factory=set)
+    last_buyers: deque = field(default_factory=lambda: deque(maxlen=config.WS_LAST_BUYERS))
+    first_id: int | None = None
+    last_id: int | None = None
+    topics: set[str] = field(default_factory=set)
+    # Поля последнего события: номера товара, категории, бренда и остаток
+    attributes: dict = field(default_factory=dict)
+    # Сами покупки: пакет пересобирается для подключений, получивших часть из них при восстановлении
+    events: list[tuple] = field(default_factory=list)
+
+    def add(self, username: str, quantity: int, event_id: int | None = None, topics: set[str] = frozenset()):
+        self.events.append((username, quantity, event_id, topics))
+        self.quantity += quantity
+        self.purchases += 1
+        self.topics |= topics
+        if event_id is not None:
+            self.first_id = min(self.first_id or event_id, event_id)
+            self.last_id = max(self.last_id or 0, event_id)
+        self.buyers.add(username)
+        if username in self.last_buyers:
+            self.last_buyers.remove(username)
+        self.last_buyers.appendleft(username)
+
+    # Формат совпадает с одиночным уведомлением, дополнительные поля описывают пакет
+    def to_message(self) -> dict:
+        message = {"id": self.last_id} if self.last_id is not None else {}
+        return message | self.attributes | {
+            "username": self.last_buyers[0],
+            "item": self.item,
+            "quantity": self.quantity,
+            "purchases": self.purchases,
+            "buyers": len(self.buyers),
+            "last_buyers": list(self.last_buyers),
+        }
+
+    # Пакет из покупок с номером больше cursor (None, если таких нет)
+    def after(self, cursor: float) -> "PurchaseBatch | None":
+        batch = PurchaseBatch(self.item, attributes=self.attributes)
+        for username, quantity, event_id, topics in self.events:
+            if event_id is None or event_id > cursor:
+                batch.add(username, quantity, event_id, topics)
+        return batch if batch.purchases else None
+
+
+# Сведения о подключении: владелец и время последнего сообщения от клиента
+@dataclass
+class ConnectionInfo:
+    username: str | None = None
+    last_seen: float = field(default_factory=time.monotonic)
+    topics: set[str] = field(default_factory=set)
 
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-    
-    async def connect(self, websocket: WebSocket):
+    def __init__(
+        self,
+        queue_size: int = config.WS_SEND_QUEUE_SIZE,
+        send_timeout: float = config.WS_SEND_TIMEOUT,
+        bus: Bus | None = None,
+        coalesce_window: float = config.WS_COALESCE_WINDOW,
+        ping_interval: float = config.WS_PING_INTERVAL,
+        idle_timeout: float = config.WS_IDLE_TIMEOUT,
+        max_connections: int = config.WS_MAX_CONNECTIONS,
+        max_connections_per_user: int = config.WS_MAX_CONNECTIONS_PER_USER,
+    ):
+        # Реестр подключений: словарь сохраняет порядок и удаляет за O(1)
+        self.connections: Dict[WebSocket, ConnectionInfo] = {}
+        self.user_connections: Dict[str, set[WebSocket]] = {}
+        # Обратный индекс: тема -> подписанные подключения
+        self.subscribers: Dict[str, set[WebSocket]] = {}
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.max_connections_per_user = max_connections_per_user
+        self.rejected_connections = 0
+        self.reaped_connections = 0
+        self._heartbeat: asyncio.Task | None = None
+        # Уведомления публикуются в шину и рассылаются по её сообщениям в каждом воркере
+        self.bus = bus or LocalBus()
+        self.bus.handler = self._on_bus_message
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        # Очередь исходящих сообщений и задача, отправляющая их, для каждого подключения
+        self.queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.senders: Dict[WebSocket, asyncio.Task] = {}
+        self.dropped_messages = 0
+        self.failed_sends = 0
+        self._closing: set[asyncio.Task] = set()
+        # Номер последнего события журнала, отправленного подключению при восстановлении пропущенных.
+        # Пока идёт восстановление, значение бесконечно и живые события не отправляются
+        self.cursors: Dict[WebSocket, float] = {}
+        # Окно агрегации уведомлений о покупках (0 - отправлять каждое сразу)
+        self.coalesce_window = coalesce_window
+        self._pending: Dict[int | str, PurchaseBatch] = {}
+        self._pending_flush: asyncio.Task | None = None
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+
+    async def start(self):
+        await self.bus.start()
+        if self.ping_interval > 0:
+            self._heartbeat = asyncio.create_task(self._run_heartbeat())
+
+    async def stop(self):
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._pending_flush:
+            self._pending_flush.cancel()
+            self._pending_flush = None
+        await self.bus.stop()
+
+    async def _on_bus_message(self, message: str):
+        await self.deliver_event(json.loads(message))
+
+    # Событие о покупке с необязательным номером "id" из журнала уведомлений
+    async def deliver_event(self, event: dict):
+        topics = event_topics(event)
+        if self.coalesce_window <= 0:
+            await self.broadcast(json.dumps(event), event.get("id"), topics)
+            return
+
+        # Названия товаров не уникальны: пачки разделяются по id, название - только для старых событий
+        key = event.get("item_id", event["item"])
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = PurchaseBatch(event["item"])
+        batch.add(event["username"], event["quantity"], event.get("id"), topics)
+        batch.attributes.update((key, event[key]) for key in EVENT_ATTRIBUTES if key in event)
+
+        # Первое событие открывает окно, по его окончании рассылаются все накопленные пакеты
+        if self._pending_flush is None:
+            self._pending_flush = asyncio.create_task(self._flush_pending())
+
+    async def _flush_pending(self):
+        await asyncio.sleep(self.coalesce_window)
+        pending, self._pending = self._pending, {}
+        self._pending_flush = None
+        for batch in pending.values():
+            # Подключения, которым при восстановлении отправлена часть пакета,
+            # получают пакет только из оставшихся покупок
+            partial = {
+                connection: cursor for connection, cursor in self.cursors.items()
+                if batch.first_id is not None and batch.first_id <= cursor < batch.last_id
+            }
+            await self.broadcast(json.dumps(batch.to_message()), batch.last_id, batch.topics, exclude=partial.keys())
+            for connection, cursor in partial.items():
+                rest = batch.after(cursor)
+                if rest is not None and self.wants(connection, rest.topics):
+                    self.enqueue(json.dumps(rest.to_message()), connection)
+
+    # Возвращает False, если превышено число подключений: соединение отклоняется до принятия
+    async def connect(self, websocket: WebSocket, username: str | None = None, topics: set[str] = frozenset()) -> bool:
+        user_connections = self.user_connections.get(username, ()) if username else ()
+        if len(self.connections) >= self.max_connections or len(user_connections) >= self.max_connections_per_user:
+            self.rejected_connections += 1
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return False
+
         await websocket.accept()
-        self.active_connections.append(websocket)
-    
+        self.connections[websocket] = ConnectionInfo(username)
+        if username:
+            self.user_connections.setdefault(username, set()).add(websocket)
+        self.subscribers.setdefault(ALL_TOPICS, set()).add(websocket)
+        self.subscribe(websocket, topics)
+        self._get_queue(websocket)
+        return True
+
+    def subscribe(self, websocket: WebSocket, topics: set[str]):
+        info = self.connections.get(websocket)
+        if info is None or not topics:
+            return
+        if not info.topics:
+            self._unindex(ALL_TOPICS, websocket)
+        for topic in topics - info.topics:
+            self.subscribers.setdefault(topic, set()).add(websocket)
+        info.topics |= topics
+
+    def unsubscribe(self, websocket: WebSocket, topics: set[str]):
+        info = self.connections.get(websocket)
+        if info is None:
+            return
+        for topic in topics & info.topics:
+            self._unindex(topic, websocket)
+        info.topics -= topics
+        # Без подписок подключение снова получает все события
+        if not info.topics:
+            self.subscribers.setdefault(ALL_TOPICS, set()).add(websocket)
+
+    # Команды клиента: {"action": "subscribe" | "unsubscribe", "topics": [...]}.
+    # Остальные сообщения (например, ответ на ping) игнорируются
+    def handle_message(self, websocket: WebSocket, message: str):
+        try:
+            command = json.loads(message)
+            if not isinstance(command, dict):
+                return
+            topics = parse_topics(command.get("topics"))
+        except (ValueError, TypeError, AttributeError):
+            return
+        if command.get("action") == "subscribe":
+            self.subscribe(websocket, topics)
+        elif command.get("action") == "unsubscribe":
+            self.unsubscribe(websocket, topics)
+
+    # Подписано ли подключение хотя бы на одну из тем события (None - событие для всех)
+    def wants(self, websocket: WebSocket, topics: set[str] | None) -> bool:
+        info = self.connections.get(websocket)
+        if info is None:
+            return False
+        return topics is None or not info.topics or not info.topics.isdisjoint(topics)
+
+    def _unindex(self, topic: str, websocket: WebSocket):
+        subscribers = self.subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.subscribers[topic]
+
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-    
+        info = self.connections.pop(websocket, None)
+        if info is not None:
+            for topic in info.topics or (ALL_TOPICS,):
+                self._unindex(topic, websocket)
+        if info and info.username:
+            user_connections = self.user_connections.get(info.username)
+            if user_connections is not None:
+                user_connections.discard(websocket)
+                if not user_connections:
+                    del self.user_connections[info.username]
+        self.queues.pop(websocket, None)
+        self.cursors.pop(websocket, None)
+        sender = self.senders.pop(websocket, None)
+        if sender and sender is not asyncio.current_task():
+            sender.cancel()
+
+    # Любое сообщение от клиента (в том числе ответ на ping) продлевает подключение
+    def touch(self, websocket: WebSocket):
+        info = self.connections.get(websocket)
+        if info is not None:
+            info.last_seen = time.monotonic()
+
+    # Закрытие подключений, от которых ничего не приходило дольше idle_timeout
+    def reap_idle(self) -> int:
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [websocket for websocket, info in self.connections.items() if info.last_seen < deadline]
+        for websocket in idle:
+            self.reaped_connections += 1
+            self._drop(websocket, status.WS_1001_GOING_AWAY)
+        return len(idle)
+
+    async def _run_heartbeat(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            self.reap_idle()
+            await self.broadcast(PING_MESSAGE)
+
     async def send_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
-    
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except WebSocketDisconnect:
-                self.disconnect(connection)
-    
+
+    # Рассылка только кладёт сообщение в очереди подключений и не ждёт отправки.
+    # Сообщение с темами получают только подписчики этих тем и подключения без подписок.
+    # Подключения, которым событие event_id уже отправлено при восстановлении, пропускаются
+    async def broadcast(
+        self, message: str, event_id: int | None = None, topics: set[str] | None = None, exclude: Iterable = (),
+    ):
+        start = time.perf_counter()
+        with tracer.span("ws.broadcast") as span:
+            if topics is None:
+                targets = list(self.connections)
+            else:
+                targets = set(self.subscribers.get(ALL_TOPICS, ()))
+                for topic in topics:
+                    targets.update(self.subscribers.get(topic, ()))
+            for connection in targets:
+                if event_id is not None and event_id <= self.cursors.get(connection, 0) or connection in exclude:
+                    continue
+                self.enqueue(message, connection)
+            if span:
+                span.set_attribute("ws.targets", len(targets))
+        WS_BROADCAST_SECONDS.observe(time.perf_counter() - start)
+
+    def enqueue(self, message: str, websocket: WebSocket):
+        try:
+            self._get_queue(websocket).put_nowait(message)
+        except asyncio.QueueFull:
+            # Клиент не успевает получать сообщения - отключаем его
+            self.dropped_messages += 1
+            self._drop(websocket, status.WS_1013_TRY_AGAIN_LATER)
+
+    def _drop(self, websocket: WebSocket, code: int):
+        self.disconnect(websocket)
+        task = asyncio.create_task(self._close(websocket, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    # Ожидание отправки всех сообщений, уже стоящих в очередях
+    async def flush(self):
+        await asyncio.gather(*(queue.join() for queue in list(self.queues.values())))
+
+    def _get_queue(self, websocket: WebSocket) -> asyncio.Queue:
+        queue = self.queues.get(websocket)
+        if queue is None:
+            queue = self.queues[websocket] = asyncio.Queue(self.queue_size)
+            self.senders[websocket] = asyncio.create_task(self._sender(websocket, queue))
+        return queue
+
+    async def _sender(self, websocket: WebSocket, queue: asyncio.Queue):
+        try:
+            while True:
+                message = await queue.get()
+                try:
+                    await asyncio.wait_for(websocket.send_text(message), self.send_timeout)
+                except (WebSocketDisconnect, asyncio.TimeoutError, RuntimeError, OSError):
+                    self.failed_sends += 1
+                    self.disconnect(websocket)
+                    return
+                finally:
+                    queue.task_done()
+        finally:
+            # Оставшиеся сообщения уже не будут отправлены
+            while not queue.empty():
+                queue.get_nowait()
+                queue.task_done()
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(websocket.close(code=code), self.send_timeout)
+        except Exception:
+            pass
+
     async def notify_managers_about_buying(self, username: str, item: str, quantity: int):
         message = {
             "username": username,
             "item": item,
-            "quantity": quantity, 
+            "quantity": quantity,
         }
-        await self.broadcast(json.dumps(message))
+        await self.bus.publish(json.dumps(message))
@@ -1,9 +1,15 @@
 from typing import Annotated
 from fastapi import HTTPException, UploadFile, status
 from pydantic import BeforeValidator, Field
-import os, uuid
+import logging, os, uuid
+
+import anyio
 
 import config
+from general.storage import CHUNK_SIZE, get_storage
+from general.tracing import tracer
+
+logger = logging.getLogger(__name__)
 
 
 def generate_unique_filename(filename: str, max_length: int = 255):
@@ -46,26 +52,54 @@ ImageFile = Annotated[
 ]
 
 
-def image_upload(file: ImageFile):
+# Потоковое чтение загруженного файла блоками
+async def read_chunks(file: UploadFile):
+    while chunk := await file.read(CHUNK_SIZE):
+        yield chunk
+
+
+async def image_upload(file: ImageFile):
     try:
         # Генерируем уникальное имя файла
         unique_filename = generate_unique_filename(file.filename)
-        file_path = os.path.join(config.UPLOAD_FOLDER, unique_filename)
-        
-        # Сохраняем файл
-        with open(file_path, "wb") as buffer:
-            buffer.write(file.file.read())
-        
+
+        # Сохраняем файл в хранилище
+        with tracer.span("image.upload", **{"file.name": unique_filename, "storage": config.STORAGE_BACKEND}):
+            await get_storage().put_stream(unique_filename, read_chunks(file))
+
         return unique_filename
-    except Exception as e:
+    except Exception:
+        logger.exception("Не удалось сохранить изображение %s в хранилище %s", file.filename, config.STORAGE_BACKEND)
         return None
 
 
-def image_delete(filename: str):
-    file_path = os.path.join(config.UPLOAD_FOLDER, filename)
-
+async def image_delete(filename: str):
     try:
-        os.remove(file_path)
+        with tracer.span("image.delete", **{"file.name": filename, "storage": config.STORAGE_BACKEND}):
+            await get_storage().delete(filename)
         return True
-    except Exception as e:
+    except Exception:
+        logger.exception("Не удалось удалить изображение %s из хранилища %s", filename, config.STORAGE_BACKEND)
         return False
+
+
+# Параллельная загрузка нескольких файлов. Если хотя бы один файл не загрузился,
+# уже сохранённые файлы удаляются и возвращается None
+async def images_upload(files: list[ImageFile]):
+    file_names = [None] * len(files)
+    limiter = anyio.CapacityLimiter(config.UPLOAD_CONCURRENCY)
+
+    async def upload(index: int, file: ImageFile):
+        async with limiter:
+            file_names[index] = await image_upload(file)
+
+    async with anyio.create_task_group() as tg:
+        for index, file in enumerate(files):
+            tg.start_soon(upload, index, file)
+
+    if None in file_names:
+        for file_name in file_names:
+            if file_name:
+                await image_delete(file_name)
+        return None
+    return file_names
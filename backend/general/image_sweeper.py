@@ -0,0 +1,192 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+import argparse, logging, time
+
+import anyio
+from sqlalchemy import Engine, delete, select, union_all, update
+
+import config
+from models.cover import Cover
+from models.item import Item, Image
+from general.storage import Storage, get_storage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweepReport:
+    orphan_files: int = 0   # Файлы в хранилище без записи в БД
+    missing_files: int = 0  # Записи в БД без файла в хранилище
+    deleted_files: int = 0
+    deleted_rows: int = 0
+    errors: int = 0
+
+
+# Какие из имён файлов упоминаются в таблицах cover и image
+def referenced_names(engine: Engine, names: list[str]) -> set[str]:
+    query = union_all(
+        select(Cover.name).where(Cover.name.in_(names)),
+        select(Image.name).where(Image.name.in_(names)),
+    )
+    with engine.connect() as connection:
+        return set(connection.execute(query).scalars())
+
+
+# Страница записей таблицы, упорядоченная по имени (keyset-пагинация по уникальному индексу)
+def read_names_page(engine: Engine, table, after: str, limit: int) -> list[tuple[int, str]]:
+    query = select(table.id, table.name).where(table.name > after).order_by(table.name).limit(limit)
+    with engine.connect() as connection:
+        return [tuple(row) for row in connection.execute(query)]
+
+
+def delete_rows(engine: Engine, table, ids: list[int]) -> int:
+    with engine.begin() as connection:
+        if table is Cover:
+            connection.execute(update(Item).where(Item.cover_id.in_(ids)).values(cover_id=None))
+        return connection.execute(delete(table).where(table.id.in_(ids))).rowcount
+
+
+class ImageSweeper:
+    def __init__(
+        self,
+        storage: Storage,
+        engine: Engine,
+        delete: bool = False,
+        batch_size: int = config.IMAGE_SWEEP_BATCH_SIZE,
+        pause: float = config.IMAGE_SWEEP_PAUSE,
+        min_age: float = config.IMAGE_SWEEP_MIN_AGE,
+        concurrency: int = config.IMAGE_SWEEP_CONCURRENCY,
+    ):
+        self.storage = storage
+        self.engine = engine
+        self.delete = delete
+        self.batch_size = batch_size
+        self.pause = pause
+        self.min_age = min_age
+        self.limiter = anyio.CapacityLimiter(concurrency)
+
+    async def run(self) -> SweepReport:
+        report = SweepReport()
+        await self.sweep_files(report)
+        await self.sweep_rows(report)
+        logger.info("Проверка изображений завершена: %s", report)
+        return report
+
+    # Файлы без записей в БД
+    async def sweep_files(self, report: SweepReport):
+        # Свежие файлы пропускаем: запись о них может ещё не успеть попасть в БД
+        cutoff = time.time() - self.min_age
+        batch: list[str] = []
+
+        async for name, modified in self.storage.iter_files():
+            if modified > cutoff:
+                continue
+            batch.append(name)
+            if len(batch) >= self.batch_size:
+                await self._sweep_files_batch(batch, report)
+                batch = []
+        if batch:
+            await self._sweep_files_batch(batch, report)
+
+    async def _sweep_files_batch(self, names: list[str], report: SweepReport):
+        referenced = await anyio.to_thread.run_sync(referenced_names, self.engine, names)
+        orphans = [name for name in names if name not in referenced]
+        report.orphan_files += len(orphans)
+        for name in orphans:
+            logger.info("Файл без записи в БД: %s", name)
+
+        if self.delete and orphans:
+            results = await self._map(self.storage.delete, orphans)
+            for name, result in zip(orphans, results):
+                if isinstance(result, Exception):
+                    report.errors += 1
+                    logger.warning("Не удалось удалить файл %s: %r", name, result)
+                else:
+                    report.deleted_files += 1
+        await anyio.sleep(self.pause)
+
+    # Записи в БД без файлов
+    async def sweep_rows(self, report: SweepReport):
+        for table in (Cover, Image):
+            after = ""
+            while page := await anyio.to_thread.run_sync(
+                read_names_page, self.engine, table, after, self.batch_size
+            ):
+                after = page[-1][1]
+                results = await self._map(self.storage.exists, [name for _, name in page])
+
+                missing = []
+                for (row_id, name), result in zip(page, results):
+                    if isinstance(result, Exception):
+                        report.errors += 1
+                        logger.warning("Не удалось проверить файл %s: %r", name, result)
+                    elif not result:
+                        missing.append(row_id)
+                        logger.info("Запись %s.%s без файла: %s", table.__tablename__, row_id, name)
+                report.missing_files += len(missing)
+
+                if self.delete and missing:
+                    report.deleted_rows += await anyio.to_thread.run_sync(delete_rows, self.engine, table, missing)
+                await anyio.sleep(self.pause)
+
+    # Параллельное выполнение операций с хранилищем с ограничением числа одновременных запросов
+    async def _map(self, func: Callable[[str], Awaitable], names: list[str]) -> list:
+        results: list = [None] * len(names)
+
+        async def run(index: int, name: str):
+            async with self.limiter:
+                try:
+                    results[index] = await func(name)
+                except Exception as e:
+                    results[index] = e
+
+        async with anyio.create_task_group() as tg:
+            for index, name in enumerate(names):
+                tg.start_soon(run, index, name)
+        return results
+
+
+# Фоновая периодическая проверка
+async def run_periodically(sweeper: ImageSweeper, interval: float):
+    while True:
+        try:
+            await sweeper.run()
+        except Exception:
+            logger.exception("Ошибка при проверке изображений")
+        await anyio.sleep(interval)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Поиск осиротевших изображений и записей о них")
+    parser.add_argument("--delete", action="store_true", help="удалять найденное (по умолчанию только отчёт)")
+    parser.add_argument("--batch-size", type=int, default=config.IMAGE_SWEEP_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=config.IMAGE_SWEEP_PAUSE, help="пауза между пакетами, с")
+    parser.add_argument("--min-age", type=float, default=config.IMAGE_SWEEP_MIN_AGE, help="минимальный возраст файла, с")
+    parser.add_argument("--concurrency", type=int, default=config.IMAGE_SWEEP_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from db import engine
+    storage = get_storage()
+    sweeper = ImageSweeper(
+        storage,
+        engine,
+        delete=args.delete,
+        batch_size=args.batch_size,
+        pause=args.pause,
+        min_age=args.min_age,
+        concurrency=args.concurrency,
+    )
+
+    async def run():
+        try:
+            return await sweeper.run()
+        finally:
+            await storage.close()
+
+    print(anyio.run(run))
+
+
+if __name__ == "__main__":
+    main()
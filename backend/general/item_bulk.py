@@ -0,0 +1,116 @@
+from itertools import groupby
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, bindparam, cast, func, literal, or_, select, update
+from sqlmodel import Session
+
+from models.item import Item, ItemBulkFilter, ItemRestock, ItemUpdate, PriceExpression, PriceOperation
+
+MIN_PRICE, MAX_PRICE = 1, 10 ** 8
+MAX_QUANTITY = 10 ** 8
+# Число id в одном запросе IN
+ID_CHUNK_SIZE = 1000
+items_table = Item.__table__
+
+
+def unprocessable(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+# Разные поля для каждого товара: по одному executemany на каждый набор изменяемых полей
+def update_by_ids(session: Session, items: dict[int, ItemUpdate]) -> tuple[int, list[int]]:
+    existing = set(session.execute(select(items_table.c.id).where(items_table.c.id.in_(items))).scalars())
+    rows = [
+        {"_id": item_id, **fields.model_dump(exclude_unset=True)}
+        for item_id, fields in items.items() if item_id in existing
+    ]
+    rows = [row for row in rows if len(row) > 1]
+    updated = 0
+    rows.sort(key=lambda row: sorted(row))
+    for keys, group in groupby(rows, key=lambda row: sorted(row)):
+        columns = [key for key in keys if key != "_id"]
+        statement = (
+            update(items_table)
+            .where(items_table.c.id == bindparam("_id"))
+            .values({column: bindparam(column) for column in columns})
+        )
+        updated += session.execute(statement, list(group)).rowcount
+    return updated, sorted(set(items) - existing)
+
+
+def price_expression(price: PriceExpression):
+    if price.operation != PriceOperation.MULTIPLY and not float(price.value).is_integer():
+        raise unprocessable("Цена должна быть целым числом")
+    if price.operation == PriceOperation.SET:
+        return literal(int(price.value))
+    if price.operation == PriceOperation.ADD:
+        return items_table.c.price + int(price.value)
+    if price.value <= 0:
+        raise unprocessable("Множитель цены должен быть положительным")
+    return cast(func.round(items_table.c.price * price.value), Integer)
+
+
+# Одно UPDATE для всех товаров, подходящих под фильтр
+def update_by_filter(session: Session, filter: ItemBulkFilter, price: PriceExpression | None, fields: ItemUpdate | None) -> int:
+    conditions = [
+        getattr(items_table.c, key) == value
+        for key, value in filter.model_dump(exclude_none=True).items()
+    ]
+    if not conditions:
+        raise unprocessable("Укажите категорию или бренд")
+
+    values = fields.model_dump(exclude_unset=True) if fields else {}
+    if price is not None:
+        if "price" in values:
+            raise unprocessable("Цена задана одновременно полем и выражением")
+        expression = price_expression(price)
+        # Цена после изменения должна остаться в допустимых пределах у всех товаров
+        out_of_range = session.execute(
+            select(func.count()).select_from(items_table)
+            .where(*conditions, or_(expression < MIN_PRICE, expression > MAX_PRICE))
+        ).scalar_one()
+        if out_of_range:
+            raise unprocessable(f"Цена выйдет за пределы от {MIN_PRICE} до {MAX_PRICE}, товаров: {out_of_range}")
+        values["price"] = expression
+    if not values:
+        raise unprocessable("Не указаны изменения")
+
+    return session.execute(update(items_table).where(*conditions).values(values)).rowcount
+
+
+# Пополнение остатков: quantity = quantity + :delta с проверкой потолка в самом UPDATE.
+# Возвращает число обновлённых товаров и отклонённые строки (item_id, причина)
+def restock(session: Session, delivery: list[ItemRestock]) -> tuple[int, list[dict]]:
+    deltas: dict[int, int] = {}
+    for row in delivery:
+        deltas[row.item_id] = deltas.get(row.item_id, 0) + row.quantity
+
+    ids = list(deltas)
+    quantities = {}
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        quantities.update(session.execute(
+            select(items_table.c.id, items_table.c.quantity).where(items_table.c.id.in_(chunk))
+        ).tuples().all())
+
+    rejected, rows = [], []
+    for item_id, delta in deltas.items():
+        if item_id not in quantities:
+            rejected.append({"item_id": item_id, "reason": "Товар не найден"})
+        elif quantities[item_id] + delta > MAX_QUANTITY:
+            rejected.append({"item_id": item_id, "reason": f"Количество товара не может превышать {MAX_QUANTITY}"})
+        else:
+            rows.append({"_id": item_id, "delta": delta})
+    if not rows:
+        return 0, rejected
+
+    statement = (
+        update(items_table)
+        .where(items_table.c.id == bindparam("_id"), items_table.c.quantity + bindparam("delta") <= MAX_QUANTITY)
+        .values(quantity=items_table.c.quantity + bindparam("delta"))
+    )
+    updated = session.execute(statement, rows).rowcount
+    if updated != len(rows):
+        # Остатки изменились между проверкой и обновлением - транзакция будет отменена
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Остатки изменились во время поставки, повторите запрос")
+    return updated, rejected
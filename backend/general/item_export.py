@@ -0,0 +1,65 @@
+from typing import Iterator
+import csv, io, json, zlib
+
+from sqlalchemy import Engine, select
+
+import config
+from models.brand import Brand
+from models.category import Category
+from models.item import Item
+
+# Столбцы выгрузки. Названия бренда и категории позволяют загрузить файл обратно через импорт
+COLUMNS = (
+    Item.id, Item.name, Item.description, Item.price, Item.quantity,
+    Item.brand_id, Brand.name.label("brand"), Item.category_id, Category.name.label("category"), Item.cover_id,
+)
+HEADER = [column.key for column in COLUMNS]
+
+
+def export_query():
+    return (
+        select(*COLUMNS)
+        .join(Brand, Brand.id == Item.brand_id)
+        .join(Category, Category.id == Item.category_id)
+        .order_by(Item.id)
+    )
+
+
+def iter_rows(engine: Engine, batch_size: int = config.EXPORT_BATCH_SIZE) -> Iterator[list[tuple]]:
+    """Строки каталога пакетами по batch_size через курсор на стороне сервера"""
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(export_query())
+        for partition in result.partitions():
+            yield partition
+
+
+def serialize(rows: Iterator[list[tuple]], fmt: str) -> Iterator[str]:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(HEADER)
+        for partition in rows:
+            writer.writerows(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # Заголовок для пустого каталога
+        if buffer.tell():
+            yield buffer.getvalue()
+        return
+    for partition in rows:
+        yield "".join(json.dumps(dict(zip(HEADER, row)), ensure_ascii=False) + "\n" for row in partition)
+
+
+def gzip_chunks(chunks: Iterator[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(engine: Engine, fmt: str, gzip: bool = False, batch_size: int = config.EXPORT_BATCH_SIZE) -> Iterator[str | bytes]:
+    chunks = serialize(iter_rows(engine, batch_size), fmt)
+    return gzip_chunks(chunks) if gzip else chunks
@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from typing import IO, Iterator
+import codecs, csv, json, tempfile
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlmodel import Session
+
+import config
+from models.brand import Brand
+from models.category import Category
+from models.item import Item, ItemImport
+
+FORMATS = ("csv", "ndjson")
+
+
+# Итог импорта и построчный отчёт об ошибках (NDJSON во временном файле)
+@dataclass
+class ImportReport:
+    rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: IO[str] = field(default_factory=lambda: tempfile.SpooledTemporaryFile(
+        max_size=config.IMPORT_SPOOL_SIZE, mode="w+", encoding="utf-8",
+    ))
+
+    def add_error(self, row: int, errors: list[dict]):
+        self.failed += 1
+        self.errors.write(json.dumps({"row": row, "errors": errors}, ensure_ascii=False) + "\n")
+
+    # Первая строка - итог, далее ошибки по строкам
+    def lines(self) -> Iterator[str]:
+        try:
+            yield json.dumps({"rows": self.rows, "imported": self.imported, "failed": self.failed}) + "\n"
+            self.errors.seek(0)
+            yield from self.errors
+        finally:
+            self.errors.close()
+
+
+def read_rows(file: IO[bytes], fmt: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Строки файла в виде (номер, данные, ошибка разбора). Нумерация без учёта заголовка CSV"""
+    text = codecs.getreader("utf-8-sig")(file)
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(text), 1):
+            yield number, row, None
+        return
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Некорректный JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield number, None, "Строка должна быть объектом JSON"
+            continue
+        yield number, data, None
+
+
+# Справочник "название -> id" без учёта регистра
+def name_map(session: Session, model) -> dict[str, int]:
+    return {name.casefold(): id for id, name in session.execute(select(model.id, model.name))}
+
+
+class ItemImporter:
+    def __init__(self, session: Session, batch_size: int = config.IMPORT_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+        self.brands = name_map(session, Brand)
+        self.categories = name_map(session, Category)
+        self.brand_ids = set(self.brands.values())
+        self.category_ids = set(self.categories.values())
+
+    def run(self, file: IO[bytes], fmt: str) -> ImportReport:
+        report = ImportReport()
+        batch = []
+        for number, data, error in read_rows(file, fmt):
+            report.rows += 1
+            if error:
+                report.add_error(number, [{"field": None, "message": error}])
+                continue
+            values, errors = self.validate(data)
+            if errors:
+                report.add_error(number, errors)
+                continue
+            batch.append(values)
+            if len(batch) >= self.batch_size:
+                report.imported += self.insert(batch)
+                batch = []
+        if batch:
+            report.imported += self.insert(batch)
+        return report
+
+    # Название бренда и категории заменяется на id, строка проверяется моделью ItemImport
+    def validate(self, data: dict) -> tuple[dict | None, list[dict]]:
+        errors, unresolved = [], set()
+        data = {key: value for key, value in data.items() if key is not None and value not in ("", None)}
+        for key, names, label in (("brand", self.brands, "Бренд «{}» не найден"), ("category", self.categories, "Категория «{}» не найдена")):
+            name = data.pop(key, None)
+            if f"{key}_id" in data or name is None:
+                continue
+            id = names.get(str(name).strip().casefold())
+            if id is None:
+                errors.append({"field": key, "message": label.format(name)})
+                unresolved.add(f"{key}_id")
+            else:
+                data[f"{key}_id"] = id
+        try:
+            item = ItemImport.model_validate(data)
+        except ValidationError as e:
+            errors += [
+                {"field": ".".join(map(str, error["loc"])), "message": error["msg"]}
+                for error in e.errors() if error["loc"][:1] not in {(field,) for field in unresolved}
+            ]
+            return None, errors
+        if item.brand_id not in self.brand_ids:
+            errors.append({"field": "brand_id", "message": f"Бренд с id {item.brand_id} не найден"})
+        if item.category_id not in self.category_ids:
+            errors.append({"field": "category_id", "message": f"Категория с id {item.category_id} не найдена"})
+        return (None if errors else item.model_dump()), errors
+
+    # Пакетная вставка одним executemany и коммит пакета
+    def insert(self, batch: list[dict]) -> int:
+        self.session.execute(insert(Item.__table__), batch)
+        self.session.commit()
+        return len(batch)
@@ -0,0 +1,51 @@
+from sqlalchemy import Row, Select, select
+from sqlmodel import Session, SQLModel
+
+from models.brand import Brand
+from models.category import Category
+from models.cover import Cover
+from models.item import Item
+
+# Списки только для чтения без объектов ORM: запрос Core выбирает ровно столбцы ответа,
+# строки сразу превращаются в словари для модели ответа. Объекты не создаются и не попадают
+# в карту идентичности сессии, связи не догружаются отдельными запросами
+
+# Столбцы ItemRead вместе с брендом, категорией и обложкой
+ITEM_COLUMNS = (
+    Item.id, Item.name, Item.description, Item.price, Item.quantity,
+    Brand.id.label("brand_id"), Brand.name.label("brand_name"),
+    Category.id.label("category_id"), Category.name.label("category_name"),
+    Cover.id.label("cover_id"), Cover.name.label("cover_name"),
+)
+
+
+def item_query(*conditions) -> Select:
+    """Товары с брендом, категорией и обложкой одним запросом, по возрастанию id"""
+    return (
+        select(*ITEM_COLUMNS)
+        .join(Brand, Brand.id == Item.brand_id)
+        .join(Category, Category.id == Item.category_id)
+        .outerjoin(Cover, Cover.id == Item.cover_id)
+        .where(*conditions)
+        .order_by(Item.id)
+    )
+
+
+def item_dict(row: Row) -> dict:
+    """Строка item_query в виде ItemRead"""
+    return {
+        "id": row.id,
+        "name": row.name,
+        "description": row.description,
+        "price": row.price,
+        "quantity": row.quantity,
+        "brand": {"id": row.brand_id, "name": row.brand_name},
+        "category": {"id": row.category_id, "name": row.category_name},
+        "cover": {"id": row.cover_id, "name": row.cover_name} if row.cover_id is not None else None,
+    }
+
+
+def read_rows(session: Session, table: type[SQLModel], read: type[SQLModel]) -> list[dict]:
+    """Все строки таблицы table: только столбцы модели ответа read, по возрастанию id"""
+    columns = [getattr(table, name) for name in read.model_fields]
+    return [dict(row._mapping) for row in session.exec(select(*columns).order_by(table.id))]
@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+import asyncio, logging, sys, threading, time, traceback
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import config
+from general.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Метка маршрута блокировки, если в момент проверки цикл выполнял не обработчик запроса
+UNKNOWN_ROUTE = "unknown"
+
+
+class LoopBlockedError(AssertionError):
+    pass
+
+
+# Блокировка цикла событий: маршрут и стек потока цикла в момент обнаружения
+@dataclass
+class Stall:
+    beat: float
+    duration: float
+    route: str
+    task: str | None
+    stack: str
+
+
+# Запрос, обрабатываемый задачей цикла событий, и обнаруженные в нём блокировки
+@dataclass
+class WatchedRequest:
+    scope: Scope
+    stalls: list[Stall] = field(default_factory=list)
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return f"{self.scope.get('method', 'WEBSOCKET')} {getattr(route, 'path', self.scope['path'])}"
+
+
+# Сторож цикла событий. Задача-пульс каждые interval секунд отмечает время и измеряет задержку
+# пробуждения (lag). Отдельный поток проверяет отметку: если цикл не возвращался к задачам дольше
+# threshold, значит текущая задача выполняет синхронный код - поток снимает стек цикла
+# (sys._current_frames) и по задаче находит маршрут. Синхронные эндпоинты выполняются в пуле
+# потоков и цикл не блокируют, поэтому блокировки находятся в асинхронных обработчиках
+class LoopMonitor:
+    def __init__(self, threshold: float = config.LOOP_BLOCK_THRESHOLD, interval: float = config.LOOP_MONITOR_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.requests: dict[asyncio.Task, WatchedRequest] = {}
+        self._beat = 0.0
+        self._stall: Stall | None = None
+        self._loop_thread: int | None = None
+        self._heartbeat: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    def watch(self):
+        """Наблюдение за текущим циклом событий. Повторный вызов в том же цикле ничего не делает,
+        в новом цикле (TestClient создаёт цикл на каждый запрос) наблюдение переносится в него"""
+        loop = asyncio.get_running_loop()
+        if self.threshold is None or loop is self.loop:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self.loop = loop
+        self._heartbeat = loop.create_task(self._tick(loop), name="loop-monitor")
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+            self._watchdog.start()
+
+    def stop(self):
+        self.loop = None
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._watchdog is not None:
+            self._stop.set()
+            self._watchdog.join()
+            self._watchdog = None
+            self._stop.clear()
+
+    async def _tick(self, loop: asyncio.AbstractEventLoop):
+        while self.loop is loop:
+            start = self._beat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - start - self.interval, 0.0)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self.threshold:
+                # Блокировка короче периода проверки сторожем может пройти без стека и маршрута
+                stall = self._stall
+                EVENT_LOOP_BLOCKS.inc((stall.route if stall is not None and stall.beat == start else UNKNOWN_ROUTE,))
+
+    def _watch(self):
+        period = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(period):
+            loop, beat = self.loop, self._beat
+            if loop is None or not loop.is_running():
+                continue
+            # Пульс обновляется раз в interval: отметка старше interval + threshold - цикл заблокирован
+            stalled = time.perf_counter() - beat - self.interval
+            if stalled < self.threshold or (self._stall is not None and self._stall.beat == beat):
+                continue
+            self._stall = self._capture(loop, beat, stalled)
+
+    def _capture(self, loop: asyncio.AbstractEventLoop, beat: float, stalled: float) -> Stall:
+        frame = sys._current_frames().get(self._loop_thread)
+        task = asyncio.current_task(loop)
+        request = self.requests.get(task) if task is not None else None
+        stall = Stall(
+            beat=beat,
+            duration=stalled,
+            route=request.route if request is not None else UNKNOWN_ROUTE,
+            task=task.get_name() if task is not None else None,
+            stack="".join(traceback.format_stack(frame)) if frame is not None else "",
+        )
+        if request is not None:
+            request.stalls.append(stall)
+        logger.warning(
+            "Цикл событий заблокирован больше %.3f с [%s], задача %s:\n%s",
+            stall.duration, stall.route, stall.task, stall.stack,
+        )
+        return stall
+
+
+# Связывает задачу цикла событий с запросом HTTP или WebSocket, чтобы сторож мог назвать маршрут
+# блокировки. При LOOP_BLOCK_RAISE запрос с блокировкой завершается LoopBlockedError: в тестах
+# (TestClient передаёт исключения приложения) это проваливает тест с блокирующим вызовом
+class LoopMonitorMiddleware:
+    def __init__(self, app: ASGIApp, monitor: LoopMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket") or self.monitor.threshold is None:
+            await self.app(scope, receive, send)
+            return
+
+        self.monitor.watch()
+        task = asyncio.current_task()
+        request = self.monitor.requests[task] = WatchedRequest(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.requests.pop(task, None)
+
+        if request.stalls and config.LOOP_BLOCK_RAISE:
+            stall = request.stalls[0]
+            raise LoopBlockedError(
+                f"Цикл событий заблокирован больше {stall.duration * 1000:.0f} мс [{stall.route}]:\n{stall.stack}"
+            )
@@ -0,0 +1,285 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable
+import math, threading, time
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import config
+
+# Метрики в текстовом формате Prometheus (GET /metrics). Значения хранятся в памяти процесса:
+# при нескольких воркерах uvicorn каждый отдаёт свои, суммирует их Prometheus.
+# Запись метрики - словарь и блокировка без выделения объектов, тяжёлая работа делается при чтении
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Маршрут запросов, не совпавших ни с одним эндпоинтом
+UNMATCHED_ROUTE = "unmatched"
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[tuple[str, tuple[str, ...], tuple, float]]:
+        """Строки метрики: (имя, названия меток, значения меток, значение)"""
+        return ()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{format_labels(names, values)} {format_value(value)}" for name, names, values, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, self.labels, labels, value) for labels, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float], labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Метки -> [число наблюдений в каждой корзине (не накопительно), сумма]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, labels: tuple = ()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def samples(self):
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        samples = []
+        names = self.labels + ("le",)
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", names, labels + (format_value(bound),), cumulative))
+            samples.append((f"{self.name}_sum", self.labels, labels, total))
+            samples.append((f"{self.name}_count", self.labels, labels, cumulative))
+        return samples
+
+
+# Значения, которые считываются из объекта в момент запроса /metrics: функция возвращает пары (значения меток, значение)
+class CallbackMetric(Metric):
+    def __init__(self, name: str, documentation: str, kind: str, callback: Callable[[], Iterable[tuple[tuple, float]]], labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self):
+        return [(self.name, self.labels, labels, value) for labels, value in self.callback()]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        # Повторная регистрация (например, новый ConnectionManager в тестах) заменяет метрику
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in list(self.metrics.values())) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "Число запросов HTTP", ("method", "route", "status"),
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Длительность запросов HTTP", config.METRICS_HTTP_BUCKETS, ("method", "route"),
+))
+HTTP_IN_PROGRESS = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "Запросы HTTP в обработке", ("method", "route"),
+))
+DB_QUERIES = REGISTRY.register(Counter(
+    "db_queries_total", "Число запросов к БД",
+))
+DB_QUERY_SECONDS = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Длительность запросов к БД", config.METRICS_DB_BUCKETS,
+))
+DB_QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_queries_per_request", "Число запросов к БД за один запрос HTTP", config.METRICS_QUERY_COUNT_BUCKETS, ("method", "route"),
+))
+WS_BROADCAST_SECONDS = REGISTRY.register(Histogram(
+    "ws_broadcast_duration_seconds", "Длительность рассылки сообщения по очередям подключений", config.METRICS_BROADCAST_BUCKETS,
+))
+EVENT_LOOP_LAG_SECONDS = REGISTRY.register(Histogram(
+    "event_loop_lag_seconds", "Задержка пробуждения задачи в цикле событий", config.METRICS_LOOP_LAG_BUCKETS,
+))
+EVENT_LOOP_BLOCKS = REGISTRY.register(Counter(
+    "event_loop_blocks_total", "Блокировки цикла событий дольше порога по маршрутам", ("route",),
+))
+
+# Счётчик запросов к БД текущего запроса HTTP. Список, а не число: синхронные эндпоинты
+# выполняются в пуле потоков с копией контекста, и изменения должны быть видны middleware
+request_queries: ContextVar[list[int] | None] = ContextVar("request_queries", default=None)
+
+
+def route_name(scope: Scope) -> str:
+    # FastAPI записывает найденный маршрут в scope при маршрутизации
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+# Счётчик запросов, гистограмма длительности, коды ответа и число запросов к БД по маршрутам.
+# Метка маршрута - шаблон пути (/items/{item_id}), а не сам путь
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        queries = [0]
+        token = request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            request_queries.reset(token)
+            labels = (scope["method"], route_name(scope))
+            HTTP_REQUESTS.inc(labels + (str(status_code),))
+            HTTP_REQUEST_SECONDS.observe(duration, labels)
+            DB_QUERIES_PER_REQUEST.observe(queries[0], labels)
+
+
+def track_in_progress(app: ASGIApp, route: str) -> ASGIApp:
+    async def tracked(scope: Scope, receive: Receive, send: Send):
+        labels = (scope.get("method", "WEBSOCKET"), route)
+        HTTP_IN_PROGRESS.inc(labels)
+        try:
+            await app(scope, receive, send)
+        finally:
+            HTTP_IN_PROGRESS.dec(labels)
+    return tracked
+
+
+def instrument_routes(routes: Iterable):
+    """Запросы в обработке по маршрутам. До маршрутизации middleware не знает маршрут,
+    поэтому обёртка ставится один раз на каждый HTTP-эндпоинт, а не ищет маршрут на каждый запрос"""
+    for route in routes:
+        if getattr(route, "methods", None) and not getattr(route.app, "metrics_tracked", False):
+            route.app = track_in_progress(route.app, route.path)
+            route.app.metrics_tracked = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("metrics_query_start", None)
+    if start is None:
+        return
+    DB_QUERY_SECONDS.observe(time.perf_counter() - start)
+    DB_QUERIES.inc()
+    queries = request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+
+
+def instrument_engine(engine: Engine):
+    """Время и число запросов по событиям движка, занятость пула - при чтении /metrics"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    pool = engine.pool
+
+    # Размер и переполнение есть только у QueuePool. overflow() отсчитывается от -size
+    def pool_state():
+        if hasattr(pool, "checkedout"):
+            yield ("checked_out",), pool.checkedout()
+            yield ("overflow",), max(pool.overflow(), 0)
+            yield ("size",), pool.size()
+
+    REGISTRY.register(CallbackMetric("db_pool_connections", "Соединения пула БД", "gauge", pool_state, ("state",)))
+
+
+def instrument_manager(manager):
+    """Подключения и потерянные сообщения ConnectionManager, считываются при запросе /metrics"""
+    REGISTRY.register(CallbackMetric(
+        "ws_connections", "Активные подключения к уведомлениям (WebSocket и SSE)", "gauge",
+        lambda: [((), len(manager.connections))],
+    ))
+    REGISTRY.register(CallbackMetric(
+        "ws_dropped_sends_total", "Неотправленные сообщения: переполнение очереди или ошибка отправки", "counter",
+        lambda: [(("queue_full",), manager.dropped_messages), (("send_failed",), manager.failed_sends)],
+        ("reason",),
+    ))
+    REGISTRY.register(CallbackMetric(
+        "ws_closed_connections_total", "Подключения, отклонённые сверх лимита или закрытые по неактивности", "counter",
+        lambda: [(("rejected",), manager.rejected_connections), (("idle",), manager.reaped_connections)],
+        ("reason",),
+    ))
@@ -0,0 +1,235 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+import asyncio, json, logging, math, time
+
+from fastapi import WebSocket
+from sqlalchemy import Connection, Engine, delete, func, insert, select, update
+from sqlmodel import Session
+
+import config
+from general.connection_manager import ConnectionManager, event_topics
+from general.item_bulk import ID_CHUNK_SIZE
+from general.stock_channel import StockChannel
+from models.item import Item
+from models.notification import NotificationOutbox, NotificationRelay
+
+logger = logging.getLogger(__name__)
+
+# Тип события журнала только для публичной рассылки остатков (менеджерам не отправляется)
+STOCK_EVENT = "stock"
+
+
+# Запись события о покупке в журнал. Коммит выполняет вызывающий код вместе со списанием товара,
+# поэтому уведомление не теряется при сбое и не отправляется при откате
+def add_purchase_event(session: Session, username: str, item: Item, quantity: int):
+    payload = {
+        "username": username,
+        "item": item.name,
+        "quantity": quantity,
+        # Поля для маршрутизации по темам подписки
+        "item_id": item.id,
+        "category_id": item.category_id,
+        "brand_id": item.brand_id,
+        "remaining": item.quantity,
+    }
+    session.add(NotificationOutbox(payload=json.dumps(payload)))
+
+
+# Запись остатков товаров после пополнения в журнал: каждый воркер передаст их своим зрителям.
+# Остатки читаются в транзакции вызывающего кода после обновления, коммит выполняет он же
+def add_stock_event(session: Session, item_ids: Iterable[int]):
+    ids = list(item_ids)
+    stock = {}
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        stock.update(session.execute(select(Item.id, Item.quantity).where(Item.id.in_(chunk))).tuples().all())
+    if stock:
+        session.add(NotificationOutbox(payload=json.dumps({"type": STOCK_EVENT, "stock": stock})))
+
+
+def select_events(connection: Connection, after_id: int, limit: int, upto: int | None = None) -> list[tuple[int, str]]:
+    query = select(NotificationOutbox.id, NotificationOutbox.payload).where(NotificationOutbox.id > after_id)
+    if upto is not None:
+        query = query.where(NotificationOutbox.id <= upto)
+    return list(connection.execute(query.order_by(NotificationOutbox.id).limit(limit)).tuples())
+
+
+def read_events(engine: Engine, after_id: int, limit: int, upto: int | None = None) -> list[tuple[int, str]]:
+    with engine.connect() as connection:
+        return select_events(connection, after_id, limit, upto)
+
+
+# Следующие неопубликованные события для общей шины. Курсор notification_relay сдвигается
+# в той же транзакции, поэтому одно событие забирает только один воркер
+def claim_events(engine: Engine, limit: int) -> list[tuple[int, str]]:
+    cursor = select(NotificationRelay.last_id).where(NotificationRelay.id == 1)
+    with engine.connect() as connection:
+        # Без новых событий блокировка записи не берётся
+        if not connection.execute(select(func.max(NotificationOutbox.id) > cursor.scalar_subquery())).scalar():
+            return []
+    with engine.begin() as connection:
+        # Первая запись в транзакции берёт блокировку записи SQLite: воркеры забирают события по очереди
+        connection.execute(update(NotificationRelay).where(NotificationRelay.id == 1).values(last_id=NotificationRelay.last_id))
+        rows = select_events(connection, connection.execute(cursor).scalar_one(), limit)
+        if rows:
+            connection.execute(update(NotificationRelay).where(NotificationRelay.id == 1).values(last_id=rows[-1][0]))
+        return rows
+
+
+def to_event(event_id: int, payload: str) -> dict:
+    return {"id": event_id} | json.loads(payload)
+
+
+# Фоновая рассылка журнала через шину менеджера. С локальной шиной каждый воркер читает
+# все новые строки общей таблицы сам. С общей шиной (Redis, SQLite) события забирает
+# по очереди один из воркеров и публикует их, а шина доставляет их всем воркерам.
+# Диспетчер становится обработчиком шины: события передаются менеджеру и в рассылку остатков
+class OutboxDispatcher:
+    def __init__(
+        self,
+        engine: Engine,
+        manager: ConnectionManager,
+        poll_interval: float = config.OUTBOX_POLL_INTERVAL,
+        batch_size: int = config.OUTBOX_BATCH_SIZE,
+        replay_limit: int = config.OUTBOX_REPLAY_LIMIT,
+        retention: float = config.OUTBOX_RETENTION,
+        stock: StockChannel | None = None,
+    ):
+        self.engine = engine
+        self.manager = manager
+        self.bus = manager.bus
+        self.bus.handler = self._on_bus_message
+        # Остатки после покупок и пополнений передаются в публичную рассылку
+        self.stock = stock
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.replay_limit = replay_limit
+        self.retention = retention
+        # Номер последнего события, переданного менеджеру, и последнего прочитанного из журнала
+        # при локальной шине (при общей - курсор notification_relay)
+        self.last_id = 0
+        self.read_id = 0
+        self._wakeup = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        # События, записанные до запуска, доступны только через восстановление по last_event_id
+        self.last_id = self.read_id = await asyncio.to_thread(self._max_id)
+        if self.bus.shared:
+            await asyncio.to_thread(self._init_relay, self.last_id)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._loop = None
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    # Немедленный опрос журнала после коммита в этом воркере. Синхронные обработчики
+    # вызывают его из пула потоков, тогда событие устанавливается в цикле диспетчера
+    def wake(self):
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def dispatch_once(self):
+        while True:
+            if self.bus.shared:
+                rows = await asyncio.to_thread(claim_events, self.engine, self.batch_size)
+            else:
+                rows = await asyncio.to_thread(read_events, self.engine, self.read_id, self.batch_size)
+            for event_id, payload in rows:
+                self.read_id = event_id
+                await self.bus.publish(json.dumps(to_event(event_id, payload)))
+            if len(rows) < self.batch_size:
+                return
+
+    async def _on_bus_message(self, message: str):
+        await self.deliver(json.loads(message))
+
+    # Событие из шины: события журнала с номером, уже переданным менеджеру, пропускаются
+    async def deliver(self, event: dict):
+        event_id = event.get("id")
+        if event_id is not None:
+            if event_id <= self.last_id:
+                return
+            self.last_id = event_id
+        if event.get("type") == STOCK_EVENT:
+            if self.stock is not None:
+                for item_id, quantity in event["stock"].items():
+                    self.stock.publish(int(item_id), quantity)
+            return
+        await self.manager.deliver_event(event)
+        if self.stock is not None and event.get("item_id") is not None:
+            self.stock.publish(event["item_id"], event["remaining"])
+
+    # Отправка подключению событий после after_id, пропущенных за время отключения.
+    # Живые события на время восстановления придерживаются для этого подключения
+    async def replay(self, websocket: WebSocket, after_id: int):
+        manager = self.manager
+        queue = manager.queues.get(websocket)
+        if queue is None:
+            return
+        manager.cursors[websocket] = math.inf
+        cursor = max(after_id, self.last_id - self.replay_limit)
+        try:
+            # last_id растёт, пока идёт чтение, поэтому догоняем его до совпадения
+            while cursor < self.last_id and manager.queues.get(websocket) is queue:
+                rows = await asyncio.to_thread(read_events, self.engine, cursor, self.batch_size, self.last_id)
+                if not rows:
+                    break
+                for event_id, payload in rows:
+                    event = to_event(event_id, payload)
+                    if event.get("type") != STOCK_EVENT and manager.wants(websocket, event_topics(event)):
+                        await asyncio.wait_for(queue.put(json.dumps(event)), manager.send_timeout)
+                    cursor = event_id
+            cursor = max(cursor, self.last_id)
+        except asyncio.TimeoutError:
+            # Клиент не принимает сообщения - его отключит отправляющая задача
+            pass
+        finally:
+            if websocket in manager.cursors:
+                manager.cursors[websocket] = cursor
+
+    async def cleanup(self):
+        expires = datetime.now(timezone.utc) - timedelta(seconds=self.retention)
+        await asyncio.to_thread(self._delete_before, expires)
+
+    def _max_id(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(select(func.coalesce(func.max(NotificationOutbox.id), 0))).scalar_one()
+
+    # Курсор общей шины создаётся при первом запуске любого воркера
+    def _init_relay(self, last_id: int):
+        with self.engine.begin() as connection:
+            connection.execute(insert(NotificationRelay).prefix_with("OR IGNORE").values(id=1, last_id=last_id))
+
+    def _delete_before(self, expires: datetime):
+        with self.engine.begin() as connection:
+            connection.execute(delete(NotificationOutbox).where(NotificationOutbox.created_at < expires))
+
+    async def _run(self):
+        last_cleanup = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.dispatch_once()
+                if time.monotonic() - last_cleanup > min(self.retention, 3600):
+                    last_cleanup = time.monotonic()
+                    await self.cleanup()
+            except Exception:
+                logger.exception("Ошибка рассылки журнала уведомлений")
@@ -1,9 +1,13 @@
 from passlib.context import CryptContext
 
+from general.tracing import tracer
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with tracer.span("password.hash"):
+        return pwd_context.hash(password)
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
-    return pwd_context.verify(plain_password, password_hash)
+    with tracer.span("password.verify"):
+        return pwd_context.verify(plain_password, password_hash)
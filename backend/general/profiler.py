@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+import json, logging, re, sys, threading, time
+
+import anyio
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Поток, ожидающий в этих модулях, простаивает: такие выборки не записываются
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+SUFFIX = ".speedscope.json"
+PROFILE_NAME = re.compile(r"[\w.-]+\.speedscope\.json")
+
+
+# Выборочный профилировщик: отдельный поток каждые interval секунд снимает стеки всех потоков
+# процесса (sys._current_frames). Асинхронные эндпоинты выполняются в потоке цикла событий,
+# синхронные - в пуле потоков, поэтому в профиль попадают все потоки, занятые работой
+class Sampler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        # (функция, файл, строка) -> номер кадра в профиле
+        self.frames: dict[tuple[str, str, int], int] = {}
+        # Поток -> выборки (стек от корня к листу, длительность)
+        self.samples: dict[int, list[tuple[list[int], float]]] = {}
+        # Имена запоминаются при первой выборке: к концу профиля поток может завершиться
+        self.thread_names: dict[int, str] = {}
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            # Вес выборки - фактическое время с предыдущей: поток выборки тоже ждёт GIL
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = self._stack(frame)
+                if not stack:
+                    continue
+                if ident not in self.samples:
+                    self.samples[ident] = []
+                    self.thread_names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                self.samples[ident].append((stack, weight))
+
+    def _stack(self, frame) -> list[int] | None:
+        if frame.f_code.co_filename.endswith(IDLE_MODULES):
+            return None
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self.frames.get(key)
+            if index is None:
+                index = self.frames[key] = len(self.frames)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def speedscope(self, name: str) -> dict:
+        """Профиль в формате speedscope (https://www.speedscope.app), по профилю на поток"""
+        profiles = [
+            {
+                "type": "sampled",
+                "name": self.thread_names.get(ident, str(ident)),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weight for _, weight in samples),
+                "samples": [stack for stack, _ in samples],
+                "weights": [weight for _, weight in samples],
+            }
+            for ident, samples in self.samples.items()
+        ]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "backend.general.profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": function, "file": file, "line": line} for function, file, line in self.frames]},
+            "profiles": profiles,
+        }
+
+
+@dataclass
+class ProfileTarget:
+    route: BaseRoute
+    method: str
+    remaining: int
+    interval: float
+
+
+def slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+
+
+# Профилирование следующих N запросов к маршруту. Пока профилировщик не включён,
+# middleware только проверяет одно поле
+class RequestProfiler:
+    def __init__(self, directory: str = config.PROFILER_DIR, max_files: int = config.PROFILER_MAX_FILES):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.target: ProfileTarget | None = None
+
+    def arm(self, route: BaseRoute, method: str, requests: int, interval: float = config.PROFILER_INTERVAL):
+        self.target = ProfileTarget(route, method, requests, interval)
+
+    def disarm(self):
+        self.target = None
+
+    # Запрос подходит под включённый маршрут - место в счётчике занимается сразу,
+    # чтобы параллельные запросы не превысили N
+    def claim(self, scope: Scope) -> ProfileTarget | None:
+        target = self.target
+        if target is None or scope["method"] != target.method:
+            return None
+        match, _ = target.route.matches(scope)
+        if match != Match.FULL:
+            return None
+        target.remaining -= 1
+        if target.remaining <= 0:
+            self.target = None
+        return target
+
+    def profiles(self) -> list[dict]:
+        if not self.directory.is_dir():
+            return []
+        files = sorted(self.directory.glob(f"*{SUFFIX}"), key=lambda path: path.name, reverse=True)
+        return [{"name": path.name, "size": path.stat().st_size} for path in files]
+
+    def path(self, name: str) -> Path | None:
+        if not PROFILE_NAME.fullmatch(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+    def save(self, sampler: Sampler, method: str, route: str) -> Path:
+        sampler.stop()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{method}-{slug(route)}"
+        path = self.directory / f"{name}{SUFFIX}"
+        path.write_text(json.dumps(sampler.speedscope(f"{method} {route} {sampler.duration * 1000:.1f} мс")))
+        # Старые профили удаляются, каталог не растёт без ограничений
+        for old in sorted(self.directory.glob(f"*{SUFFIX}"), key=lambda path: path.name)[:-self.max_files]:
+            old.unlink(missing_ok=True)
+        return path
+
+
+class ProfilerMiddleware:
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        target = self.profiler.claim(scope) if scope["type"] == "http" and self.profiler.target else None
+        if target is None:
+            await self.app(scope, receive, send)
+            return
+
+        sampler = Sampler(target.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Остановка потока выборки и запись файла не блокируют цикл событий
+            path = await anyio.to_thread.run_sync(self.profiler.save, sampler, target.method, target.route.path)
+            logger.info("Профиль запроса %s %s: %s", target.method, scope["path"], path)
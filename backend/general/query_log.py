@@ -0,0 +1,109 @@
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import logging, re, time
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Максимальная длина параметров запроса в журнале
+MAX_PARAMETERS_LENGTH = 500
+# Развёрнутый IN (?, ?, ...) с разным числом элементов - один и тот же запрос
+IN_LIST = re.compile(r"\(\?(?:, \?)+\)")
+
+
+class RepeatedQueryError(AssertionError):
+    pass
+
+
+# Запросы к БД одного запроса HTTP: маршрут и число выполнений каждого текста SQL
+@dataclass
+class RequestQueries:
+    scope: Scope
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def route(self) -> str:
+        # Шаблон маршрута FastAPI записывает в scope при маршрутизации
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+
+current_request: ContextVar[RequestQueries | None] = ContextVar("current_request", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    return IN_LIST.sub("(?)", " ".join(statement.split()))
+
+
+def format_parameters(parameters) -> str:
+    text = repr(parameters)
+    return text if len(text) <= MAX_PARAMETERS_LENGTH else text[:MAX_PARAMETERS_LENGTH] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_log_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("query_log_start", None)
+    if start is None:
+        return
+    request = current_request.get()
+    threshold = config.SLOW_QUERY_THRESHOLD
+    if threshold is not None:
+        duration = time.perf_counter() - start
+        if duration >= threshold:
+            logger.warning(
+                "Медленный запрос %.3f с [%s]: %s; параметры: %s",
+                duration, request.route if request else "вне запроса HTTP", statement, format_parameters(parameters),
+            )
+    if request is not None and config.QUERY_REPEAT_LIMIT is not None:
+        request.statements[statement] += 1
+
+
+def enable_query_log(engine: Engine):
+    """Журнал медленных запросов и подсчёт повторов по событиям движка"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def repeated_statements(request: RequestQueries, limit: int) -> dict[str, int]:
+    shapes = Counter()
+    for statement, count in request.statements.items():
+        shapes[statement_shape(statement)] += count
+    return {shape: count for shape, count in shapes.items() if count > limit}
+
+
+# Связывает запросы к БД с запросом HTTP. При QUERY_REPEAT_LIMIT сообщает о запросах,
+# выполненных одинаковым текстом больше QUERY_REPEAT_LIMIT раз - обычно это ленивая
+# загрузка связи в цикле (N+1)
+class QueryLogMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestQueries(scope)
+        token = current_request.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+
+        limit = config.QUERY_REPEAT_LIMIT
+        if limit is None:
+            return
+        for shape, count in repeated_statements(request, limit).items():
+            message = f"Запрос выполнен {count} раз [{request.route}], возможно N+1: {shape}"
+            if config.QUERY_REPEAT_RAISE:
+                raise RepeatedQueryError(message)
+            logger.warning(message)
@@ -0,0 +1,206 @@
+from dataclasses import dataclass
+from typing import Iterator
+from itertools import permutations
+import argparse, logging, random, time
+
+from sqlalchemy import Connection, Engine, create_engine, func, insert, select, text
+from sqlmodel import SQLModel
+
+import config
+from models.brand import Brand
+from models.category import Category
+from models.cover import Cover
+from models.item import Item, Image
+from models.user import User, Role
+from general.password import get_password_hash
+
+logger = logging.getLogger(__name__)
+
+# Категории: название, названия товаров, характеристики для названия и описания
+CATALOG = {
+    "Смартфоны": (["Смартфон"], ["128 ГБ", "256 ГБ", "512 ГБ", "6,1\"", "6,7\"", "5G", "Dual SIM"]),
+    "Ноутбуки": (["Ноутбук", "Ультрабук"], ["14\"", "15,6\"", "16 ГБ ОЗУ", "SSD 512 ГБ", "SSD 1 ТБ", "IPS"]),
+    "Планшеты": (["Планшет"], ["10,9\"", "11\"", "64 ГБ", "256 ГБ", "Wi-Fi", "LTE"]),
+    "Наушники": (["Наушники", "Гарнитура"], ["беспроводные", "накладные", "внутриканальные", "с шумоподавлением"]),
+    "Мониторы": (["Монитор"], ["24\"", "27\"", "32\"", "4K", "144 Гц", "IPS"]),
+    "Телевизоры": (["Телевизор"], ["43\"", "55\"", "65\"", "4K UHD", "Smart TV", "QLED"]),
+    "Умные часы": (["Умные часы", "Фитнес-браслет"], ["AMOLED", "GPS", "NFC", "пульсометр"]),
+    "Аксессуары": (["Чехол", "Защитное стекло", "Кабель USB-C", "Зарядное устройство", "Внешний аккумулятор"], ["20 Вт", "65 Вт", "1 м", "2 м", "10000 мА·ч"]),
+    "Клавиатуры и мыши": (["Клавиатура", "Мышь", "Игровая мышь"], ["беспроводная", "механическая", "Bluetooth", "RGB-подсветка"]),
+    "Бытовая техника": (["Пылесос", "Робот-пылесос", "Чайник", "Кофемашина", "Микроволновая печь"], ["1800 Вт", "1,7 л", "20 л", "с влажной уборкой"]),
+}
+BRANDS = [
+    "Samsung", "Apple", "Xiaomi", "Huawei", "Honor", "Realme", "Lenovo", "ASUS", "Acer", "HP",
+    "Dell", "MSI", "Sony", "LG", "Philips", "Bosch", "Redmond", "Polaris", "Яндекс", "Сбер",
+    "Digma", "Dexp", "Defender", "Logitech", "JBL", "Redragon", "Anker", "Baseus", "Tefal", "Vitek",
+]
+COLORS = ["чёрный", "белый", "серый", "серебристый", "синий", "зелёный", "красный", "золотистый"]
+ADVANTAGES = [
+    "Лёгкий и прочный корпус подходит для ежедневного использования.",
+    "Гарантия производителя 12 месяцев.",
+    "Поставляется в фирменной упаковке с документацией на русском языке.",
+    "Энергоэффективная модель с низким уровнем шума.",
+    "Поддерживает быструю зарядку и обновления по воздуху.",
+    "Сертифицирован для продажи в России.",
+    "Простая настройка без дополнительных программ.",
+]
+
+# Учётные записи по умолчанию, как в db.create_users
+DEFAULT_USERS = [("admin", Role.ADMIN, "adminadmin"), ("manager", Role.MANAGER, "managermanager"), ("user", Role.USER, "useruser")]
+# Пароль сгенерированных пользователей
+USER_PASSWORD = "useruser"
+
+# Ускорение загрузки: журнал в памяти, без fsync, без проверки внешних ключей.
+# Настройки действуют только на соединение загрузки и пропадают при его закрытии
+LOAD_PRAGMAS = [
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA foreign_keys=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+]
+
+
+@dataclass
+class SeedReport:
+    brands: int = 0
+    categories: int = 0
+    users: int = 0
+    items: int = 0
+    covers: int = 0
+    images: int = 0
+    seconds: float = 0.0
+
+
+def username(number: int) -> str:
+    return f"user_{number}"
+
+
+def model_number(rng: random.Random) -> str:
+    return f"{rng.choice('ABCDEFGHKMNPRSTXZ')}{rng.choice('ABCDEFGHKMNPRSTXZ')}-{rng.randint(100, 9999)}"
+
+
+def generate_items(rng: random.Random, count: int, start: int, brands: int, categories: list[str], images_per_item: int) -> Iterator[tuple[dict, dict, list[dict]]]:
+    """Товар, его обложка и изображения. Изображения - заглушки: файлы в хранилище не создаются"""
+    # Части описаний собираются заранее: один выбор из списка дешевле rng.sample на каждый товар
+    advantages = [" ".join(texts) for texts in permutations(ADVANTAGES, 3)]
+    specifications = {category: [", ".join(pair) for pair in permutations(CATALOG[category][1], 2)] for category in categories}
+    for id in range(start, start + count):
+        category_id = rng.randrange(len(categories))
+        nouns, features = CATALOG[categories[category_id]]
+        noun, brand_id = rng.choice(nouns), rng.randrange(brands)
+        feature, color = rng.choice(features), rng.choice(COLORS)
+        name = f"{noun} {BRANDS[brand_id]} {model_number(rng)} {feature} {color}"
+        description = f"{name}. {rng.choice(advantages)} Характеристики: {rng.choice(specifications[categories[category_id]])}."
+        yield (
+            {
+                "id": id,
+                "name": name,
+                "description": description,
+                "price": rng.randint(2, 20000) * 50 - 1,
+                "quantity": rng.randint(0, 500),
+                "brand_id": brand_id + 1,
+                "category_id": category_id + 1,
+                "cover_id": id,
+            },
+            {"id": id, "name": f"seed_cover_{id}.jpg"},
+            [{"name": f"seed_image_{id}_{number}.jpg", "item_id": id} for number in range(images_per_item)],
+        )
+
+
+def load(connection: Connection, report: SeedReport, rng: random.Random, items: int, users: int, images_per_item: int, batch_size: int):
+    report.brands = len(BRANDS)
+    report.categories = len(CATALOG)
+    connection.execute(insert(Brand.__table__), [{"id": i + 1, "name": name} for i, name in enumerate(BRANDS)])
+    connection.execute(insert(Category.__table__), [{"id": i + 1, "name": name} for i, name in enumerate(CATALOG)])
+
+    # bcrypt считается один раз на каждый пароль, а не на каждого пользователя
+    hashes = {password: get_password_hash(password) for password in {USER_PASSWORD, *(user[2] for user in DEFAULT_USERS)}}
+    rows = [{"username": name, "role": role, "password_hash": hashes[password]} for name, role, password in DEFAULT_USERS]
+    rows += [{"username": username(number), "role": Role.USER, "password_hash": hashes[USER_PASSWORD]} for number in range(users)]
+    for start in range(0, len(rows), batch_size):
+        connection.execute(insert(User.__table__), rows[start:start + batch_size])
+    report.users = len(rows)
+
+    generated = generate_items(rng, items, 1, len(BRANDS), list(CATALOG), images_per_item)
+    while True:
+        batch = [row for _, row in zip(range(batch_size), generated)]
+        if not batch:
+            break
+        # Обложки раньше товаров: при включённых внешних ключах порядок тоже был бы корректным
+        connection.execute(insert(Cover.__table__), [cover for _, cover, _ in batch])
+        connection.execute(insert(Item.__table__), [item for item, _, _ in batch])
+        images = [image for _, _, rows in batch for image in rows]
+        if images:
+            connection.execute(insert(Image.__table__), images)
+        report.items += len(batch)
+        report.covers += len(batch)
+        report.images += len(images)
+        logger.info("Товаров: %d", report.items)
+
+
+def seed(
+    engine: Engine,
+    items: int,
+    users: int = 100,
+    images_per_item: int = 1,
+    reset: bool = False,
+    seed: int = 0,
+    batch_size: int = config.SEED_BATCH_SIZE,
+) -> SeedReport:
+    """Синтетический каталог: бренды, категории, товары с обложками и изображениями, пользователи.
+    Все строки записываются одной транзакцией. При одинаковом seed содержимое совпадает"""
+    started = time.perf_counter()
+    if reset:
+        SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    report = SeedReport()
+    with engine.connect() as connection:
+        # Заполняется только пустая база: id генерируются с единицы
+        for model in (Brand, Category, Item, User, Cover, Image):
+            if connection.execute(select(func.count()).select_from(model)).scalar_one():
+                raise RuntimeError(f"Таблица {model.__tablename__} не пуста, используйте --reset")
+        for pragma in LOAD_PRAGMAS:
+            connection.execute(text(pragma))
+        # Вторичные индексы строятся один раз после загрузки, а не обновляются при каждой вставке
+        indexes = [index for model in (Item, Image) for index in model.__table__.indexes]
+        for index in indexes:
+            index.drop(connection)
+        try:
+            load(connection, report, random.Random(seed), items, users, images_per_item, batch_size)
+            for index in indexes:
+                index.create(connection)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            # DROP INDEX выполняется вне транзакции загрузки, индексы возвращаются отдельно
+            for index in indexes:
+                index.create(connection, checkfirst=True)
+            connection.commit()
+            raise
+    engine.dispose()
+    report.seconds = round(time.perf_counter() - started, 2)
+    return report
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Заполнение базы синтетическим каталогом для нагрузочных тестов и стенда")
+    parser.add_argument("--database", default=config.SQLITE_URL, help="адрес базы SQLAlchemy (по умолчанию config.SQLITE_URL)")
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=100, help=f"пользователей кроме admin/manager/user, пароль {USER_PASSWORD}")
+    parser.add_argument("--images", type=int, default=1, help="изображений-заглушек на товар")
+    parser.add_argument("--seed", type=int, default=0, help="начальное значение генератора")
+    parser.add_argument("--batch-size", type=int, default=config.SEED_BATCH_SIZE)
+    parser.add_argument("--reset", action="store_true", help="удалить все таблицы перед заполнением")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    engine = create_engine(args.database)
+    report = seed(engine, args.items, args.users, args.images, args.reset, args.seed, args.batch_size)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+import config
+
+# Быстрая сериализация списков. По умолчанию FastAPI проверяет результат эндпоинта по response_model,
+# превращает модели в словари и списки Python и кодирует их модулем json. Здесь проверка
+# и кодирование выполняются в pydantic-core одним проходом, сразу в байты JSON.
+# response_model у маршрута остаётся для документации OpenAPI
+
+
+class JSONBytesResponse(Response):
+    """Ответ JSON из готовых байтов, которые передаются как есть"""
+
+    media_type = "application/json"
+
+
+def dump_json(adapter: TypeAdapter, content: Any) -> bytes:
+    """Проверка content по типу адаптера (из атрибутов объектов ORM) и JSON в байтах"""
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def serialize(adapter: TypeAdapter, content: Any) -> Any:
+    """Ответ эндпоинта: при FAST_SERIALIZATION - готовый JSONBytesResponse, иначе content
+    без изменений для обычной обработки FastAPI"""
+    if not config.FAST_SERIALIZATION:
+        return content
+    return JSONBytesResponse(dump_json(adapter, content))
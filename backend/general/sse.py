@@ -0,0 +1,49 @@
+from typing import AsyncIterator
+import asyncio, json
+
+
+# Кадр Server-Sent Events из сообщения ConnectionManager. Номер события журнала
+# передаётся в поле id - браузер вернёт его в заголовке Last-Event-ID при переподключении
+def format_event(message: str) -> str:
+    data = json.loads(message)
+    if data.get("type") == "ping":
+        return ": ping\n\n"
+    if data.get("id") is not None:
+        return f"id: {data['id']}\ndata: {message}\n\n"
+    return f"data: {message}\n\n"
+
+
+# Подключение SSE с интерфейсом WebSocket, который использует ConnectionManager.
+# Очередь менеджера и задача отправки остаются прежними, send_text ждёт,
+# пока поток ответа заберёт предыдущий кадр
+class SSEConnection:
+    def __init__(self):
+        self._frames: asyncio.Queue[str | None] = asyncio.Queue(1)
+        self.closed = False
+        self.close_code: int | None = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.closed:
+            raise RuntimeError("Подключение закрыто")
+        await self._frames.put(message)
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+        self.close_code = code
+        # Неотправленный кадр заменяется признаком завершения потока
+        while True:
+            try:
+                self._frames.put_nowait(None)
+                return
+            except asyncio.QueueFull:
+                self._frames.get_nowait()
+
+    async def frames(self) -> AsyncIterator[str]:
+        while True:
+            message = await self._frames.get()
+            if message is None:
+                return
+            yield format_event(message)
@@ -0,0 +1,84 @@
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict
+import asyncio, time
+
+import config
+
+
+# Остаток одного товара и общее для всех его зрителей событие об изменении
+@dataclass
+class ItemStock:
+    # None - остаток ещё не прочитан первым зрителем и не публиковался
+    quantity: int | None = None
+    version: int = 0
+    subscribers: int = 0
+    sent_at: float = 0
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    flush: asyncio.TimerHandle | None = None
+
+
+# Публичная рассылка остатков товаров. Подписчик не хранит очередь сообщений:
+# все зрители товара ждут одно событие и после пробуждения читают последний остаток,
+# поэтому промежуточные изменения объединяются, а память на подключение минимальна
+class StockChannel:
+    def __init__(self, interval: float = config.STOCK_UPDATE_INTERVAL):
+        # Не чаще одного обновления товара за interval секунд
+        self.interval = interval
+        self.items: Dict[int, ItemStock] = {}
+
+    def publish(self, item_id: int, quantity: int):
+        stock = self.items.get(item_id)
+        # Товар никто не смотрит
+        if stock is None or stock.quantity == quantity and stock.flush is None:
+            return
+        stock.quantity = quantity
+        if stock.flush is None:
+            delay = max(0.0, stock.sent_at + self.interval - time.monotonic())
+            stock.flush = asyncio.get_running_loop().call_later(delay, self._flush, stock)
+
+    def _flush(self, stock: ItemStock):
+        stock.flush = None
+        stock.sent_at = time.monotonic()
+        stock.version += 1
+        # Будим всех текущих зрителей, новые ждут уже следующее событие
+        changed, stock.changed = stock.changed, asyncio.Event()
+        changed.set()
+
+    # Остатки товара: сначала текущий, затем изменения. None - сигнал для keep-alive,
+    # если изменений не было keepalive секунд. Текущий остаток читается read_quantity после
+    # регистрации зрителя, поэтому изменение между чтением и подпиской не теряется.
+    # Если read_quantity вернул None (товара нет), поток завершается без значений
+    async def subscribe(
+        self,
+        item_id: int,
+        read_quantity: Callable[[], Awaitable[int | None]],
+        keepalive: float = config.STOCK_KEEPALIVE,
+    ) -> AsyncIterator[int | None]:
+        stock = self.items.get(item_id)
+        if stock is None:
+            stock = self.items[item_id] = ItemStock()
+        stock.subscribers += 1
+        try:
+            version = stock.version
+            quantity = await read_quantity()
+            if quantity is None:
+                return
+            if stock.quantity is None:
+                stock.quantity = quantity
+            yield quantity
+            while True:
+                if stock.version == version:
+                    try:
+                        async with asyncio.timeout(keepalive):
+                            await stock.changed.wait()
+                    except TimeoutError:
+                        yield None
+                        continue
+                version = stock.version
+                yield stock.quantity
+        finally:
+            stock.subscribers -= 1
+            if not stock.subscribers:
+                if stock.flush:
+                    stock.flush.cancel()
+                self.items.pop(item_id, None)
@@ -0,0 +1,301 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator
+from urllib.parse import quote
+from xml.etree import ElementTree
+import hashlib, hmac, os
+
+import anyio
+import httpx
+
+import config
+
+# Размер блока при потоковой записи файла
+CHUNK_SIZE = 64 * 2 ** 10
+
+# Количество файлов, получаемых за одно обращение при обходе хранилища
+LIST_PAGE_SIZE = 1000
+
+
+class StorageError(Exception):
+    pass
+
+
+class Storage(ABC):
+    @abstractmethod
+    async def put_stream(self, name: str, stream: AsyncIterable[bytes]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, name: str) -> None:
+        ...
+
+    @abstractmethod
+    async def exists(self, name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def url(self, name: str) -> str:
+        ...
+
+    # Потоковый обход хранилища: пары (имя файла, время изменения в секундах Unix)
+    @abstractmethod
+    def iter_files(self) -> AsyncIterator[tuple[str, float]]:
+        ...
+
+    # Освобождение соединений при остановке приложения
+    async def close(self) -> None:
+        pass
+
+
+# Хранение изображений в локальном каталоге
+class LocalStorage(Storage):
+    def __init__(self, root: str | None = None, base_url: str | None = None):
+        # Если каталог не задан явно, он берётся из конфигурации при каждом обращении
+        self._root = root
+        self._base_url = base_url
+
+    @property
+    def root(self) -> str:
+        return self._root if self._root is not None else config.UPLOAD_FOLDER
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    async def put_stream(self, name: str, stream: AsyncIterable[bytes]) -> None:
+        file_path = self.path(name)
+        try:
+            async with await anyio.open_file(file_path, "wb") as buffer:
+                async for chunk in stream:
+                    await buffer.write(chunk)
+        except BaseException:
+            # Не оставляем недописанный файл
+            with anyio.CancelScope(shield=True):
+                try:
+                    await anyio.to_thread.run_sync(os.remove, file_path)
+                except OSError:
+                    pass
+            raise
+
+    async def delete(self, name: str) -> None:
+        await anyio.to_thread.run_sync(os.remove, self.path(name))
+
+    async def exists(self, name: str) -> bool:
+        return await anyio.to_thread.run_sync(os.path.isfile, self.path(name))
+
+    def url(self, name: str) -> str:
+        base_url = self._base_url if self._base_url is not None else config.UPLOAD_URL
+        return base_url + quote(name)
+
+    async def iter_files(self) -> AsyncIterator[tuple[str, float]]:
+        def next_page(entries) -> tuple[bool, list[tuple[str, float]]]:
+            page = list(islice(entries, LIST_PAGE_SIZE))
+            return bool(page), [(entry.name, entry.stat().st_mtime) for entry in page if entry.is_file()]
+
+        # Каталог читается постранично в отдельном потоке, чтобы не держать весь листинг в памяти
+        entries = await anyio.to_thread.run_sync(os.scandir, self.root)
+        try:
+            while True:
+                has_more, files = await anyio.to_thread.run_sync(next_page, entries)
+                if not has_more:
+                    break
+                for item in files:
+                    yield item
+        finally:
+            entries.close()
+
+
+# Хранение изображений в S3-совместимом хранилище (AWS S3, MinIO и т. п.)
+class S3Storage(Storage):
+    def __init__(
+        self,
+        endpoint: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        part_size: int = 5 * 2 ** 20,
+        public_url: str | None = None,
+        client: httpx.AsyncClient | None = None,
+    ):
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.part_size = part_size
+        self.public_url = public_url
+        # Клиент HTTP с пулом соединений на всё время жизни хранилища. Переданный клиент
+        # закрывает вызывающий код, созданный здесь закрывается в close()
+        self._client = client
+        self._owns_client = False
+
+    def _path(self, name: str) -> str:
+        return f"/{self.bucket}/{quote(name, safe='-_.~')}"
+
+    def _sign(self, method: str, path: str, query: str, payload_hash: str) -> dict[str, str]:
+        # Подпись запроса по схеме AWS Signature Version 4
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = now.strftime("%Y%m%d")
+        host = httpx.URL(self.endpoint).netloc.decode()
+
+        headers = {
+            "host": host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+        }
+        signed_headers = ";".join(headers)
+        canonical_headers = "".join(f"{k}:{v}\n" for k, v in headers.items())
+        canonical_request = "\n".join([method, path, query, canonical_headers, signed_headers, payload_hash])
+
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+
+        key = ("AWS4" + self.secret_key).encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        del headers["host"]
+        return headers
+
+    async def _request(
+        self, method: str, name: str, params: dict[str, str] | None = None, content: bytes = b""
+    ) -> httpx.Response:
+        path = self._path(name)
+        query = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted((params or {}).items())
+        )
+        headers = self._sign(method, path, query, hashlib.sha256(content).hexdigest())
+        url = self.endpoint + path + (f"?{query}" if query else "")
+
+        if self._client is None:
+            self._client = httpx.AsyncClient()
+            self._owns_client = True
+        return await self._client.request(method, url, headers=headers, content=content)
+
+    async def close(self) -> None:
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._owns_client = False
+
+    @staticmethod
+    def _check(response: httpx.Response, *allowed: int) -> httpx.Response:
+        if response.status_code not in (allowed or (200,)):
+            raise StorageError(f"S3 {response.request.method} вернул {response.status_code}: {response.text}")
+        return response
+
+    async def put_stream(self, name: str, stream: AsyncIterable[bytes]) -> None:
+        buffer = bytearray()
+        upload_id = None
+        parts: list[tuple[int, str]] = []
+
+        try:
+            async for chunk in stream:
+                buffer += chunk
+                while len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        upload_id = await self._create_multipart(name)
+                    part = bytes(buffer[:self.part_size])
+                    del buffer[:self.part_size]
+                    parts.append(await self._upload_part(name, upload_id, len(parts) + 1, part))
+
+            # Файл поместился в одну часть - обходимся одним PUT
+            if upload_id is None:
+                self._check(await self._request("PUT", name, content=bytes(buffer)))
+                return
+
+            if buffer:
+                parts.append(await self._upload_part(name, upload_id, len(parts) + 1, bytes(buffer)))
+            await self._complete_multipart(name, upload_id, parts)
+        except BaseException:
+            if upload_id is not None:
+                with anyio.CancelScope(shield=True):
+                    try:
+                        await self._request("DELETE", name, {"uploadId": upload_id})
+                    except Exception:
+                        pass
+            raise
+
+    async def _create_multipart(self, name: str) -> str:
+        response = self._check(await self._request("POST", name, {"uploads": ""}))
+        upload_id = ElementTree.fromstring(response.content).find("{*}UploadId")
+        if upload_id is None or not upload_id.text:
+            raise StorageError("S3 не вернул UploadId")
+        return upload_id.text
+
+    async def _upload_part(self, name: str, upload_id: str, number: int, data: bytes) -> tuple[int, str]:
+        params = {"partNumber": str(number), "uploadId": upload_id}
+        response = self._check(await self._request("PUT", name, params, data))
+        return number, response.headers.get("etag", "")
+
+    async def _complete_multipart(self, name: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        body = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>" for number, etag in parts
+        )
+        content = f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode()
+        response = self._check(await self._request("POST", name, {"uploadId": upload_id}, content))
+        # S3 может вернуть 200 с ошибкой в теле ответа
+        if b"<Error>" in response.content:
+            raise StorageError(f"S3 не смог собрать файл: {response.text}")
+
+    async def delete(self, name: str) -> None:
+        self._check(await self._request("DELETE", name), 200, 204)
+
+    async def exists(self, name: str) -> bool:
+        response = await self._request("HEAD", name)
+        if response.status_code == 404:
+            return False
+        self._check(response)
+        return True
+
+    def url(self, name: str) -> str:
+        base_url = self.public_url if self.public_url is not None else f"{self.endpoint}/{self.bucket}/"
+        return base_url + quote(name)
+
+    async def iter_files(self) -> AsyncIterator[tuple[str, float]]:
+        params = {"list-type": "2", "max-keys": str(LIST_PAGE_SIZE)}
+        while True:
+            response = self._check(await self._request("GET", "", params))
+            root = ElementTree.fromstring(response.content)
+            for content in root.iterfind("{*}Contents"):
+                modified = datetime.fromisoformat(content.findtext("{*}LastModified").replace("Z", "+00:00"))
+                yield content.findtext("{*}Key"), modified.timestamp()
+
+            token = root.findtext("{*}NextContinuationToken")
+            if root.findtext("{*}IsTruncated") != "true" or not token:
+                return
+            params["continuation-token"] = token
+
+
+_storage: Storage | None = None
+
+
+def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        if config.STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                endpoint=config.S3_ENDPOINT,
+                bucket=config.S3_BUCKET,
+                access_key=config.S3_ACCESS_KEY,
+                secret_key=config.S3_SECRET_KEY,
+                region=config.S3_REGION,
+                part_size=config.S3_PART_SIZE,
+                public_url=config.S3_PUBLIC_URL,
+            )
+        else:
+            _storage = LocalStorage()
+    return _storage
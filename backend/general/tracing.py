@@ -0,0 +1,312 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import atexit, json, logging, os, queue, re, threading, time
+
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Трассировка в модели OpenTelemetry: идентификаторы и заголовок traceparent по W3C Trace Context,
+# экспорт в формате OTLP/JSON (строка файла - один пакет resourceSpans, как у файлового экспортёра
+# OpenTelemetry Collector). Пакет opentelemetry не нужен: файл читают Jaeger/Tempo через Collector
+
+TRACEPARENT = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}")
+REQUEST_ID_HEADER = "x-request-id"
+# Длина текста SQL в атрибуте span
+MAX_STATEMENT_LENGTH = 1000
+SPAN_KIND_INTERNAL, SPAN_KIND_SERVER, SPAN_KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    kind: int = SPAN_KIND_INTERNAL
+    start: int = field(default_factory=time.time_ns)
+    end: int | None = None
+    attributes: dict = field(default_factory=dict)
+    status: int = STATUS_OK
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [{"key": key, "value": otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+# Запись span в файл JSON Lines фоновым потоком: цикл событий не ждёт диск
+class FileExporter:
+    def __init__(self, path: str, batch_size: int = 512):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue: queue.SimpleQueue[Span | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        # Оставшиеся в очереди span записываются при завершении процесса
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span):
+        self._queue.put(span)
+
+    def _run(self):
+        while True:
+            spans = [self._queue.get()]
+            while len(spans) < self.batch_size:
+                try:
+                    spans.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in spans
+            spans = [span for span in spans if span is not None]
+            if spans:
+                self._write(spans)
+            if stop:
+                return
+
+    def _write(self, spans: list[Span]):
+        batch = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": config.TRACING_SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+        try:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(batch, ensure_ascii=False) + "\n")
+        except OSError:
+            logger.exception("Не удалось записать трассировку в %s", self.path)
+
+    def shutdown(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+class ConsoleExporter:
+    def export(self, span: Span):
+        logger.info(
+            "span %s %.2f мс trace_id=%s span_id=%s parent=%s %s",
+            span.name, (span.end - span.start) / 1e6, span.trace_id, span.span_id, span.parent_id, span.attributes,
+        )
+
+    def shutdown(self):
+        pass
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        current_span.reset(self.token)
+        if exc_type is not None:
+            self.span.status = STATUS_ERROR
+            self.span.set_attribute("exception.type", exc_type.__name__)
+        self.tracer.finish(self.span)
+        return False
+
+
+class Tracer:
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start(self, name: str, kind: int = SPAN_KIND_INTERNAL, parent: tuple[str, str] | None = None, **attributes) -> Span | None:
+        """Новый span, дочерний к текущему или к parent (trace_id, span_id). Без экспортёра - None"""
+        if self.exporter is None:
+            return None
+        if parent is None:
+            current = current_span.get()
+            parent = (current.trace_id, current.span_id) if current else (os.urandom(16).hex(), None)
+        return Span(name, parent[0], os.urandom(8).hex(), parent[1], kind, attributes=attributes)
+
+    def finish(self, span: Span):
+        span.end = time.time_ns()
+        self.exporter.export(span)
+
+    def span(self, name: str, **attributes):
+        """with tracer.span("имя"): ... - span вокруг блока, при выключенной трассировке ничего не делает"""
+        span = self.start(name, **attributes)
+        if span is None:
+            return NOOP_SPAN
+        return _ActiveSpan(self, span)
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def create_tracer() -> Tracer:
+    if config.TRACING_EXPORTER == "file":
+        return Tracer(FileExporter(config.TRACING_FILE))
+    if config.TRACING_EXPORTER == "console":
+        return Tracer(ConsoleExporter())
+    return Tracer()
+
+
+tracer = create_tracer()
+
+
+def header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+# Корневой span запроса HTTP и идентификатор запроса. Входящий traceparent продолжает
+# трассировку клиента, X-Request-ID возвращается в ответе и попадает в журналы
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        match = TRACEPARENT.fullmatch(header(scope, b"traceparent") or "")
+        if match:
+            parent = (match.group(1), match.group(2))
+        span = self.tracer.start(f"{scope['method']} {scope['path']}", SPAN_KIND_SERVER, parent, **{
+            "http.request.method": scope["method"], "url.path": scope["path"],
+        })
+        rid = header(scope, REQUEST_ID_HEADER.encode()) or (span.trace_id if span else os.urandom(16).hex())
+        rid_token = request_id.set(rid)
+        span_token = current_span.set(span) if span else None
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, rid)
+                if span:
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = STATUS_ERROR
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception as e:
+            if span:
+                span.status = STATUS_ERROR
+                span.set_attribute("exception.type", type(e).__name__)
+            raise
+        finally:
+            request_id.reset(rid_token)
+            if span:
+                current_span.reset(span_token)
+                # Название по шаблону маршрута, как принято в OpenTelemetry для HTTP
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
+                self.tracer.finish(span)
+
+
+# Идентификатор запроса в записях журнала: атрибут request_id и, для журнала доступа uvicorn,
+# в конце сообщения. Журнал доступа пишется при отправке ответа внутри контекста запроса
+class RequestIdFilter(logging.Filter):
+    def __init__(self, append: bool = False):
+        super().__init__()
+        self.append = append
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rid = request_id.get()
+        record.request_id = rid or "-"
+        if self.append and rid and not getattr(record, "request_id_appended", False):
+            record.msg = f"{record.msg} request_id=%s"
+            record.args = (*record.args, rid) if isinstance(record.args, tuple) else (rid,)
+            record.request_id_appended = True
+        return True
+
+
+def instrument_logging():
+    logging.getLogger("uvicorn.access").addFilter(RequestIdFilter(append=True))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_span.get() is None:
+        return
+    span = tracer.start("db.query", SPAN_KIND_CLIENT, **{
+        "db.system": "sqlite",
+        "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        "db.executemany": executemany,
+    })
+    if span:
+        conn.info["tracing_span"] = span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = conn.info.pop("tracing_span", None)
+    if span is not None:
+        if cursor.rowcount >= 0:
+            span.set_attribute("db.rows_affected", cursor.rowcount)
+        tracer.finish(span)
+
+
+def _handle_error(context):
+    span = context.connection.info.pop("tracing_span", None) if context.connection is not None else None
+    if span is not None:
+        span.status = STATUS_ERROR
+        tracer.finish(span)
+
+
+def trace_engine(engine: Engine):
+    """span на каждый запрос к БД внутри трассируемого запроса HTTP. Вне запроса
+    и при выключенной трассировке обработчик только проверяет текущий span"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -1,10 +1,44 @@
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.main import api_router
+from api.deps import dispatcher, loop_monitor, manager, profiler
+
+import config
+from db import create_db_and_tables, engine
+from general.loop_monitor import LoopMonitorMiddleware
+from general.image_sweeper import ImageSweeper, run_periodically
+from general.metrics import MetricsMiddleware, instrument_routes
+from general.query_log import QueryLogMiddleware
+from general.profiler import ProfilerMiddleware
+from general.tracing import TracingMiddleware, instrument_logging
+from general.storage import get_storage
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Измерение задержки цикла событий с запуска, а не с первого запроса
+    loop_monitor.watch()
+    # Подписка на шину уведомлений от других воркеров
+    await manager.start()
+    # Рассылка журнала уведомлений о покупках
+    await dispatcher.start()
+    async with anyio.create_task_group() as tg:
+        # Фоновая очистка осиротевших изображений
+        if config.IMAGE_SWEEP_INTERVAL:
+            sweeper = ImageSweeper(get_storage(), engine, delete=config.IMAGE_SWEEP_DELETE)
+            tg.start_soon(run_periodically, sweeper, config.IMAGE_SWEEP_INTERVAL)
+        yield
+        tg.cancel_scope.cancel()
+    await dispatcher.stop()
+    await manager.stop()
+    await get_storage().close()
+    loop_monitor.stop()
 
-from db import create_db_and_tables
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,6 +49,18 @@ app.add_middleware(
     allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type"],
 )
+# Профилирование запросов по команде администратора (/admin/profiler)
+app.add_middleware(ProfilerMiddleware, profiler=profiler)
+# Связь запросов к БД с маршрутом для журнала медленных запросов и поиска N+1
+app.add_middleware(QueryLogMiddleware)
+# Трассировка и X-Request-ID для всего, что выполняется внутри запроса
+app.add_middleware(TracingMiddleware)
+# Поиск синхронного кода, блокирующего цикл событий в асинхронных обработчиках
+app.add_middleware(LoopMonitorMiddleware, monitor=loop_monitor)
+# Метрики добавляются последними и измеряют обработку запроса вместе с остальными middleware
+app.add_middleware(MetricsMiddleware)
 app.include_router(api_router)
+instrument_routes(app.routes)
+instrument_logging()
 
 create_db_and_tables()
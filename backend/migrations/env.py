@@ -11,6 +11,7 @@ from models.category import *          # Added
 from models.cover import *          # Added
 from models.item import *          # Added
 from models.user import *          # Added
+from models.notification import *          # Added
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
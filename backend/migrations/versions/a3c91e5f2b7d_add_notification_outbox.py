@@ -0,0 +1,37 @@
+"""add notification outbox
+
+Revision ID: a3c91e5f2b7d
+Revises: f552f257d040
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel          # Added
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91e5f2b7d'
+down_revision: Union[str, None] = 'f552f257d040'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('payload', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(op.f('ix_notification_outbox_created_at'), 'notification_outbox', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notification_outbox_created_at'), table_name='notification_outbox')
+    op.drop_table('notification_outbox')
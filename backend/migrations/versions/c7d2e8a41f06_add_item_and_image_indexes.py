@@ -0,0 +1,37 @@
+"""add item and image indexes
+
+Revision ID: c7d2e8a41f06
+Revises: a3c91e5f2b7d
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel          # Added
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e8a41f06'
+down_revision: Union[str, None] = 'a3c91e5f2b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_item_brand_id'), 'item', ['brand_id'], unique=False)
+    op.create_index(op.f('ix_item_category_id'), 'item', ['category_id'], unique=False)
+    op.create_index(op.f('ix_item_cover_id'), 'item', ['cover_id'], unique=False)
+    op.create_index(op.f('ix_item_price'), 'item', ['price'], unique=False)
+    op.create_index(op.f('ix_image_item_id'), 'image', ['item_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_image_item_id'), table_name='image')
+    op.drop_index(op.f('ix_item_price'), table_name='item')
+    op.drop_index(op.f('ix_item_cover_id'), table_name='item')
+    op.drop_index(op.f('ix_item_category_id'), table_name='item')
+    op.drop_index(op.f('ix_item_brand_id'), table_name='item')
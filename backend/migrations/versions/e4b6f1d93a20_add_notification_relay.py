@@ -0,0 +1,33 @@
+"""add notification relay
+
+Revision ID: e4b6f1d93a20
+Revises: c7d2e8a41f06
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel          # Added
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b6f1d93a20'
+down_revision: Union[str, None] = 'c7d2e8a41f06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_relay',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_relay')
@@ -1,5 +1,8 @@
+from pydantic import computed_field
 from sqlmodel import Field, SQLModel
 
+from general.storage import get_storage
+
 
 class CoverBase(SQLModel):
     name: str = Field(min_length=1, max_length=255, unique=True)
@@ -11,3 +14,9 @@ class Cover(CoverBase, table=True):
 
 class CoverRead(CoverBase):
     id: int
+
+    # Адрес файла в текущем хранилище (локальный каталог или S3)
+    @computed_field
+    @property
+    def url(self) -> str:
+        return get_storage().url(self.name)
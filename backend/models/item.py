@@ -1,5 +1,9 @@
+from enum import Enum
+from pydantic import computed_field
 from sqlmodel import Field, SQLModel, Relationship
 
+from general.storage import get_storage
+
 from models.brand import Brand, BrandRead
 from models.category import Category, CategoryRead
 from models.cover import Cover, CoverRead
@@ -13,9 +17,11 @@ class ItemBase(SQLModel):
 
 class Item(ItemBase, table=True):
     id: int | None = Field(None, primary_key=True)
-    brand_id: int = Field(foreign_key="brand.id", ondelete="RESTRICT")
-    category_id: int = Field(foreign_key="category.id", ondelete="RESTRICT")
-    cover_id: int | None = Field(None, foreign_key="cover.id")
+    # Индексы внешних ключей нужны и для фильтров, и для проверок RESTRICT при удалении бренда/категории
+    brand_id: int = Field(foreign_key="brand.id", ondelete="RESTRICT", index=True)
+    category_id: int = Field(foreign_key="category.id", ondelete="RESTRICT", index=True)
+    cover_id: int | None = Field(None, foreign_key="cover.id", index=True)
+    price: int = Field(ge=1, le=10 ** 8, index=True)
     quantity: int | None = Field(0, ge=0, le=10 ** 8)
     brand: Brand | None = Relationship()
     category: Category | None = Relationship()
@@ -41,6 +47,11 @@ class ItemCreate(ItemBase):
     category_id: int
 
 
+# Строка массового импорта: товар вместе с начальным количеством
+class ItemImport(ItemCreate):
+    quantity: int = Field(0, ge=0, le=10 ** 8)
+
+
 class ItemUpdate(ItemBase):
     name: str | None = Field(None, min_length=1, max_length=200)
     description: str | None = Field(None, min_length=1, max_length=1000)
@@ -53,10 +64,56 @@ class CoverUpdate(ItemUpdate):
     cover_id: int | None = None
 
 
+class PriceOperation(str, Enum):
+    SET = "set"
+    ADD = "add"
+    MULTIPLY = "multiply"
+
+
+# Изменение цены всех отобранных товаров: установить, прибавить или умножить
+class PriceExpression(SQLModel):
+    operation: PriceOperation
+    value: float
+
+
+class ItemBulkFilter(SQLModel):
+    category_id: int | None = None
+    brand_id: int | None = None
+
+
+# Массовое изменение: либо поля по id товаров (items), либо фильтр с выражением цены и/или общими полями
+class ItemBulkUpdate(SQLModel):
+    items: dict[int, ItemUpdate] | None = None
+    filter: ItemBulkFilter | None = None
+    price: PriceExpression | None = None
+    fields: ItemUpdate | None = None
+
+
+class ItemBulkResult(SQLModel):
+    updated: int
+    not_found: list[int] = []
+
+
 class ItemAdd(SQLModel):
     quantity: int = Field(0, ge=1, le=10 ** 8)
 
 
+# Строка поставки: товар и сколько единиц добавить
+class ItemRestock(SQLModel):
+    item_id: int
+    quantity: int = Field(ge=1, le=10 ** 8)
+
+
+class ItemRestockRejected(SQLModel):
+    item_id: int
+    reason: str
+
+
+class ItemRestockResult(SQLModel):
+    updated: int
+    rejected: list[ItemRestockRejected] = []
+
+
 class ItemsPagination(SQLModel):
     items: list[ItemRead]
     total: int
@@ -71,13 +128,19 @@ class ImageBase(SQLModel):
 
 class Image(ImageBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    item_id: int = Field(foreign_key="item.id")
+    item_id: int = Field(foreign_key="item.id", index=True)
     item: Item = Relationship(back_populates="images")
 
 
 class ImageRead(ImageBase):
     id: int
 
+    # Адрес файла в текущем хранилище (локальный каталог или S3)
+    @computed_field
+    @property
+    def url(self) -> str:
+        return get_storage().url(self.name)
+
 
 class ImageCreate(ImageBase):
     item_id: int
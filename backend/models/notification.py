@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from sqlmodel import Field, SQLModel
+
+
+# Журнал уведомлений (только добавление). id служит номером события для клиентов
+class NotificationOutbox(SQLModel, table=True):
+    __tablename__ = "notification_outbox"
+    # AUTOINCREMENT, чтобы номера событий не переиспользовались после очистки журнала
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: int | None = Field(None, primary_key=True)
+    payload: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+
+# Номер последнего события журнала, опубликованного в общую шину (одна строка с id = 1).
+# Воркеры забирают события по очереди, поэтому каждое публикуется один раз
+class NotificationRelay(SQLModel, table=True):
+    __tablename__ = "notification_relay"
+
+    id: int = Field(1, primary_key=True)
+    last_id: int
@@ -0,0 +1,21 @@
+from sqlmodel import Field, SQLModel
+
+import config
+
+
+# Профилирование следующих requests запросов к маршруту (шаблон пути, например /items/{item_id})
+class ProfilerTarget(SQLModel):
+    route: str
+    method: str = "GET"
+    requests: int = Field(1, ge=1, le=config.PROFILER_MAX_REQUESTS)
+    interval: float = Field(config.PROFILER_INTERVAL, ge=0.0005, le=1)
+
+
+class ProfileFile(SQLModel):
+    name: str
+    size: int
+
+
+class ProfilerStatus(SQLModel):
+    target: ProfilerTarget | None = None
+    profiles: list[ProfileFile] = []
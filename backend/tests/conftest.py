@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import Engine
+
+import config
+from general.query_log import enable_query_log
+
+
+# Синхронный код дольше LOOP_BLOCK_THRESHOLD в асинхронном обработчике проваливает тест
+@pytest.fixture(autouse=True, scope="session")
+def fail_on_event_loop_blocking():
+    raise_mode, config.LOOP_BLOCK_RAISE = config.LOOP_BLOCK_RAISE, True
+    yield
+    config.LOOP_BLOCK_RAISE = raise_mode
+
+
+# Запрос HTTP, выполнивший один и тот же SQL больше QUERY_REPEAT_LIMIT раз (N+1), проваливает тест.
+# Тесты создают собственные движки, поэтому подсчёт включается для всех движков
+@pytest.fixture(autouse=True, scope="session")
+def fail_on_repeated_queries():
+    enable_query_log(Engine)
+    settings = config.QUERY_REPEAT_LIMIT, config.QUERY_REPEAT_RAISE
+    config.QUERY_REPEAT_LIMIT, config.QUERY_REPEAT_RAISE = 5, True
+    yield
+    config.QUERY_REPEAT_LIMIT, config.QUERY_REPEAT_RAISE = settings
@@ -232,3 +232,72 @@ class TestImageModulesIntegration:
         
         image_in_db = self.session.get(Image, test_image.id)
         assert image_in_db is not None
+
+    # Тест 6: Проверить пакетную загрузку нескольких изображений одним запросом
+    def test_batch_image_upload_integration(self):
+        manager_user = self.create_test_user('manager6', 'password123', Role.MANAGER)
+        test_item = self.create_test_item()
+        
+        self.set_auth_cookies(manager_user)
+        
+        files = [('files', self.create_valid_image_file()) for _ in range(3)]
+        response = self.client.post(f"/items/images/batch/{test_item.id}", files=files)
+        
+        assert response.status_code == 200
+        
+        item_data = response.json()
+        assert item_data['id'] == test_item.id
+        assert len(item_data['images']) == 3
+        
+        names = [image['name'] for image in item_data['images']]
+        assert len(set(names)) == 3
+        assert sorted(os.listdir(self.test_upload_dir)) == sorted(names)
+    
+    # Тест 7: Проверить, что при невалидном файле в пакете ничего не сохраняется
+    def test_batch_image_upload_invalid_file(self):
+        manager_user = self.create_test_user('manager7', 'password123', Role.MANAGER)
+        test_item = self.create_test_item()
+        
+        self.set_auth_cookies(manager_user)
+        
+        files = [('files', self.create_valid_image_file()), ('files', self.create_invalid_file())]
+        response = self.client.post(f"/items/images/batch/{test_item.id}", files=files)
+        
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Файл не является изображением"
+        
+        assert len(os.listdir(self.test_upload_dir)) == 0
+        
+        images_in_db = self.session.query(Image).filter(Image.item_id == test_item.id).all()
+        assert len(images_in_db) == 0
+    
+    # Тест 8: Проверить откат пакетной загрузки при ошибке записи одного из файлов
+    def test_batch_image_upload_storage_error(self):
+        manager_user = self.create_test_user('manager8', 'password123', Role.MANAGER)
+        test_item = self.create_test_item()
+        
+        self.set_auth_cookies(manager_user)
+        
+        from general.storage import get_storage
+        storage = get_storage()
+        original_put_stream = storage.put_stream
+        calls = 0
+        
+        async def flaky_put_stream(name, stream):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise OSError("Диск переполнен")
+            await original_put_stream(name, stream)
+        
+        files = [('files', self.create_valid_image_file()) for _ in range(3)]
+        with patch.object(storage, 'put_stream', flaky_put_stream):
+            response = self.client.post(f"/items/images/batch/{test_item.id}", files=files)
+        
+        assert response.status_code == 500
+        assert response.json()["detail"] == "Не удалось загрузить изображения"
+        
+        assert len(os.listdir(self.test_upload_dir)) == 0
+        
+        images_in_db = self.session.query(Image).filter(Image.item_id == test_item.id).all()
+        assert len(images_in_db) == 0
@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from datetime import timedelta
@@ -320,3 +321,103 @@ class TestItemIntegration:
         
         assert response.status_code == 404
         assert response.json()["detail"] == "Товар не найден"
+    
+    def test_import_items_with_admin_role(self):
+        """Тест 14: Проверить массовый импорт товаров администратором"""
+        admin_user = self.create_test_user('admin', 'password123', Role.ADMIN)
+        self.create_test_brand("Samsung")
+        self.create_test_category("Смартфоны")
+        self.set_auth_cookies(admin_user)
+        
+        data = (
+            '{"name": "Galaxy S24", "description": "Смартфон", "price": 79990, "quantity": 3, "brand": "Samsung", "category": "Смартфоны"}\n'
+            '{"name": "Galaxy A55", "description": "Смартфон", "price": -1, "brand": "Samsung", "category": "Смартфоны"}\n'
+        )
+        response = self.client.post(
+            "/items/import",
+            content=data.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {"rows": 2, "imported": 1, "failed": 1}
+        assert lines[1]["row"] == 2
+        assert lines[1]["errors"][0]["field"] == "price"
+        
+        items = self.client.get("/items/").json()["items"]
+        assert [(item["name"], item["quantity"], item["brand"]["name"]) for item in items] == [("Galaxy S24", 3, "Samsung")]
+    
+    def test_import_items_with_manager_role(self):
+        """Тест 15: Проверить запрет массового импорта менеджеру"""
+        manager_user = self.create_test_user('manager', 'password123', Role.MANAGER)
+        self.set_auth_cookies(manager_user)
+        
+        response = self.client.post("/items/import?format=csv", content=b"name,description,price\n")
+        
+        assert response.status_code == 403
+    
+    def test_export_items_with_manager_role(self):
+        """Тест 16: Проверить выгрузку каталога менеджером"""
+        manager_user = self.create_test_user('manager', 'password123', Role.MANAGER)
+        self.create_test_item(name="Ноутбук")
+        self.set_auth_cookies(manager_user)
+        
+        response = self.client.get("/items/export?format=ndjson")
+        
+        assert response.status_code == 200
+        assert response.headers["content-disposition"] == 'attachment; filename="catalog.ndjson"'
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [(row["name"], row["brand"], row["category"]) for row in rows] == [("Ноутбук", "Test Brand", "Test Category")]
+    
+    def test_export_items_with_user_role(self):
+        """Тест 17: Проверить запрет выгрузки каталога пользователю"""
+        regular_user = self.create_test_user('user', 'password123', Role.USER)
+        self.set_auth_cookies(regular_user)
+        
+        response = self.client.get("/items/export")
+        
+        assert response.status_code == 403
+    
+    def test_bulk_update_items_with_manager_role(self):
+        """Тест 18: Проверить массовое изменение цен категории менеджером"""
+        manager_user = self.create_test_user('manager', 'password123', Role.MANAGER)
+        category = self.create_test_category()
+        brand = self.create_test_brand()
+        first = self.create_test_item(name="Товар 1", price=100, category_id=category.id, brand_id=brand.id)
+        second = self.create_test_item(name="Товар 2", price=250, category_id=category.id, brand_id=brand.id)
+        self.set_auth_cookies(manager_user)
+        
+        response = self.client.patch("/items/bulk", json={
+            "filter": {"category_id": category.id},
+            "price": {"operation": "multiply", "value": 1.1},
+        })
+        
+        assert response.status_code == 200
+        assert response.json() == {"updated": 2, "not_found": []}
+        assert self.client.get(f"/items/{first.id}").json()["price"] == 110
+        assert self.client.get(f"/items/{second.id}").json()["price"] == 275
+    
+    def test_bulk_update_items_with_user_role(self):
+        """Тест 19: Проверить запрет массового изменения товаров пользователю"""
+        regular_user = self.create_test_user('user', 'password123', Role.USER)
+        self.set_auth_cookies(regular_user)
+        
+        response = self.client.patch("/items/bulk", json={"items": {"1": {"price": 10}}})
+        
+        assert response.status_code == 403
+    
+    def test_restock_items_with_manager_role(self):
+        """Тест 20: Проверить пополнение остатков поставкой"""
+        manager_user = self.create_test_user('manager', 'password123', Role.MANAGER)
+        item = self.create_test_item(quantity=10)
+        self.set_auth_cookies(manager_user)
+        
+        response = self.client.patch("/items/add", json=[
+            {"item_id": item.id, "quantity": 5},
+            {"item_id": 999, "quantity": 1},
+        ])
+        
+        assert response.status_code == 200
+        assert response.json() == {"updated": 1, "rejected": [{"item_id": 999, "reason": "Товар не найден"}]}
+        assert self.client.get(f"/items/{item.id}").json()["quantity"] == 15
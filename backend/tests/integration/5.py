@@ -1,17 +1,19 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from datetime import timedelta
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
 from main import app
 from models.user import User
 from models.item import Item
 from models.brand import Brand
 from models.category import Category
+from models.notification import NotificationOutbox
 from general.auth import Role, create_access_token
 from general.password import get_password_hash
 
-from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel import SQLModel, create_engine, Session, select
 from sqlmodel.pool import StaticPool
 
 DATABASE_URL = "sqlite:///:memory:"
@@ -99,9 +101,7 @@ class TestBuyItemIntegration:
         
         self.set_auth_cookies(user)
         
-        mock_notify = AsyncMock()
-        
-        with patch('api.routs.buy.manager.notify_managers_about_buying', mock_notify):
+        with patch('api.routs.buy.dispatcher') as mock_dispatcher:
             purchase_data = {
                 "quantity": 2
             }
@@ -113,12 +113,20 @@ class TestBuyItemIntegration:
             item_data = response.json()
             assert item_data["quantity"] == 8
             
-            mock_notify.assert_called_once()
+            mock_dispatcher.wake.assert_called_once()
             
-            call_args = mock_notify.call_args[0]
-            assert call_args[0] == "customer"
-            assert call_args[1] == "Test Item"
-            assert call_args[2] == 2
+            # Уведомление записано в журнал вместе с покупкой
+            events = self.session.exec(select(NotificationOutbox)).all()
+            assert len(events) == 1
+            assert json.loads(events[0].payload) == {
+                "username": "customer",
+                "item": "Test Item",
+                "quantity": 2,
+                "item_id": test_item.id,
+                "category_id": test_item.category_id,
+                "brand_id": test_item.brand_id,
+                "remaining": 8,
+            }
     
     def test_purchase_nonexistent_item(self):
         """Тест 2: Проверить обработку покупки несуществующего товара"""
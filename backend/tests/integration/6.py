@@ -78,9 +78,9 @@ class TestNotificationIntegration:
         
         try:
             from api.routs.websocket import websocket_endpoint
-            await websocket_endpoint(mock_websocket, authorize=True)
+            await websocket_endpoint(mock_websocket, current_user=manager_user, authorize=True)
             
-            notification_manager.connect.assert_called_once_with(mock_websocket)
+            notification_manager.connect.assert_called_once_with(mock_websocket, manager_user.username, set())
             
         finally:
             notification_manager.connect = original_connect
@@ -159,9 +159,9 @@ class TestNotificationIntegration:
         try:
             from api.routs.websocket import websocket_endpoint
             
-            await websocket_endpoint(mock_websocket, authorize=True)
+            await websocket_endpoint(mock_websocket, current_user=manager_user, authorize=True)
             
-            notification_manager.connect.assert_called_once_with(mock_websocket)
+            notification_manager.connect.assert_called_once_with(mock_websocket, manager_user.username, set())
             notification_manager.disconnect.assert_called_once_with(mock_websocket)
             
             expected_calls = len(messages_to_send) + 1
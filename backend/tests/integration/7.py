@@ -25,8 +25,7 @@ class TestBuyNotificationIntegration:
         mock_manager_websocket = AsyncMock(spec=WebSocket)
         mock_manager_websocket.send_text = AsyncMock()
         
-        original_connections = manager.active_connections.copy()
-        manager.active_connections = [mock_manager_websocket]
+        await manager.connect(mock_manager_websocket)
         
         try:
             test_data = {
@@ -40,6 +39,7 @@ class TestBuyNotificationIntegration:
                 item=test_data["item"],
                 quantity=test_data["quantity"]
             )
+            await manager.flush()
             
             assert mock_manager_websocket.send_text.called
             
@@ -51,7 +51,8 @@ class TestBuyNotificationIntegration:
             assert message_data["quantity"] == 1
             
         finally:
-            manager.active_connections = original_connections
+            for websocket in list(manager.queues):
+                manager.disconnect(websocket)
 
     @pytest.mark.asyncio
     async def test_buy_item_triggers_notification_to_all_managers(self):
@@ -65,8 +66,8 @@ class TestBuyNotificationIntegration:
         mock_manager2 = AsyncMock(spec=WebSocket)
         mock_manager2.send_text = AsyncMock()
         
-        original_connections = manager.active_connections.copy()
-        manager.active_connections = [mock_manager1, mock_manager2]
+        await manager.connect(mock_manager1)
+        await manager.connect(mock_manager2)
         
         try:
             await manager.notify_managers_about_buying(
@@ -74,6 +75,7 @@ class TestBuyNotificationIntegration:
                 item="Ноутбук",
                 quantity=2
             )
+            await manager.flush()
             
             assert mock_manager1.send_text.called
             assert mock_manager2.send_text.called
@@ -87,4 +89,5 @@ class TestBuyNotificationIntegration:
             assert message1["quantity"] == 2
             
         finally:
-            manager.active_connections = original_connections
+            for websocket in list(manager.queues):
+                manager.disconnect(websocket)
@@ -0,0 +1,196 @@
+import re
+import pytest
+from fastapi.testclient import TestClient
+from datetime import timedelta
+
+from main import app
+from models.user import User
+from models.item import Item, Image
+from models.brand import Brand
+from models.category import Category
+from general.auth import Role, create_access_token
+from general.password import get_password_hash
+
+from sqlalchemy import event
+from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.pool import StaticPool
+
+DATABASE_URL = "sqlite:///:memory:"
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+# Полный просмотр таблицы без индекса: "SCAN item", но не "SCAN item USING INDEX ..."
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+# Страница каталога без поиска обходит item по первичному ключу (ORDER BY item.id)
+# и останавливается после OFFSET + LIMIT строк. Разрешена только эта строка плана этого запроса
+PAGE_SCAN = (re.compile(r"ORDER BY item\.id\s+LIMIT \? OFFSET \?$"), "SCAN item")
+
+
+class TestQueryPlans:
+    """Планы запросов горячих эндпоинтов не должны содержать полного просмотра таблиц.
+
+    Постраничный список товаров с поиском по подстроке и выгрузка каталога
+    читают всю таблицу по определению и здесь не проверяются. Страница без поиска
+    проверяется с единственным разрешённым просмотром PAGE_SCAN.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self):
+        SQLModel.metadata.create_all(engine)
+        self.session = Session(engine)
+
+        from api.deps import get_session
+        def override_get_session():
+            try:
+                yield self.session
+            finally:
+                pass
+
+        app.dependency_overrides[get_session] = override_get_session
+        self.client = TestClient(app)
+
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self.capture)
+        yield
+
+        event.remove(engine, "before_cursor_execute", self.capture)
+        app.dependency_overrides.clear()
+        self.session.close()
+        SQLModel.metadata.drop_all(engine)
+
+    def capture(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            # Для executemany план строится по первому набору параметров
+            self.statements.append((statement, parameters[0] if executemany else parameters))
+
+    def create_catalog(self):
+        brands = [Brand(name=f"Бренд {i}") for i in range(3)]
+        categories = [Category(name=f"Категория {i}") for i in range(3)]
+        self.session.add_all(brands + categories)
+        self.session.flush()
+        items = [
+            Item(
+                name=f"Товар {i}", description="Описание", price=100 + i, quantity=10,
+                brand_id=brands[i % 3].id, category_id=categories[i % 3].id,
+            )
+            for i in range(30)
+        ]
+        self.session.add_all(items)
+        self.session.flush()
+        self.session.add_all([Image(name=f"image_{item.id}.jpg", item_id=item.id) for item in items])
+        self.session.commit()
+        return brands, categories, items
+
+    def login(self, role):
+        user = User(username=role.value, password_hash=get_password_hash("password123"), role=role)
+        self.session.add(user)
+        self.session.commit()
+        self.session.refresh(user)
+        self.client.cookies.set("access_token", create_access_token(user, timedelta(minutes=30)))
+        self.client.cookies.set("role", user.role.value)
+
+    def full_scans(self, statements):
+        scans = []
+        with engine.connect() as connection:
+            for statement, parameters in statements:
+                plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                scans += [(statement, row.detail) for row in plan if FULL_SCAN.match(row.detail)]
+        return scans
+
+    def assert_no_full_scan(self, method, url, allowed=None, **kwargs):
+        self.statements.clear()
+        response = self.client.request(method, url, **kwargs)
+        assert response.status_code == 200, response.text
+        assert self.statements
+        scans = self.full_scans(self.statements)
+        if allowed is not None:
+            pattern, detail = allowed
+            expected = [scan for scan in scans if pattern.search(scan[0].strip()) and scan[1] == detail]
+            assert expected, "Разрешённый просмотр не найден"
+            scans = [scan for scan in scans if scan not in expected]
+        assert scans == []
+
+    def test_read_item(self):
+        """Тест 1: Карточка товара с изображениями"""
+        _, _, items = self.create_catalog()
+
+        self.assert_no_full_scan("GET", f"/items/{items[5].id}")
+
+    def test_similar_items(self):
+        """Тест 2: Похожие товары отбираются по индексу категории"""
+        _, _, items = self.create_catalog()
+
+        self.assert_no_full_scan("GET", f"/items/similar/{items[5].id}")
+
+    def test_buy_item(self):
+        """Тест 3: Покупка товара"""
+        _, _, items = self.create_catalog()
+        self.login(Role.USER)
+
+        self.assert_no_full_scan("PATCH", f"/buy/{items[5].id}", json={"quantity": 1})
+
+    @pytest.mark.parametrize("key", ["category_id", "brand_id"])
+    def test_bulk_update_by_filter(self, key):
+        """Тест 4: Массовое изменение цен по категории и бренду"""
+        brands, categories, _ = self.create_catalog()
+        self.login(Role.MANAGER)
+        value = (categories if key == "category_id" else brands)[1].id
+
+        self.assert_no_full_scan("PATCH", "/items/bulk", json={
+            "filter": {key: value},
+            "price": {"operation": "multiply", "value": 1.1},
+        })
+
+    def test_restock(self):
+        """Тест 5: Пополнение остатков поставкой"""
+        _, _, items = self.create_catalog()
+        self.login(Role.MANAGER)
+
+        self.assert_no_full_scan("PATCH", "/items/add", json=[
+            {"item_id": item.id, "quantity": 5} for item in items[:10]
+        ])
+
+    def test_delete_brand_and_category(self):
+        """Тест 6: Удаление бренда и категории без товаров"""
+        self.create_catalog()
+        brand, category = Brand(name="Пустой бренд"), Category(name="Пустая категория")
+        self.session.add_all([brand, category])
+        self.session.commit()
+        self.login(Role.MANAGER)
+
+        self.assert_no_full_scan("DELETE", f"/brands/{brand.id}")
+        self.assert_no_full_scan("DELETE", f"/categories/{category.id}")
+
+    @pytest.mark.parametrize("table, column", [
+        ("item", "brand_id"),
+        ("item", "category_id"),
+        ("item", "cover_id"),
+        ("image", "item_id"),
+    ])
+    def test_foreign_key_lookups(self, table, column):
+        """Тест 7: Проверки внешних ключей при удалении родителя используют индекс"""
+        # SQLite проверяет RESTRICT таким же поиском дочерних строк по столбцу ключа
+        statement = f"SELECT 1 FROM {table} WHERE {column} = ?"
+
+        assert self.full_scans([(statement, (1,))]) == []
+
+    def test_read_items_page(self):
+        """Тест 8: Страница каталога без поиска и подсчёт товаров"""
+        self.create_catalog()
+
+        self.assert_no_full_scan("GET", "/items/", allowed=PAGE_SCAN, params={"offset": 1, "limit": 10})
+
+    def test_login(self):
+        """Тест 9: Вход ищет пользователя по уникальному индексу имени"""
+        self.create_catalog()
+        for number in range(20):
+            self.session.add(User(username=f"user_{number}", password_hash="hash", role=Role.USER))
+        self.session.add(User(username="manager", password_hash=get_password_hash("password123"), role=Role.MANAGER))
+        self.session.commit()
+
+        self.assert_no_full_scan("POST", "/login/", data={"username": "manager", "password": "password123"})
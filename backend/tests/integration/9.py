@@ -0,0 +1,87 @@
+import pytest
+from fastapi.testclient import TestClient
+from datetime import timedelta
+
+from main import app
+from models.user import User
+from general.auth import Role, create_access_token
+from general.password import get_password_hash
+
+from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.pool import StaticPool
+
+DATABASE_URL = "sqlite:///:memory:"
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+class TestProfilerIntegration:
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        SQLModel.metadata.create_all(engine)
+        self.session = Session(engine)
+
+        from api.deps import get_session, profiler
+        def override_get_session():
+            try:
+                yield self.session
+            finally:
+                pass
+
+        app.dependency_overrides[get_session] = override_get_session
+        directory = profiler.directory
+        profiler.directory = tmp_path
+
+        self.client = TestClient(app)
+        yield
+
+        profiler.directory = directory
+        profiler.disarm()
+        app.dependency_overrides.clear()
+        self.session.close()
+        SQLModel.metadata.drop_all(engine)
+
+    def login(self, role):
+        user = User(username=role.value, password_hash=get_password_hash("password123"), role=role)
+        self.session.add(user)
+        self.session.commit()
+        self.session.refresh(user)
+        self.client.cookies.set("access_token", create_access_token(user, timedelta(minutes=30)))
+        self.client.cookies.set("role", user.role.value)
+
+    def test_profile_requests_with_admin_role(self):
+        """Тест 1: Проверить профилирование запросов к маршруту по команде администратора"""
+        self.login(Role.ADMIN)
+
+        response = self.client.post("/admin/profiler/", json={"route": "/items/{item_id}", "requests": 1})
+        assert response.status_code == 200
+        assert response.json()["target"]["route"] == "/items/{item_id}"
+
+        self.client.get("/items/1")
+        self.client.get("/items/2")
+
+        status = self.client.get("/admin/profiler/").json()
+        assert status["target"] is None
+        assert len(status["profiles"]) == 1
+        profile = self.client.get(f"/admin/profiler/{status['profiles'][0]['name']}")
+        assert profile.status_code == 200
+        assert profile.json()["name"].startswith("GET /items/{item_id}")
+
+    def test_unknown_route(self):
+        """Тест 2: Проверить ошибку для несуществующего маршрута"""
+        self.login(Role.ADMIN)
+
+        response = self.client.post("/admin/profiler/", json={"route": "/missing", "method": "GET"})
+
+        assert response.status_code == 404
+
+    def test_profiler_with_manager_role(self):
+        """Тест 3: Проверить запрет управления профилировщиком менеджеру"""
+        self.login(Role.MANAGER)
+
+        assert self.client.post("/admin/profiler/", json={"route": "/items/"}).status_code == 403
+        assert self.client.get("/admin/profiler/").status_code == 403
@@ -9,6 +9,8 @@ if __name__ == "__main__":
                           "tests/integration/4.py",
                           "tests/integration/5.py",
                           "tests/integration/6.py",
-                          "tests/integration/7.py"])
+                          "tests/integration/7.py",
+                          "tests/integration/8.py",
+                          "tests/integration/9.py"])
     
     sys.exit(result)
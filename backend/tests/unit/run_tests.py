@@ -8,6 +8,24 @@ if __name__ == "__main__":
                           "tests/unit/test_password.py",
                           "tests/unit/test_permission_checker.py",
                           "tests/unit/test_connection_manager.py",
-                          "tests/unit/test_image.py"])
+                          "tests/unit/test_image.py",
+                          "tests/unit/test_storage.py",
+                          "tests/unit/test_image_sweeper.py",
+                          "tests/unit/test_bus.py",
+                          "tests/unit/test_outbox.py",
+                          "tests/unit/test_stock_channel.py",
+                          "tests/unit/test_sse.py",
+                          "tests/unit/test_item_import.py",
+                          "tests/unit/test_item_export.py",
+                          "tests/unit/test_item_bulk.py",
+                          "tests/unit/test_benchmark.py",
+                          "tests/unit/test_seeder.py",
+                          "tests/unit/test_metrics.py",
+                          "tests/unit/test_query_log.py",
+                          "tests/unit/test_profiler.py",
+                          "tests/unit/test_tracing.py",
+                          "tests/unit/test_loop_monitor.py",
+                          "tests/unit/test_serialization.py",
+                          "tests/unit/test_listing.py"])
     
     sys.exit(result)
@@ -0,0 +1,62 @@
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from benchmarks.load import Scenario, compare, percentile, run_scenario, summarize
+
+
+# Нагрузочный тест: статистика и прогон сценария
+class TestBenchmark:
+    def test_percentile(self):
+        """Тест 1: Проверить перцентили по ближайшему рангу."""
+        values = [i / 100 for i in range(1, 101)]
+
+        assert percentile(values, 0.50) == 0.50
+        assert percentile(values, 0.99) == 0.99
+        assert percentile([], 0.95) == 0.0
+
+    def test_summarize(self):
+        """Тест 2: Проверить итог сценария в миллисекундах и запросах в секунду."""
+        result = summarize([0.010, 0.020, 0.030, 0.040], errors=1, elapsed=0.5)
+
+        assert result == {"requests": 5, "errors": 1, "throughput": 10.0, "p50": 20.0, "p95": 40.0, "p99": 40.0}
+
+    def test_compare_with_baseline(self):
+        """Тест 3: Проверить поиск ухудшений относительно базового прогона."""
+        baseline = {
+            "item": {"p95": 10.0, "throughput": 100.0},
+            "search": {"p95": 50.0, "throughput": 20.0},
+        }
+        current = {
+            "item": {"p95": 11.0, "throughput": 95.0},
+            "search": {"p95": 80.0, "throughput": 12.0},
+            "login": {"p95": 500.0, "throughput": 2.0},
+        }
+
+        regressions = compare(current, baseline, max_regression=0.2)
+
+        assert len(regressions) == 2
+        assert all(line.startswith("search") for line in regressions)
+
+    @pytest.mark.asyncio
+    async def test_run_scenario(self):
+        """Тест 4: Проверить прогон сценария с учётом ошибок и прогрева."""
+        app = FastAPI()
+        calls = []
+
+        @app.get("/items/{item_id}")
+        def read_item(item_id: int):
+            calls.append(item_id)
+            if item_id > 5:
+                raise HTTPException(status_code=404)
+            return {"id": item_id}
+
+        scenario = Scenario("item", lambda rng, size: ("GET", f"/items/{rng.randint(1, size)}", {}))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            result = await run_scenario(client, scenario, size=10, requests=40, concurrency=4, warmup=8)
+
+        assert len(calls) == 48
+        assert result["requests"] == 40
+        # Прогрев завершается до начала замера
+        assert result["errors"] == sum(1 for item_id in calls[8:] if item_id > 5)
+        assert result["p50"] <= result["p95"] <= result["p99"]
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from general.bus import LocalBus, SQLiteBus, RedisBus
+from general.connection_manager import ConnectionManager
+from general.outbox import OutboxDispatcher, add_purchase_event
+from models.item import Item
+from models.notification import NotificationRelay
+
+
+class FakeRedis:
+    """Замена клиента Redis: общий для всех «процессов» Pub/Sub в памяти"""
+
+    def __init__(self, broker: list):
+        self.broker = broker
+        self.published = []
+
+    async def publish(self, channel, message):
+        self.published.append(message)
+        for subscriber in self.broker:
+            if channel in subscriber.channels:
+                subscriber.queue.put_nowait({"type": "message", "data": message.encode()})
+
+    def pubsub(self):
+        subscriber = FakePubSub()
+        self.broker.append(subscriber)
+        return subscriber
+
+    async def aclose(self):
+        pass
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels = set()
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+        self.queue.put_nowait({"type": "subscribe", "data": 1})
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        pass
+
+
+# Шина уведомлений между воркерами
+class TestBus:
+    @pytest.mark.asyncio
+    async def test_local_bus(self):
+        """Тест 1: Проверить доставку сообщения внутри процесса."""
+        bus = LocalBus()
+        bus.handler = AsyncMock()
+
+        await bus.publish("сообщение")
+
+        bus.handler.assert_called_once_with("сообщение")
+
+    @pytest.mark.asyncio
+    async def test_sqlite_bus_between_workers(self, tmp_path):
+        """Тест 2: Проверить доставку сообщения всем процессам через общий файл SQLite."""
+        path = str(tmp_path / "bus.db")
+        worker1, worker2 = SQLiteBus(path, poll_interval=60), SQLiteBus(path, poll_interval=60)
+        worker1.handler, worker2.handler = AsyncMock(), AsyncMock()
+
+        await worker1.publish("старое сообщение")
+        await worker1.start()
+        await worker2.start()
+        try:
+            await worker1.publish("сообщение")
+            await worker1.poll_once()
+            await worker2.poll_once()
+
+            worker1.handler.assert_called_once_with("сообщение")
+            worker2.handler.assert_called_once_with("сообщение")
+        finally:
+            await worker1.stop()
+            await worker2.stop()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_bus_polling(self, tmp_path):
+        """Тест 3: Проверить фоновый опрос шины SQLite."""
+        bus = SQLiteBus(str(tmp_path / "bus.db"), poll_interval=0.01)
+        received = asyncio.Queue()
+        bus.handler = received.put
+
+        await bus.start()
+        try:
+            await bus.publish("сообщение")
+            assert await asyncio.wait_for(received.get(), 1) == "сообщение"
+        finally:
+            await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_redis_bus_between_workers(self):
+        """Тест 4: Проверить доставку сообщения всем процессам через Redis Pub/Sub."""
+        broker = []
+        worker1, worker2 = RedisBus(client=FakeRedis(broker)), RedisBus(client=FakeRedis(broker))
+        received1, received2 = asyncio.Queue(), asyncio.Queue()
+        worker1.handler, worker2.handler = received1.put, received2.put
+
+        await worker1.start()
+        await worker2.start()
+        try:
+            await worker2.publish("сообщение")
+
+            assert await asyncio.wait_for(received1.get(), 1) == "сообщение"
+            assert await asyncio.wait_for(received2.get(), 1) == "сообщение"
+        finally:
+            await worker1.stop()
+            await worker2.stop()
+
+    @pytest.mark.asyncio
+    async def test_notification_reaches_other_worker(self, tmp_path):
+        """Тест 5: Проверить, что уведомление о покупке доходит до менеджера, подключённого к другому воркеру."""
+        path = str(tmp_path / "bus.db")
+        manager1 = ConnectionManager(bus=SQLiteBus(path, poll_interval=60))
+        manager2 = ConnectionManager(bus=SQLiteBus(path, poll_interval=60))
+        websocket = AsyncMock()
+
+        await manager1.start()
+        await manager2.start()
+        try:
+            await manager2.connect(websocket)
+
+            await manager1.notify_managers_about_buying("иванов_иван", "Ноутбук", 2)
+            await manager2.bus.poll_once()
+            await manager2.flush()
+
+            message = json.loads(websocket.send_text.call_args[0][0])
+            assert message == {"username": "иванов_иван", "item": "Ноутбук", "quantity": 2}
+        finally:
+            manager2.disconnect(websocket)
+            await manager1.stop()
+            await manager2.stop()
+
+    @pytest.mark.asyncio
+    async def test_outbox_relayed_once_through_bus(self):
+        """Тест 6: Проверить, что событие журнала публикуется в общую шину одним воркером и доходит до всех."""
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(engine)
+        broker = []
+        managers = [ConnectionManager(coalesce_window=0, bus=RedisBus(client=FakeRedis(broker))) for _ in range(2)]
+        dispatchers = [OutboxDispatcher(engine, manager, poll_interval=60, batch_size=2) for manager in managers]
+        websockets = [AsyncMock(), AsyncMock()]
+
+        for manager, dispatcher, websocket in zip(managers, dispatchers, websockets):
+            await manager.start()
+            await dispatcher.start()
+            await manager.connect(websocket)
+        try:
+            with Session(engine) as session:
+                for number, name in enumerate(("Ноутбук", "Смартфон", "Наушники"), start=1):
+                    item = Item(id=number, name=name, description="Описание", price=100, quantity=10,
+                                category_id=1, brand_id=number)
+                    add_purchase_event(session, "иванов_иван", item, 1)
+                session.commit()
+            await dispatchers[0].dispatch_once()
+            await dispatchers[1].dispatch_once()
+            for _ in range(100):
+                if all(dispatcher.last_id == 3 for dispatcher in dispatchers):
+                    break
+                await asyncio.sleep(0.01)
+            for manager in managers:
+                await manager.flush()
+
+            assert sum(len(manager.bus.redis.published) for manager in managers) == 3
+            with Session(engine) as session:
+                assert session.exec(select(NotificationRelay.last_id)).one() == 3
+            for websocket in websockets:
+                messages = [json.loads(call.args[0]) for call in websocket.send_text.call_args_list]
+                assert [(m["id"], m["item"]) for m in messages] == [(1, "Ноутбук"), (2, "Смартфон"), (3, "Наушники")]
+        finally:
+            for manager, dispatcher, websocket in zip(managers, dispatchers, websockets):
+                manager.disconnect(websocket)
+                await dispatcher.stop()
+                await manager.stop()
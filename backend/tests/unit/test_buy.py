@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import Mock, patch
 from fastapi import HTTPException
 from models.item import ItemAdd
 from api.routs.buy import buy_item
@@ -18,9 +18,8 @@ class TestBuyItem:
         mock_user = Mock()
         mock_user.username = "иванов_иван"
         
-        with patch('api.routs.buy.manager') as mock_manager:
-            mock_manager.notify_managers_about_buying = AsyncMock()
-            
+        with patch('api.routs.buy.dispatcher') as mock_dispatcher, \
+             patch('api.routs.buy.add_purchase_event') as mock_add_event:
             result = await buy_item(
                 item_id=1,
                 item=ItemAdd(quantity=2),
@@ -35,9 +34,8 @@ class TestBuyItem:
             mock_session.add.assert_called_once_with(mock_item)
             mock_session.commit.assert_called_once()
             mock_session.refresh.assert_called_once_with(mock_item)
-            mock_manager.notify_managers_about_buying.assert_called_once_with(
-                "иванов_иван", "Смартфон Samsung", 2
-            )
+            mock_add_event.assert_called_once_with(mock_session, "иванов_иван", mock_item, 2)
+            mock_dispatcher.wake.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_buy_item_not_found(self):
@@ -90,9 +88,7 @@ class TestBuyItem:
         mock_item.sqlmodel_update = Mock()
         mock_session.get.return_value = mock_item
         
-        with patch('api.routs.buy.manager') as mock_manager:
-            mock_manager.notify_managers_about_buying = AsyncMock()
-            
+        with patch('api.routs.buy.dispatcher'), patch('api.routs.buy.add_purchase_event'):
             await buy_item(
                 item_id=1,
                 item=ItemAdd(quantity=2),
@@ -115,9 +111,8 @@ class TestBuyItem:
         mock_user = Mock()
         mock_user.username = "иванов_иван"
         
-        with patch('api.routs.buy.manager') as mock_manager:
-            mock_manager.notify_managers_about_buying = AsyncMock()
-            
+        with patch('api.routs.buy.dispatcher'), \
+             patch('api.routs.buy.add_purchase_event') as mock_add_event:
             result = await buy_item(
                 item_id=1,
                 item=ItemAdd(quantity=3),
@@ -128,6 +123,4 @@ class TestBuyItem:
             
             assert result == mock_item
             mock_item.sqlmodel_update.assert_called_once_with({'quantity': 0})
-            mock_manager.notify_managers_about_buying.assert_called_once_with(
-                "иванов_иван", "Наушники", 3
-            )
+            mock_add_event.assert_called_once_with(mock_session, "иванов_иван", mock_item, 3)
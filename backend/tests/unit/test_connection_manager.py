@@ -1,6 +1,7 @@
 import pytest
 import json
-from unittest.mock import Mock, AsyncMock
+import asyncio
+from unittest.mock import AsyncMock
 from general.connection_manager import ConnectionManager
 from fastapi import WebSocketDisconnect
 
@@ -25,11 +26,12 @@ class TestConnectionManager:
         assert len(manager.active_connections) == 1
         assert mock_websocket in manager.active_connections
 
-    def test_connection_manager_disconnect(self):
+    @pytest.mark.asyncio
+    async def test_connection_manager_disconnect(self):
         """Тест 3: Проверить удаление подключения."""
         manager = ConnectionManager()
-        mock_websocket = Mock()
-        manager.active_connections = [mock_websocket]
+        mock_websocket = AsyncMock()
+        await manager.connect(mock_websocket)
         
         manager.disconnect(mock_websocket)
         
@@ -51,9 +53,11 @@ class TestConnectionManager:
         """Тест 5: Проверить рассылку сообщений"""
         manager = ConnectionManager()
         mock_websockets = [AsyncMock() for _ in range(3)]
-        manager.active_connections = mock_websockets
+        for websocket in mock_websockets:
+            await manager.connect(websocket)
         
         await manager.broadcast("тестовое сообщение")
+        await manager.flush()
         
         for websocket in mock_websockets:
             websocket.send_text.assert_called_once_with("тестовое сообщение")
@@ -73,6 +77,7 @@ class TestConnectionManager:
         await manager.connect(good_websocket2)
         
         await manager.broadcast("тест")
+        await manager.flush()
         
         assert bad_websocket not in manager.active_connections
         assert good_websocket1 in manager.active_connections
@@ -98,3 +103,241 @@ class TestConnectionManager:
         assert message_data["username"] == "иванов_иван"
         assert message_data["item"] == "Ноутбук Asus"
         assert message_data["quantity"] == 2
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_broadcast_does_not_wait_for_slow_client(self):
+        """Тест 8: Проверить, что медленный клиент не задерживает рассылку и других клиентов."""
+        manager = ConnectionManager()
+        release = asyncio.Event()
+
+        async def slow_send(message):
+            await release.wait()
+
+        slow_websocket = AsyncMock()
+        slow_websocket.send_text.side_effect = slow_send
+        fast_websocket = AsyncMock()
+
+        await manager.connect(slow_websocket)
+        await manager.connect(fast_websocket)
+
+        await asyncio.wait_for(manager.broadcast("тест"), 0.1)
+        await asyncio.wait_for(manager.queues[fast_websocket].join(), 0.1)
+
+        fast_websocket.send_text.assert_called_once_with("тест")
+        assert slow_websocket in manager.active_connections
+
+        release.set()
+        await manager.flush()
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_queue_overflow(self):
+        """Тест 9: Проверить отключение клиента при переполнении его очереди."""
+        manager = ConnectionManager(queue_size=2)
+        async def stuck_send(message):
+            await asyncio.Event().wait()
+
+        stuck_websocket = AsyncMock()
+        stuck_websocket.send_text.side_effect = stuck_send
+
+        await manager.connect(stuck_websocket)
+        for i in range(4):
+            await manager.broadcast(f"сообщение {i}")
+        await asyncio.sleep(0)
+
+        assert stuck_websocket not in manager.active_connections
+        assert stuck_websocket not in manager.queues
+        assert manager.dropped_messages == 1
+        stuck_websocket.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_send_timeout(self):
+        """Тест 10: Проверить отключение клиента, не принявшего сообщение за отведённое время."""
+        manager = ConnectionManager(send_timeout=0.01)
+        async def stuck_send(message):
+            await asyncio.Event().wait()
+
+        stuck_websocket = AsyncMock()
+        stuck_websocket.send_text.side_effect = stuck_send
+
+        await manager.connect(stuck_websocket)
+        await manager.broadcast("тест")
+        await manager.flush()
+
+        assert stuck_websocket not in manager.active_connections
+        assert manager.queues == {}
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_coalesce_purchases(self):
+        """Тест 11: Проверить объединение покупок одного товара за окно агрегации."""
+        manager = ConnectionManager(coalesce_window=0.05)
+        websocket = AsyncMock()
+        await manager.connect(websocket)
+
+        await manager.notify_managers_about_buying("иванов", "Ноутбук", 1)
+        await manager.notify_managers_about_buying("петров", "Ноутбук", 2)
+        await manager.notify_managers_about_buying("иванов", "Ноутбук", 3)
+        await manager.notify_managers_about_buying("сидоров", "Наушники", 1)
+        await manager.flush()
+
+        websocket.send_text.assert_not_called()
+
+        await asyncio.sleep(0.1)
+        await manager.flush()
+
+        messages = {m["item"]: m for m in (json.loads(c.args[0]) for c in websocket.send_text.call_args_list)}
+        assert len(messages) == 2
+        assert messages["Ноутбук"] == {
+            "username": "иванов",
+            "item": "Ноутбук",
+            "quantity": 6,
+            "purchases": 3,
+            "buyers": 2,
+            "last_buyers": ["иванов", "петров"],
+        }
+        assert messages["Наушники"]["quantity"] == 1
+        assert messages["Наушники"]["purchases"] == 1
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_no_coalesce_by_default(self):
+        """Тест 12: Проверить немедленную отправку уведомлений при нулевом окне агрегации."""
+        manager = ConnectionManager(coalesce_window=0)
+        websocket = AsyncMock()
+        await manager.connect(websocket)
+
+        await manager.notify_managers_about_buying("иванов", "Ноутбук", 1)
+        await manager.notify_managers_about_buying("петров", "Ноутбук", 2)
+        await manager.flush()
+
+        assert websocket.send_text.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_connection_limits(self):
+        """Тест 13: Проверить отклонение подключений сверх общего лимита и лимита пользователя."""
+        manager = ConnectionManager(max_connections=3, max_connections_per_user=2)
+        websockets = [AsyncMock() for _ in range(5)]
+
+        assert await manager.connect(websockets[0], "иванов")
+        assert await manager.connect(websockets[1], "иванов")
+        assert not await manager.connect(websockets[2], "иванов")
+        assert await manager.connect(websockets[3], "петров")
+        assert not await manager.connect(websockets[4], "сидоров")
+
+        websockets[2].accept.assert_not_called()
+        websockets[2].close.assert_called_once_with(code=1013)
+        assert manager.rejected_connections == 2
+        assert len(manager.active_connections) == 3
+
+        # Освободившееся место можно занять снова
+        manager.disconnect(websockets[0])
+        assert manager.user_connections["иванов"] == {websockets[1]}
+        assert await manager.connect(websockets[2], "иванов")
+
+        for websocket in list(manager.queues):
+            manager.disconnect(websocket)
+        assert manager.user_connections == {}
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_reap_idle(self):
+        """Тест 14: Проверить закрытие подключений, от которых давно ничего не приходило."""
+        manager = ConnectionManager(idle_timeout=60)
+        idle_websocket, alive_websocket = AsyncMock(), AsyncMock()
+        await manager.connect(idle_websocket, "иванов")
+        await manager.connect(alive_websocket, "петров")
+
+        manager.connections[idle_websocket].last_seen -= 120
+        manager.connections[alive_websocket].last_seen -= 120
+        manager.touch(alive_websocket)
+
+        assert manager.reap_idle() == 1
+        await asyncio.gather(*manager._closing)
+
+        assert idle_websocket not in manager.active_connections
+        assert alive_websocket in manager.active_connections
+        assert "иванов" not in manager.user_connections
+        idle_websocket.close.assert_called_once_with(code=1001)
+
+        manager.disconnect(alive_websocket)
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_heartbeat(self):
+        """Тест 15: Проверить периодическую отправку ping."""
+        manager = ConnectionManager(ping_interval=0.01)
+        websocket = AsyncMock()
+        await manager.connect(websocket)
+
+        await manager.start()
+        try:
+            await asyncio.sleep(0.05)
+            await manager.flush()
+        finally:
+            await manager.stop()
+            manager.disconnect(websocket)
+
+        assert json.loads(websocket.send_text.call_args_list[0].args[0]) == {"type": "ping"}
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_topic_routing(self):
+        """Тест 16: Проверить доставку событий только подписчикам подходящих тем."""
+        manager = ConnectionManager(coalesce_window=0)
+        everything, by_category, by_item, low_stock = (AsyncMock() for _ in range(4))
+        await manager.connect(everything)
+        await manager.connect(by_category, topics={"category:1"})
+        await manager.connect(by_item, topics={"item:7"})
+        await manager.connect(low_stock, topics={"low_stock"})
+
+        event = {"username": "иванов", "item": "Ноутбук", "quantity": 1,
+                 "item_id": 5, "category_id": 1, "brand_id": 2, "remaining": 50}
+        await manager.deliver_event(event)
+        await manager.deliver_event(event | {"category_id": 3, "remaining": 2})
+        await manager.flush()
+
+        assert everything.send_text.call_count == 2
+        assert by_category.send_text.call_count == 1
+        by_item.send_text.assert_not_called()
+        assert low_stock.send_text.call_count == 1
+        assert json.loads(low_stock.send_text.call_args[0][0])["remaining"] == 2
+
+        for websocket in list(manager.queues):
+            manager.disconnect(websocket)
+        assert manager.subscribers == {}
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_subscribe_commands(self):
+        """Тест 17: Проверить подписку и отписку командами клиента."""
+        manager = ConnectionManager()
+        websocket = AsyncMock()
+        await manager.connect(websocket)
+
+        manager.handle_message(websocket, json.dumps({"action": "subscribe", "topics": ["brand:2", "low_stock"]}))
+        assert manager.subscribers == {"brand:2": {websocket}, "low_stock": {websocket}}
+
+        manager.handle_message(websocket, json.dumps({"action": "subscribe", "topics": ["brand:x"]}))
+        manager.handle_message(websocket, "pong")
+        manager.handle_message(websocket, json.dumps({"action": "unsubscribe", "topics": ["brand:2"]}))
+        assert manager.subscribers == {"low_stock": {websocket}}
+
+        # Без подписок подключение снова получает все события
+        manager.handle_message(websocket, json.dumps({"action": "unsubscribe", "topics": ["low_stock"]}))
+        assert manager.subscribers == {"*": {websocket}}
+
+        manager.disconnect(websocket)
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_coalesce_by_item_id(self):
+        """Тест 18: Проверить, что покупки разных товаров с одинаковым названием не объединяются."""
+        manager = ConnectionManager(coalesce_window=0.05)
+        websocket = AsyncMock()
+        await manager.connect(websocket)
+
+        await manager.deliver_event({"username": "иванов", "item": "Чехол", "quantity": 1, "item_id": 1, "remaining": 9})
+        await manager.deliver_event({"username": "петров", "item": "Чехол", "quantity": 2, "item_id": 2, "remaining": 4})
+        await manager.deliver_event({"username": "сидоров", "item": "Чехол", "quantity": 3, "item_id": 1, "remaining": 6})
+        await asyncio.sleep(0.1)
+        await manager.flush()
+
+        messages = {m["item_id"]: m for m in (json.loads(c.args[0]) for c in websocket.send_text.call_args_list)}
+        assert len(messages) == 2
+        assert messages[1]["quantity"] == 4
+        assert messages[1]["remaining"] == 6
+        assert messages[2]["quantity"] == 2
+        assert messages[2]["remaining"] == 4
@@ -1,8 +1,7 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 from fastapi import HTTPException
 from general.image import generate_unique_filename, validate_file_type, validate_file_size, image_upload, image_delete
-import config
 
 # Модуль работы с изображениями
 class TestImage:    
@@ -59,43 +58,62 @@ class TestImage:
         
         assert exc_info.value.status_code == 400
 
-    @patch('general.image.os.path.join')
-    @patch('general.image.open')
+    @pytest.mark.asyncio
+    @patch('general.image.get_storage')
     @patch('general.image.generate_unique_filename')
-    def test_image_upload_success(self, mock_generate, mock_open, mock_join):
+    async def test_image_upload_success(self, mock_generate, mock_get_storage):
         """Тест 7: Проверить успешную загрузку изображения."""
         mock_file = Mock()
         mock_file.filename = 'test.jpg'
-        mock_file.file.read.return_value = b'fake_image_data'
-        
+        mock_file.read = AsyncMock(side_effect=[b'fake_image_data', b''])
+
         mock_generate.return_value = 'уникальное_имя.jpg'
-        mock_join.return_value = '/uploads/уникальное_имя.jpg'
-        
-        mock_file_buffer = Mock()
-        mock_open.return_value.__enter__.return_value = mock_file_buffer
-        
-        result = image_upload(mock_file)
-        
+
+        written = []
+        async def put_stream(name, stream):
+            async for chunk in stream:
+                written.append((name, chunk))
+        mock_get_storage.return_value.put_stream = put_stream
+
+        result = await image_upload(mock_file)
+
         assert result == 'уникальное_имя.jpg'
         mock_generate.assert_called_once_with('test.jpg')
-        mock_join.assert_called_once_with(config.UPLOAD_FOLDER, 'уникальное_имя.jpg')
-        mock_open.assert_called_once_with('/uploads/уникальное_имя.jpg', 'wb')
-        mock_file_buffer.write.assert_called_once_with(b'fake_image_data')
+        assert written == [('уникальное_имя.jpg', b'fake_image_data')]
+
+    @pytest.mark.asyncio
+    @patch('general.image.get_storage')
+    async def test_image_upload_storage_error(self, mock_get_storage, caplog):
+        """Тест 8: Проверить обработку и запись в журнал ошибки хранилища при загрузке."""
+        mock_file = Mock()
+        mock_file.filename = 'test.jpg'
+        mock_get_storage.return_value.put_stream = AsyncMock(side_effect=OSError)
+
+        result = await image_upload(mock_file)
+
+        assert result is None
+        assert "test.jpg" in caplog.records[-1].getMessage()
+        assert caplog.records[-1].exc_info[0] is OSError
 
+    @pytest.mark.asyncio
     @patch('general.image.os.remove')
-    def test_image_delete_success(self, mock_remove):
-        """Тест 8: Проверить успешное удаление изображения."""
+    async def test_image_delete_success(self, mock_remove):
+        """Тест 9: Проверить успешное удаление изображения."""
         filename = "test_image.jpg"
         
-        image_delete(filename)
+        result = await image_delete(filename)
         
+        assert result is True
         mock_remove.assert_called_once()
 
+    @pytest.mark.asyncio
     @patch('general.image.os.remove')
-    def test_image_delete_file_not_found(self, mock_remove):
-        """Тест 9: Проверить обработку отсутствующего файла при удалении."""
+    async def test_image_delete_file_not_found(self, mock_remove, caplog):
+        """Тест 10: Проверить обработку и запись в журнал отсутствующего файла при удалении."""
         mock_remove.side_effect = FileNotFoundError
         
-        image_delete("несуществующий_файл.jpg")
+        result = await image_delete("несуществующий_файл.jpg")
         
+        assert result is False
         mock_remove.assert_called_once()
+        assert "несуществующий_файл.jpg" in caplog.records[-1].getMessage()
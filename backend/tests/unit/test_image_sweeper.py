@@ -0,0 +1,95 @@
+import os
+import time
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from models.brand import Brand
+from models.category import Category
+from models.cover import Cover
+from models.item import Item, Image
+from general.storage import LocalStorage
+from general.image_sweeper import ImageSweeper
+
+
+# Поиск осиротевших изображений
+class TestImageSweeper:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(self.engine)
+        self.upload_dir = tmp_path
+        self.storage = LocalStorage(root=str(tmp_path))
+
+        with Session(self.engine) as session:
+            brand, category = Brand(name="Бренд"), Category(name="Категория")
+            cover = Cover(name="cover.jpg")
+            missing_cover = Cover(name="missing_cover.jpg")
+            session.add_all([brand, category, cover, missing_cover])
+            session.commit()
+
+            item = Item(name="Товар", description="Описание", price=100,
+                        brand_id=brand.id, category_id=category.id, cover_id=cover.id)
+            other = Item(name="Товар 2", description="Описание", price=100,
+                         brand_id=brand.id, category_id=category.id, cover_id=missing_cover.id)
+            session.add_all([item, other])
+            session.commit()
+
+            session.add_all([
+                Image(name="image.jpg", item_id=item.id),
+                Image(name="missing_image.jpg", item_id=item.id),
+            ])
+            session.commit()
+            self.other_id = other.id
+
+        for name in ("cover.jpg", "image.jpg", "orphan1.jpg", "orphan2.jpg"):
+            (tmp_path / name).write_bytes(b"data")
+        yield
+        SQLModel.metadata.drop_all(self.engine)
+
+    @pytest.mark.asyncio
+    async def test_report_only(self):
+        """Тест 1: Проверить поиск осиротевших файлов и записей без удаления."""
+        sweeper = ImageSweeper(self.storage, self.engine, batch_size=1, pause=0, min_age=0)
+
+        report = await sweeper.run()
+
+        assert report.orphan_files == 2
+        assert report.missing_files == 2
+        assert report.deleted_files == 0
+        assert report.deleted_rows == 0
+        assert sorted(os.listdir(self.upload_dir)) == ["cover.jpg", "image.jpg", "orphan1.jpg", "orphan2.jpg"]
+
+    @pytest.mark.asyncio
+    async def test_delete_orphans(self):
+        """Тест 2: Проверить удаление осиротевших файлов и записей."""
+        sweeper = ImageSweeper(self.storage, self.engine, delete=True, batch_size=2, pause=0, min_age=0)
+
+        report = await sweeper.run()
+
+        assert report.deleted_files == 2
+        assert report.deleted_rows == 2
+        assert report.errors == 0
+        assert sorted(os.listdir(self.upload_dir)) == ["cover.jpg", "image.jpg"]
+
+        with Session(self.engine) as session:
+            assert session.get(Item, self.other_id).cover_id is None
+            assert {c.name for c in session.exec(select(Cover))} == {"cover.jpg"}
+            assert {i.name for i in session.exec(select(Image))} == {"image.jpg"}
+
+    @pytest.mark.asyncio
+    async def test_skip_recent_files(self):
+        """Тест 3: Проверить, что недавно загруженные файлы не считаются осиротевшими."""
+        old = time.time() - 7200
+        os.utime(self.upload_dir / "orphan1.jpg", (old, old))
+        sweeper = ImageSweeper(self.storage, self.engine, delete=True, pause=0, min_age=3600)
+
+        report = await sweeper.run()
+
+        assert report.orphan_files == 1
+        assert not (self.upload_dir / "orphan1.jpg").exists()
+        assert (self.upload_dir / "orphan2.jpg").exists()
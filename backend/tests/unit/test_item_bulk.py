@@ -0,0 +1,150 @@
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from api.routs.item import bulk_update_items, restock_items
+from models.brand import Brand
+from models.category import Category
+from models.item import Item, ItemBulkUpdate, ItemRestock
+
+
+class CatalogFixture:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        self.session.add_all([Brand(name="Samsung"), Brand(name="Apple"), Category(name="Смартфоны"), Category(name="Ноутбуки")])
+        self.session.commit()
+        # Категория 1: цены 100, 200, 300; категория 2: цена 1000
+        self.session.add_all([
+            Item(name=f"Смартфон {i}", description="Описание", price=100 * i, brand_id=1 + i % 2, category_id=1)
+            for i in (1, 2, 3)
+        ] + [Item(name="Ноутбук", description="Описание", price=1000, brand_id=1, category_id=2)])
+        self.session.commit()
+        yield
+        self.session.close()
+
+
+# Массовое изменение товаров
+class TestItemBulkUpdate(CatalogFixture):
+    def update(self, body: dict) -> dict:
+        return bulk_update_items(bulk=ItemBulkUpdate.model_validate(body), session=self.session, authorize=True)
+
+    def prices(self) -> list[int]:
+        return list(self.session.exec(select(Item.price).order_by(Item.id)))
+
+    def test_multiply_price_by_category(self):
+        """Тест 1: Проверить изменение цен категории на 10%."""
+        result = self.update({"filter": {"category_id": 1}, "price": {"operation": "multiply", "value": 1.1}})
+
+        assert result == {"updated": 3, "not_found": []}
+        assert self.prices() == [110, 220, 330, 1000]
+
+    def test_add_price_and_fields_by_brand(self):
+        """Тест 2: Проверить изменение цены и полей товаров бренда."""
+        result = self.update({
+            "filter": {"brand_id": 1, "category_id": 1},
+            "price": {"operation": "add", "value": -50},
+            "fields": {"description": "Новое описание"},
+        })
+
+        assert result["updated"] == 1
+        assert self.prices() == [100, 150, 300, 1000]
+        assert self.session.get(Item, 2).description == "Новое описание"
+
+    def test_update_by_ids(self):
+        """Тест 3: Проверить изменение разных полей у разных товаров."""
+        result = self.update({"items": {
+            "1": {"price": 150},
+            "2": {"price": 250},
+            "4": {"name": "Ультрабук", "price": 1200},
+            "99": {"price": 1},
+        }})
+
+        assert result == {"updated": 3, "not_found": [99]}
+        assert self.prices() == [150, 250, 300, 1200]
+        assert self.session.get(Item, 4).name == "Ультрабук"
+
+    def test_price_out_of_range_rolls_back(self):
+        """Тест 4: Проверить отказ без изменений, если цена выйдет за допустимые пределы."""
+        with pytest.raises(HTTPException) as exc_info:
+            self.update({"filter": {"category_id": 1}, "price": {"operation": "add", "value": -150}})
+
+        assert exc_info.value.status_code == 422
+        assert exc_info.value.detail.endswith("товаров: 1")
+        self.session.rollback()
+        assert self.prices() == [100, 200, 300, 1000]
+
+    @pytest.mark.parametrize("body", [
+        {},
+        {"items": {"1": {"price": 10}}, "filter": {"category_id": 1}},
+        {"filter": {}, "price": {"operation": "set", "value": 10}},
+        {"filter": {"category_id": 1}},
+        {"filter": {"category_id": 1}, "price": {"operation": "set", "value": 10.5}},
+        {"filter": {"category_id": 1}, "price": {"operation": "multiply", "value": 0}},
+        {"items": {"1": {"price": 10}}, "price": {"operation": "set", "value": 10}},
+    ])
+    def test_invalid_requests(self, body):
+        """Тест 5: Проверить отказ для некорректных запросов."""
+        with pytest.raises(HTTPException) as exc_info:
+            self.update(body)
+
+        assert exc_info.value.status_code == 422
+
+
+# Пополнение остатков поставкой
+class TestItemRestock(CatalogFixture):
+    def restock(self, rows: list[tuple[int, int]]) -> dict:
+        delivery = [ItemRestock(item_id=item_id, quantity=quantity) for item_id, quantity in rows]
+        return restock_items(delivery=delivery, session=self.session, authorize=True)
+
+    def quantities(self) -> list[int]:
+        return list(self.session.exec(select(Item.quantity).order_by(Item.id)))
+
+    def test_restock(self):
+        """Тест 1: Проверить пополнение остатков нескольких товаров и сложение повторов."""
+        result = self.restock([(1, 5), (2, 10), (1, 3), (4, 1)])
+
+        assert result == {"updated": 3, "rejected": []}
+        assert self.quantities() == [8, 10, 0, 1]
+
+    def test_restock_rejected_rows(self):
+        """Тест 2: Проверить отклонение неизвестных товаров и превышения потолка без влияния на остальные."""
+        self.session.get(Item, 3).quantity = 10 ** 8 - 5
+        self.session.commit()
+
+        result = self.restock([(1, 5), (3, 6), (99, 1)])
+
+        assert result["updated"] == 1
+        assert result["rejected"] == [
+            {"item_id": 3, "reason": "Количество товара не может превышать 100000000"},
+            {"item_id": 99, "reason": "Товар не найден"},
+        ]
+        assert self.quantities() == [5, 0, 10 ** 8 - 5, 0]
+
+    def test_restock_many_items(self):
+        """Тест 3: Проверить поставку, в которой больше товаров, чем id в одном запросе IN."""
+        self.session.add_all([
+            Item(name=f"Товар {i}", description="Описание", price=1, brand_id=1, category_id=1) for i in range(2500)
+        ])
+        self.session.commit()
+
+        result = self.restock([(item_id, 2) for item_id in range(1, 2505)])
+
+        assert result == {"updated": 2504, "rejected": []}
+        assert set(self.quantities()) == {2}
+
+    def test_restock_too_many_rows(self):
+        """Тест 4: Проверить ограничение размера поставки."""
+        with patch("config.RESTOCK_MAX_ITEMS", 2):
+            with pytest.raises(HTTPException) as exc_info:
+                self.restock([(1, 1), (2, 1), (3, 1)])
+
+        assert exc_info.value.status_code == 422
@@ -0,0 +1,72 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.pool import StaticPool
+
+from general.item_export import HEADER, iter_export
+from general.item_import import ItemImporter
+from models.brand import Brand
+from models.category import Category
+from models.item import Item
+
+
+# Выгрузка каталога
+class TestItemExport:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(self.engine)
+        with Session(self.engine) as session:
+            session.add_all([Brand(name="Samsung"), Category(name="Смартфоны")])
+            session.commit()
+            session.add_all([
+                Item(name=f"Товар {i}", description="Описание, с запятой", price=i + 1, quantity=i,
+                     brand_id=1, category_id=1)
+                for i in range(25)
+            ])
+            session.commit()
+
+    def test_export_ndjson_in_batches(self):
+        """Тест 1: Проверить выгрузку NDJSON пакетами из курсора."""
+        chunks = list(iter_export(self.engine, "ndjson", batch_size=10))
+
+        assert len(chunks) == 3
+        rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+        assert len(rows) == 25
+        assert rows[0] == {
+            "id": 1, "name": "Товар 0", "description": "Описание, с запятой", "price": 1, "quantity": 0,
+            "brand_id": 1, "brand": "Samsung", "category_id": 1, "category": "Смартфоны", "cover_id": None,
+        }
+
+    def test_export_csv_gzip(self):
+        """Тест 2: Проверить сжатую выгрузку CSV."""
+        data = gzip.decompress(b"".join(iter_export(self.engine, "csv", gzip=True, batch_size=10))).decode()
+
+        rows = list(csv.reader(io.StringIO(data)))
+        assert rows[0] == HEADER
+        assert len(rows) == 26
+        assert rows[25][1:3] == ["Товар 24", "Описание, с запятой"]
+
+    def test_export_import_round_trip(self):
+        """Тест 3: Проверить, что выгрузку CSV можно загрузить обратно импортом."""
+        data = "".join(iter_export(self.engine, "csv")).encode()
+
+        with Session(self.engine) as session:
+            report = ItemImporter(session).run(io.BytesIO(data), "csv")
+
+        assert (report.imported, report.failed) == (25, 0)
+
+    def test_export_empty_catalog(self):
+        """Тест 4: Проверить выгрузку пустого каталога."""
+        SQLModel.metadata.drop_all(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+
+        assert "".join(iter_export(self.engine, "csv")) == ",".join(HEADER) + "\r\n"
+        assert list(iter_export(self.engine, "ndjson")) == []
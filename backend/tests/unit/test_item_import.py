@@ -0,0 +1,88 @@
+import io
+import json
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from general.item_import import ItemImporter
+from models.brand import Brand
+from models.category import Category
+from models.item import Item
+
+
+# Массовый импорт товаров
+class TestItemImport:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        self.session.add_all([Brand(name="Samsung"), Category(name="Смартфоны")])
+        self.session.commit()
+        yield
+        self.session.close()
+
+    def run(self, data: str, fmt: str, batch_size: int = 1000):
+        report = ItemImporter(self.session, batch_size=batch_size).run(io.BytesIO(data.encode()), fmt)
+        lines = [json.loads(line) for line in report.lines()]
+        return lines[0], lines[1:]
+
+    def items(self) -> list[Item]:
+        return self.session.exec(select(Item).order_by(Item.id)).all()
+
+    def test_import_csv_with_names(self):
+        """Тест 1: Проверить импорт CSV с названиями бренда и категории."""
+        data = (
+            "name,description,price,quantity,brand,category\n"
+            "Galaxy S24,Смартфон,79990,5,samsung,Смартфоны\n"
+            '"Galaxy A55","Смартфон, 8/256",39990,,Samsung,смартфоны\n'
+        )
+
+        summary, errors = self.run(data, "csv")
+
+        assert summary == {"rows": 2, "imported": 2, "failed": 0}
+        assert errors == []
+        items = self.items()
+        assert [(item.name, item.price, item.quantity) for item in items] == [
+            ("Galaxy S24", 79990, 5), ("Galaxy A55", 39990, 0),
+        ]
+        assert items[1].description == "Смартфон, 8/256"
+        assert {item.brand_id for item in items} == {1}
+
+    def test_import_ndjson_row_errors(self):
+        """Тест 2: Проверить построчный отчёт об ошибках NDJSON и вставку корректных строк."""
+        rows = [
+            {"name": "Galaxy S24", "description": "Смартфон", "price": 79990, "brand_id": 1, "category_id": 1},
+            {"name": "Pixel 9", "description": "Смартфон", "price": 69990, "brand": "Google", "category": "Смартфоны"},
+            "не json",
+            {"name": "", "description": "Смартфон", "price": 0, "brand_id": 1, "category_id": 1},
+            {"name": "Galaxy A15", "description": "Смартфон", "price": 15990, "brand_id": 7, "category_id": 1},
+        ]
+        data = "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+        summary, errors = self.run(data, "ndjson")
+
+        assert summary == {"rows": 5, "imported": 1, "failed": 4}
+        assert [error["row"] for error in errors] == [2, 3, 4, 5]
+        assert errors[0]["errors"] == [{"field": "brand", "message": "Бренд «Google» не найден"}]
+        assert errors[1]["errors"][0]["message"].startswith("Некорректный JSON")
+        assert {error["field"] for error in errors[2]["errors"]} == {"name", "price"}
+        assert errors[3]["errors"] == [{"field": "brand_id", "message": "Бренд с id 7 не найден"}]
+        assert [item.name for item in self.items()] == ["Galaxy S24"]
+
+    def test_import_in_batches(self):
+        """Тест 3: Проверить вставку большого файла несколькими пакетами."""
+        data = "name,description,price,brand_id,category_id\n" + "".join(
+            f"Товар {i},Описание,{i + 1},1,1\n" for i in range(2500)
+        )
+
+        summary, errors = self.run(data, "csv", batch_size=1000)
+
+        assert summary == {"rows": 2500, "imported": 2500, "failed": 0}
+        items = self.items()
+        assert len(items) == 2500
+        assert items[-1].name == "Товар 2499"
@@ -0,0 +1,59 @@
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from api.routs.item import get_similar_items, read_items
+from general.auth import Role
+from general.listing import item_dict, item_query, read_rows
+from models.brand import Brand
+from models.category import Category
+from models.cover import Cover
+from models.item import Item
+from models.user import User, UserRead
+
+
+# Списки без объектов ORM
+class TestListing:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            brand, category = Brand(name="Бренд"), Category(name="Чехлы")
+            session.add_all([
+                Item(name="Чехол", description="Кожаный", price=100, quantity=3, brand=brand, category=category, cover=Cover(name="c.png")),
+                Item(name="Плёнка", description="Защитная", price=50, brand=brand, category=category),
+                Item(name="Стекло", description="Защитное", price=70, brand=brand, category=category),
+            ])
+            session.add(User(username="admin", role=Role.ADMIN, password_hash="hash"))
+            session.commit()
+        self.session = Session(engine)
+        yield
+        self.session.close()
+        SQLModel.metadata.drop_all(engine)
+
+    def test_item_rows(self):
+        """Тест 1: Проверить словари товаров с брендом, категорией и обложкой из одного запроса."""
+        rows = self.session.exec(item_query()).all()
+
+        items = [item_dict(row) for row in rows]
+        assert [item["name"] for item in items] == ["Чехол", "Плёнка", "Стекло"]
+        assert items[0] == {
+            "id": 1, "name": "Чехол", "description": "Кожаный", "price": 100, "quantity": 3,
+            "brand": {"id": 1, "name": "Бренд"}, "category": {"id": 1, "name": "Чехлы"}, "cover": {"id": 1, "name": "c.png"},
+        }
+        assert items[1]["cover"] is None
+
+    def test_no_orm_objects(self):
+        """Тест 2: Проверить, что списки товаров не загружают объекты в сессию."""
+        page = read_items(self.session, offset=0, limit=2, search="")
+        similar = get_similar_items(1, self.session, limit=5)
+
+        assert len(self.session.identity_map) == 0
+        assert b'"total":3,"pages":2' in page.body
+        # Похожие товары упорядочены по разнице в цене
+        assert similar.body.index("Стекло".encode()) < similar.body.index("Плёнка".encode())
+
+    def test_read_rows(self):
+        """Тест 3: Проверить выборку только столбцов модели ответа."""
+        assert read_rows(self.session, User, UserRead) == [{"username": "admin", "role": Role.ADMIN, "id": 1}]
@@ -0,0 +1,77 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from general.loop_monitor import UNKNOWN_ROUTE, LoopBlockedError, LoopMonitor, LoopMonitorMiddleware
+from general.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+
+
+# Сторож цикла событий
+class TestLoopMonitor:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.monitor = LoopMonitor(threshold=0.05, interval=0.01)
+        self.app = FastAPI()
+        self.app.add_middleware(LoopMonitorMiddleware, monitor=self.monitor)
+
+        @self.app.get("/block/{item_id}")
+        async def block(item_id: int):
+            time.sleep(0.2)
+            return {"id": item_id}
+
+        @self.app.get("/sleep")
+        async def sleep():
+            await asyncio.sleep(0.2)
+            return {}
+
+        @self.app.get("/sync")
+        def sync():
+            time.sleep(0.2)
+            return {}
+
+        self.client = TestClient(self.app)
+        yield
+        self.monitor.stop()
+
+    def test_blocking_call_in_async_route(self, caplog):
+        """Тест 1: Проверить обнаружение блокирующего вызова, маршрут и стек в журнале."""
+        with patch("config.LOOP_BLOCK_RAISE", False), caplog.at_level("WARNING", logger="general.loop_monitor"):
+            assert self.client.get("/block/1").status_code == 200
+
+        records = [record for record in caplog.records if record.name == "general.loop_monitor"]
+        assert len(records) == 1
+        message = records[0].getMessage()
+        assert "[GET /block/{item_id}]" in message
+        assert "in block" in message and "time.sleep" in message
+
+    def test_raise_mode(self):
+        """Тест 2: Проверить LoopBlockedError в режиме для тестов."""
+        with patch("config.LOOP_BLOCK_RAISE", True):
+            with pytest.raises(LoopBlockedError, match=r"GET /block/\{item_id\}"):
+                self.client.get("/block/1")
+
+    def test_non_blocking_routes(self):
+        """Тест 3: Проверить, что await и синхронные эндпоинты в пуле потоков не считаются блокировкой."""
+        with patch("config.LOOP_BLOCK_RAISE", True):
+            assert self.client.get("/sleep").status_code == 200
+            assert self.client.get("/sync").status_code == 200
+
+    def test_metrics(self):
+        """Тест 4: Проверить метрики задержки цикла и блокировок по маршрутам."""
+        labels = ("GET /block/{item_id}",)
+        blocks = EVENT_LOOP_BLOCKS.value(labels)
+        unknown = EVENT_LOOP_BLOCKS.value((UNKNOWN_ROUTE,))
+        lag_count = EVENT_LOOP_LAG_SECONDS.count()
+
+        with patch("config.LOOP_BLOCK_RAISE", False), TestClient(self.app) as client:
+            client.get("/sleep")
+            client.get("/block/1")
+            # Пульс измеряет задержку после окончания блокировки
+            client.get("/sleep")
+
+        assert EVENT_LOOP_LAG_SECONDS.count() > lag_count
+        assert EVENT_LOOP_BLOCKS.value(labels) == blocks + 1
+        assert EVENT_LOOP_BLOCKS.value((UNKNOWN_ROUTE,)) == unknown
@@ -0,0 +1,136 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import create_engine
+from sqlmodel.pool import StaticPool
+
+from general import metrics
+from general.connection_manager import ConnectionManager
+from general.metrics import (
+    CallbackMetric, Counter, Gauge, Histogram, MetricsMiddleware, Registry,
+    instrument_engine, instrument_manager, instrument_routes,
+)
+
+
+# Метрики Prometheus
+class TestMetrics:
+    def test_counter_and_gauge(self):
+        """Тест 1: Проверить формат счётчика и датчика с метками."""
+        counter = Counter("requests_total", "Запросы", ("route",))
+        counter.inc(("/items/",))
+        counter.inc(("/items/",), 2)
+        gauge = Gauge("in_progress", "В обработке")
+        gauge.inc()
+        gauge.dec()
+
+        assert counter.render().splitlines() == [
+            "# HELP requests_total Запросы",
+            "# TYPE requests_total counter",
+            'requests_total{route="/items/"} 3',
+        ]
+        assert gauge.render().splitlines()[-1] == "in_progress 0"
+
+    def test_histogram(self):
+        """Тест 2: Проверить накопительные корзины, сумму и число наблюдений."""
+        histogram = Histogram("duration_seconds", "Длительность", (0.1, 1), ("route",))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, ("/",))
+
+        assert histogram.render().splitlines()[2:] == [
+            'duration_seconds_bucket{route="/",le="0.1"} 2',
+            'duration_seconds_bucket{route="/",le="1"} 3',
+            'duration_seconds_bucket{route="/",le="+Inf"} 4',
+            'duration_seconds_sum{route="/"} 3.65',
+            'duration_seconds_count{route="/"} 4',
+        ]
+
+    def test_label_escaping_and_registry(self):
+        """Тест 3: Проверить экранирование значений меток и вывод реестра."""
+        registry = Registry()
+        registry.register(CallbackMetric("value", "Значение", "gauge", lambda: [(('a"b\\c',), 1.5)], ("name",)))
+
+        assert registry.render().endswith('value{name="a\\"b\\\\c"} 1.5\n')
+
+    def test_middleware_labels_by_route_template(self):
+        """Тест 4: Проверить метки маршрута, код ответа и запросы в обработке."""
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+        in_progress = []
+
+        @app.get("/things/{thing_id}")
+        def read_thing(thing_id: int):
+            in_progress.append(metrics.HTTP_IN_PROGRESS.value(("GET", "/things/{thing_id}")))
+            if thing_id == 0:
+                raise HTTPException(status_code=404)
+            return {"id": thing_id}
+
+        instrument_routes(app.routes)
+        instrument_routes(app.routes)
+        labels = ("GET", "/things/{thing_id}")
+        ok = metrics.HTTP_REQUESTS.value(labels + ("200",))
+        missing = metrics.HTTP_REQUESTS.value(labels + ("404",))
+        unmatched = metrics.HTTP_REQUESTS.value(("GET", metrics.UNMATCHED_ROUTE, "404"))
+        observed = metrics.HTTP_REQUEST_SECONDS.count(labels)
+
+        client = TestClient(app)
+        client.get("/things/1")
+        client.get("/things/2")
+        client.get("/things/0")
+        client.get("/other")
+
+        assert metrics.HTTP_REQUESTS.value(labels + ("200",)) == ok + 2
+        assert metrics.HTTP_REQUESTS.value(labels + ("404",)) == missing + 1
+        assert metrics.HTTP_REQUESTS.value(("GET", metrics.UNMATCHED_ROUTE, "404")) == unmatched + 1
+        assert metrics.HTTP_REQUEST_SECONDS.count(labels) == observed + 3
+        # Повторная обёртка маршрутов не удваивает счёт
+        assert set(in_progress) == {1}
+        assert metrics.HTTP_IN_PROGRESS.value(labels) == 0
+
+    def test_queries_per_request(self):
+        """Тест 5: Проверить подсчёт запросов к БД внутри запроса HTTP."""
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        instrument_engine(engine)
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/queries")
+        def run_queries():
+            with engine.connect() as connection:
+                for _ in range(3):
+                    connection.execute(text("SELECT 1"))
+            return {}
+
+        labels = ("GET", "/queries")
+        total = metrics.DB_QUERIES.value()
+        TestClient(app).get("/queries")
+        # Метрика пула снова привязывается к движку приложения
+        from db import engine as app_engine
+        instrument_engine(app_engine)
+
+        assert metrics.DB_QUERIES.value() == total + 3
+        assert metrics.DB_QUERIES_PER_REQUEST.count(labels) == 1
+        assert 'db_queries_per_request_sum{method="GET",route="/queries"} 3' in metrics.REGISTRY.render()
+
+    @pytest.mark.asyncio
+    async def test_connection_manager_metrics(self):
+        """Тест 6: Проверить метрики подключений и потерянных сообщений."""
+        manager = ConnectionManager(queue_size=1)
+        instrument_manager(manager)
+        websocket = AsyncMock(spec=WebSocket)
+        broadcasts = metrics.WS_BROADCAST_SECONDS.count()
+
+        await manager.connect(websocket)
+        assert "ws_connections 1" in metrics.REGISTRY.render()
+
+        await manager.broadcast("first")
+        await manager.broadcast("second")
+
+        output = metrics.REGISTRY.render()
+        # Метрики снова привязываются к менеджеру приложения
+        from api.deps import manager as app_manager
+        instrument_manager(app_manager)
+        assert 'ws_dropped_sends_total{reason="queue_full"} 1' in output
+        assert "ws_connections 0" in output
+        assert metrics.WS_BROADCAST_SECONDS.count() == broadcasts + 2
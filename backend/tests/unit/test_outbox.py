@@ -0,0 +1,243 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from general.connection_manager import ConnectionManager
+from api.routs.item import restock_items, update_quantity
+from general.outbox import OutboxDispatcher, add_purchase_event
+from general.stock_channel import StockChannel
+from models.item import ItemAdd, ItemRestock
+from models.item import Item
+from models.notification import NotificationOutbox
+
+ITEM_IDS = {"Ноутбук": 1, "Смартфон": 2, "Наушники": 3}
+
+
+# Журнал уведомлений о покупках
+class TestOutbox:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(self.engine)
+        self.manager = ConnectionManager(coalesce_window=0)
+        self.dispatcher = OutboxDispatcher(self.engine, self.manager, poll_interval=60, batch_size=2)
+
+    def add_events(self, *events):
+        with Session(self.engine) as session:
+            for username, item, quantity in events:
+                add_purchase_event(session, username, self.item(item), quantity)
+            session.commit()
+
+    def item(self, name: str, quantity: int = 10) -> Item:
+        return Item(id=ITEM_IDS[name], name=name, description="Описание", price=100,
+                    quantity=quantity, category_id=1, brand_id=ITEM_IDS[name])
+
+    def read_quantity(self, item_id: int):
+        async def read():
+            with Session(self.engine) as session:
+                return session.get(Item, item_id).quantity
+        return read
+
+    def sent(self, websocket) -> list[dict]:
+        self.manager.disconnect(websocket)
+        return [json.loads(call.args[0]) for call in websocket.send_text.call_args_list]
+
+    @pytest.mark.asyncio
+    async def test_dispatch_committed_events(self):
+        """Тест 1: Проверить рассылку записанных событий с их номерами."""
+        websocket = AsyncMock()
+        await self.manager.connect(websocket)
+
+        self.add_events(("иванов_иван", "Ноутбук", 2), ("петров_пётр", "Смартфон", 1), ("иванов_иван", "Наушники", 3))
+        await self.dispatcher.dispatch_once()
+        await self.manager.flush()
+
+        messages = self.sent(websocket)
+        assert [(m["id"], m["username"], m["item"], m["quantity"]) for m in messages] == [
+            (1, "иванов_иван", "Ноутбук", 2),
+            (2, "петров_пётр", "Смартфон", 1),
+            (3, "иванов_иван", "Наушники", 3),
+        ]
+        assert messages[0] | {"id": None} == {
+            "id": None, "username": "иванов_иван", "item": "Ноутбук", "quantity": 2,
+            "item_id": 1, "category_id": 1, "brand_id": 1, "remaining": 10,
+        }
+        assert self.dispatcher.last_id == 3
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_event_not_sent(self):
+        """Тест 2: Проверить, что событие откаченной транзакции не рассылается."""
+        websocket = AsyncMock()
+        await self.manager.connect(websocket)
+
+        with Session(self.engine) as session:
+            add_purchase_event(session, "иванов_иван", self.item("Ноутбук"), 2)
+            session.rollback()
+        await self.dispatcher.dispatch_once()
+        await self.manager.flush()
+
+        assert self.sent(websocket) == []
+
+    @pytest.mark.asyncio
+    async def test_start_skips_history(self):
+        """Тест 3: Проверить, что события, записанные до запуска, не рассылаются повторно."""
+        self.add_events(("иванов_иван", "Ноутбук", 2))
+        await self.dispatcher.start()
+        await self.dispatcher.stop()
+
+        assert self.dispatcher.last_id == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_missed_events(self):
+        """Тест 4: Проверить отправку пропущенных событий после last_event_id без повторов."""
+        self.add_events(*[("иванов_иван", "Ноутбук", 1)] * 5)
+        await self.dispatcher.dispatch_once()
+
+        websocket = AsyncMock()
+        await self.manager.connect(websocket)
+        await self.dispatcher.replay(websocket, 2)
+
+        # Событие, уже отправленное при восстановлении, не рассылается повторно
+        await self.manager.deliver_event({"id": 5, "username": "иванов_иван", "item": "Ноутбук", "quantity": 1})
+        self.add_events(("петров_пётр", "Смартфон", 1))
+        await self.dispatcher.dispatch_once()
+        await self.manager.flush()
+
+        assert [message["id"] for message in self.sent(websocket)] == [3, 4, 5, 6]
+
+    @pytest.mark.asyncio
+    async def test_replay_limit(self):
+        """Тест 5: Проверить ограничение числа восстанавливаемых событий."""
+        self.add_events(*[("иванов_иван", "Ноутбук", 1)] * 5)
+        await self.dispatcher.dispatch_once()
+        self.dispatcher.replay_limit = 2
+
+        websocket = AsyncMock()
+        await self.manager.connect(websocket)
+        await self.dispatcher.replay(websocket, 0)
+        await self.manager.flush()
+
+        assert [message["id"] for message in self.sent(websocket)] == [4, 5]
+
+    @pytest.mark.asyncio
+    async def test_coalesced_batch_has_last_id(self):
+        """Тест 6: Проверить, что объединённое сообщение несёт номер последнего события пакета."""
+        manager = ConnectionManager(coalesce_window=0.01)
+        manager.broadcast = AsyncMock()
+        dispatcher = OutboxDispatcher(self.engine, manager)
+
+        self.add_events(("иванов_иван", "Ноутбук", 1), ("петров_пётр", "Ноутбук", 2))
+        await dispatcher.dispatch_once()
+        await manager._pending_flush
+
+        message = json.loads(manager.broadcast.call_args[0][0])
+        assert message["id"] == 2
+        assert message["quantity"] == 3
+        assert manager.broadcast.call_args[0][1] == 2
+
+    @pytest.mark.asyncio
+    async def test_cleanup(self):
+        """Тест 7: Проверить удаление событий старше времени хранения."""
+        self.add_events(("иванов_иван", "Ноутбук", 1))
+        with Session(self.engine) as session:
+            session.add(NotificationOutbox(
+                payload="{}", created_at=datetime.now(timezone.utc) - timedelta(days=2),
+            ))
+            session.commit()
+
+        await self.dispatcher.cleanup()
+
+        with Session(self.engine) as session:
+            assert [event.id for event in session.exec(select(NotificationOutbox)).all()] == [1]
+
+    @pytest.mark.asyncio
+    async def test_replay_respects_topics(self):
+        """Тест 8: Проверить, что при восстановлении отправляются только события подписанных тем."""
+        self.add_events(("иванов_иван", "Ноутбук", 1), ("иванов_иван", "Смартфон", 1), ("иванов_иван", "Ноутбук", 1))
+        await self.dispatcher.dispatch_once()
+
+        websocket = AsyncMock()
+        await self.manager.connect(websocket, topics={"item:1"})
+        await self.dispatcher.replay(websocket, 0)
+        await self.manager.flush()
+
+        assert [message["id"] for message in self.sent(websocket)] == [1, 3]
+
+    @pytest.mark.asyncio
+    async def test_dispatch_updates_stock(self):
+        """Тест 9: Проверить передачу остатка после покупки в публичную рассылку."""
+        stock = Mock()
+        dispatcher = OutboxDispatcher(self.engine, self.manager, stock=stock)
+
+        with Session(self.engine) as session:
+            add_purchase_event(session, "иванов_иван", self.item("Смартфон", quantity=4), 1)
+            session.commit()
+        await dispatcher.dispatch_once()
+
+        stock.publish.assert_called_once_with(2, 4)
+
+    @pytest.mark.asyncio
+    async def test_restock_reaches_stock_subscriber(self):
+        """Тест 10: Проверить, что пополнение склада доходит до зрителей остатков, но не до менеджеров."""
+        channel = StockChannel(interval=0)
+        dispatcher = OutboxDispatcher(self.engine, self.manager, stock=channel)
+        websocket = AsyncMock()
+        await self.manager.connect(websocket)
+        with Session(self.engine) as session:
+            session.add_all([self.item("Ноутбук", quantity=2), self.item("Смартфон", quantity=4)])
+            session.commit()
+        laptop, phone = channel.subscribe(1, self.read_quantity(1)), channel.subscribe(2, self.read_quantity(2))
+        assert await anext(laptop) == 2
+        assert await anext(phone) == 4
+
+        with Session(self.engine) as session:
+            restock_items(delivery=[ItemRestock(item_id=1, quantity=5), ItemRestock(item_id=9, quantity=1)], session=session, authorize=True)
+            update_quantity(item_id=2, item=ItemAdd(quantity=3), session=session, authorize=True)
+        await dispatcher.dispatch_once()
+
+        assert await asyncio.wait_for(anext(laptop), 1) == 7
+        assert await asyncio.wait_for(anext(phone), 1) == 7
+        await self.manager.flush()
+        assert self.sent(websocket) == []
+
+        # Остатки не восстанавливаются менеджерам по last_event_id
+        websocket = AsyncMock()
+        await self.manager.connect(websocket)
+        await dispatcher.replay(websocket, 0)
+        assert self.sent(websocket) == []
+        await laptop.aclose()
+        await phone.aclose()
+
+    @pytest.mark.asyncio
+    async def test_replay_during_coalescing(self):
+        """Тест 11: Проверить, что пакет после восстановления по last_event_id не повторяет отправленные события."""
+        manager = ConnectionManager(coalesce_window=0.05)
+        dispatcher = OutboxDispatcher(self.engine, manager, poll_interval=60)
+        self.add_events(("иванов_иван", "Ноутбук", 1), ("петров_пётр", "Ноутбук", 2))
+        await dispatcher.dispatch_once()
+
+        # Переподключение, пока первые события ждут в пакете
+        websocket = AsyncMock()
+        await manager.connect(websocket)
+        await dispatcher.replay(websocket, 0)
+        self.add_events(("сидоров_сидор", "Ноутбук", 3))
+        await dispatcher.dispatch_once()
+        await manager._pending_flush
+        await manager.flush()
+
+        manager.disconnect(websocket)
+        messages = [json.loads(call.args[0]) for call in websocket.send_text.call_args_list]
+        assert [(m["id"], m["username"], m["quantity"]) for m in messages] == [
+            (1, "иванов_иван", 1),
+            (2, "петров_пётр", 2),
+            (3, "сидоров_сидор", 3),
+        ]
+        assert messages[-1]["purchases"] == 1
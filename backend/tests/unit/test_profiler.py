@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from general.profiler import ProfilerMiddleware, RequestProfiler, Sampler
+
+
+def busy_loop(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+# Профилировщик запросов
+class TestProfiler:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.profiler = RequestProfiler(directory=str(tmp_path), max_files=3)
+        self.app = FastAPI()
+        self.app.add_middleware(ProfilerMiddleware, profiler=self.profiler)
+
+        @self.app.get("/items/{item_id}")
+        def read_item(item_id: int):
+            busy_loop(0.02)
+            return {"id": item_id}
+
+        @self.app.get("/users/")
+        def read_users():
+            return []
+
+        self.routes = {route.path: route for route in self.app.routes}
+        self.client = TestClient(self.app)
+
+    def test_sampler_speedscope(self):
+        """Тест 1: Проверить выборки занятого потока и формат speedscope."""
+        sampler = Sampler(0.001)
+        worker = threading.Thread(target=busy_loop, args=(0.05,), name="busy")
+        sampler.start()
+        worker.start()
+        worker.join()
+        sampler.stop()
+
+        profile = sampler.speedscope("test")
+        frames = profile["shared"]["frames"]
+        busy = next(item for item in profile["profiles"] if item["name"] == "busy")
+        assert busy["samples"] and len(busy["samples"]) == len(busy["weights"])
+        assert all(0 <= index < len(frames) for stack in busy["samples"] for index in stack)
+        assert all("busy_loop" in [frames[index]["name"] for index in stack] for stack in busy["samples"])
+
+    def test_profiles_next_requests_to_route(self):
+        """Тест 2: Проверить профилирование только N запросов к выбранному маршруту."""
+        self.profiler.arm(self.routes["/items/{item_id}"], "GET", 2, 0.001)
+
+        self.client.get("/users/")
+        for item_id in range(3):
+            assert self.client.get(f"/items/{item_id}").status_code == 200
+
+        profiles = self.profiler.profiles()
+        assert len(profiles) == 2
+        assert self.profiler.target is None
+        data = json.loads(self.profiler.path(profiles[0]["name"]).read_text())
+        assert data["name"].startswith("GET /items/{item_id}")
+        assert data["profiles"]
+
+    def test_method_must_match(self):
+        """Тест 3: Проверить, что запрос другим методом не профилируется."""
+        self.profiler.arm(self.routes["/items/{item_id}"], "POST", 1)
+
+        self.client.get("/items/1")
+
+        assert self.profiler.profiles() == []
+        assert self.profiler.target.remaining == 1
+
+    def test_old_profiles_removed(self):
+        """Тест 4: Проверить ограничение числа хранимых профилей."""
+        self.profiler.arm(self.routes["/users/"], "GET", 5, 0.001)
+
+        for _ in range(5):
+            self.client.get("/users/")
+
+        assert len(self.profiler.profiles()) == 3
+
+    def test_profile_path_validation(self):
+        """Тест 5: Проверить отказ в доступе к файлам вне каталога профилей."""
+        assert self.profiler.path("../store.db") is None
+        assert self.profiler.path("missing.speedscope.json") is None
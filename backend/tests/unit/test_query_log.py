@@ -0,0 +1,95 @@
+import logging
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from general.query_log import QueryLogMiddleware, RepeatedQueryError, enable_query_log, statement_shape
+from models.brand import Brand
+from models.category import Category
+from models.item import Item, Image
+
+
+# Журнал медленных запросов и поиск N+1
+class TestQueryLog:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        enable_query_log(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+        with Session(self.engine) as session:
+            session.add_all([Brand(name="Samsung"), Category(name="Смартфоны")])
+            session.commit()
+            session.add_all([
+                Item(name=f"Товар {i}", description="Описание", price=100, quantity=1, brand_id=1, category_id=1)
+                for i in range(10)
+            ])
+            session.commit()
+            session.add_all([Image(name=f"image_{i}.jpg", item_id=i + 1) for i in range(10)])
+            session.commit()
+
+    def make_app(self):
+        app = FastAPI()
+        app.add_middleware(QueryLogMiddleware)
+        engine = self.engine
+
+        @app.get("/items/{item_id}")
+        def read_item(item_id: int):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT * FROM item WHERE id = :id"), {"id": item_id})
+            return {}
+
+        @app.get("/items/")
+        def read_items():
+            with Session(engine) as session:
+                items = session.exec(select(Item)).all()
+                return [len(item.images) for item in items]
+
+        return app
+
+    def test_statement_shape(self):
+        """Тест 1: Проверить нормализацию текста запроса."""
+        assert statement_shape("SELECT id\n  FROM item WHERE id IN (?, ?, ?)") == "SELECT id FROM item WHERE id IN (?)"
+        assert statement_shape("SELECT id FROM item WHERE id IN (?)") == "SELECT id FROM item WHERE id IN (?)"
+
+    def test_slow_query_logged_with_route(self, caplog):
+        """Тест 2: Проверить запись медленного запроса с маршрутом и параметрами."""
+        with patch("config.SLOW_QUERY_THRESHOLD", 0), caplog.at_level(logging.WARNING, logger="general.query_log"):
+            TestClient(self.make_app()).get("/items/5")
+
+        records = [record.getMessage() for record in caplog.records]
+        assert any("[GET /items/{item_id}]" in message and "(5,)" in message for message in records)
+
+    def test_fast_query_not_logged(self, caplog):
+        """Тест 3: Проверить, что быстрые запросы не попадают в журнал."""
+        with patch("config.SLOW_QUERY_THRESHOLD", 10), caplog.at_level(logging.WARNING, logger="general.query_log"):
+            TestClient(self.make_app()).get("/items/5")
+
+        assert caplog.records == []
+
+    def test_repeated_query_warning(self, caplog):
+        """Тест 4: Проверить предупреждение о ленивой загрузке связи в цикле."""
+        with patch("config.QUERY_REPEAT_LIMIT", 5), patch("config.QUERY_REPEAT_RAISE", False), \
+                caplog.at_level(logging.WARNING, logger="general.query_log"):
+            TestClient(self.make_app()).get("/items/")
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert len(messages) == 1
+        assert "10 раз [GET /items/]" in messages[0]
+        assert "FROM image" in messages[0]
+
+    def test_repeated_query_raises_in_test_mode(self):
+        """Тест 5: Проверить исключение при повторах в режиме тестов."""
+        with patch("config.QUERY_REPEAT_LIMIT", 5), patch("config.QUERY_REPEAT_RAISE", True):
+            with pytest.raises(RepeatedQueryError):
+                TestClient(self.make_app()).get("/items/")
+
+            # Запросы одного товара не повторяются
+            assert TestClient(self.make_app()).get("/items/5").status_code == 200
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine, inspect, select, func
+from sqlmodel import Session
+
+from general.password import verify_password
+from general.seeder import USER_PASSWORD, seed, username
+from models.brand import Brand
+from models.category import Category
+from models.cover import Cover
+from models.item import Item, Image
+from models.user import User, Role
+
+
+# Заполнение базы синтетическим каталогом
+class TestSeeder:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.path = tmp_path / "store.db"
+        self.engine = create_engine(f"sqlite:///{self.path}")
+        yield
+        self.engine.dispose()
+
+    def count(self, model) -> int:
+        with Session(self.engine) as session:
+            return session.exec(select(func.count()).select_from(model)).one()[0]
+
+    def test_seed_catalog(self):
+        """Тест 1: Проверить состав и связи сгенерированного каталога."""
+        report = seed(self.engine, items=250, users=10, images_per_item=2, batch_size=100)
+
+        assert (report.items, report.covers, report.images, report.users) == (250, 250, 500, 13)
+        assert self.count(Item) == 250
+        assert self.count(Image) == 500
+        assert self.count(Cover) == 250
+        with Session(self.engine) as session:
+            item = session.get(Item, 1)
+            assert item.brand is not None and item.category is not None and item.cover is not None
+            assert len(item.images) == 2
+            assert item.name.split()[0] in item.description
+            assert 1 <= item.price <= 10 ** 8
+            assert session.exec(select(func.max(Item.brand_id))).one()[0] <= self.count(Brand)
+            assert session.exec(select(func.max(Item.category_id))).one()[0] <= self.count(Category)
+
+    def test_seed_is_reproducible(self, tmp_path):
+        """Тест 2: Проверить совпадение каталогов при одинаковом начальном значении."""
+        other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+        seed(self.engine, items=50, users=0, seed=7)
+        seed(other, items=50, users=0, seed=7)
+
+        query = select(Item.name, Item.description, Item.price, Item.brand_id).order_by(Item.id)
+        with self.engine.connect() as first, other.connect() as second:
+            assert first.execute(query).all() == second.execute(query).all()
+        other.dispose()
+
+    def test_seed_users(self):
+        """Тест 3: Проверить учётные записи и общий хеш пароля сгенерированных пользователей."""
+        seed(self.engine, items=0, users=5)
+
+        with Session(self.engine) as session:
+            admin = session.exec(select(User).where(User.username == "admin")).one()[0]
+            users = [row[0] for row in session.exec(select(User).where(User.username.like("user_%")))]
+        assert admin.role == Role.ADMIN
+        assert verify_password("adminadmin", admin.password_hash)
+        assert [user.username for user in users] == [username(number) for number in range(5)]
+        assert len({user.password_hash for user in users}) == 1
+        assert verify_password(USER_PASSWORD, users[0].password_hash)
+
+    def test_seed_requires_empty_database(self):
+        """Тест 4: Проверить отказ заполнять непустую базу без --reset."""
+        seed(self.engine, items=10, users=0)
+
+        with pytest.raises(RuntimeError):
+            seed(self.engine, items=10, users=0)
+        report = seed(self.engine, items=20, users=0, reset=True)
+
+        assert report.items == 20
+        assert self.count(Item) == 20
+
+    def test_indexes_restored(self):
+        """Тест 5: Проверить, что индексы, снятые на время загрузки, созданы заново."""
+        seed(self.engine, items=10, users=0)
+
+        indexes = {index["name"] for table in ("item", "image") for index in inspect(self.engine).get_indexes(table)}
+        assert {"ix_item_brand_id", "ix_item_category_id", "ix_item_cover_id", "ix_item_price", "ix_image_item_id"} <= indexes
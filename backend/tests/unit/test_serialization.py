@@ -0,0 +1,76 @@
+import json
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from general.serialization import JSONBytesResponse, dump_json, serialize
+from models.brand import Brand
+from models.category import Category
+from models.cover import Cover
+from models.item import Item, ItemRead, ItemsPagination
+
+
+# Быстрая сериализация списков
+class TestSerialization:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        SQLModel.metadata.create_all(engine)
+        self.session = Session(engine)
+        brand, category = Brand(name="Бренд"), Category(name="Чехлы")
+        self.session.add_all([
+            Item(name="Чехол", description="Кожаный", price=100, quantity=3, brand=brand, category=category, cover=Cover(name="c.png")),
+            Item(name="Плёнка", description="Защитная", price=50, brand=brand, category=category),
+        ])
+        self.session.commit()
+
+        self.adapter = TypeAdapter(ItemsPagination)
+        self.app = FastAPI()
+
+        @self.app.get("/items/", response_model=ItemsPagination)
+        def read_items():
+            items = self.session.exec(select(Item)).all()
+            return serialize(self.adapter, {"items": items, "total": len(items), "pages": 1})
+
+        self.client = TestClient(self.app)
+        yield
+        self.session.close()
+        SQLModel.metadata.drop_all(engine)
+
+    def test_same_output_as_response_model(self):
+        """Тест 1: Проверить, что быстрый путь отдаёт тот же JSON, что и стандартная сериализация FastAPI."""
+        fast = self.client.get("/items/")
+        with patch("config.FAST_SERIALIZATION", False):
+            standard = self.client.get("/items/")
+
+        assert fast.status_code == standard.status_code == 200
+        assert fast.headers["content-type"] == "application/json"
+        assert fast.content == standard.content
+        assert fast.json()["items"][0]["cover"] == {"name": "c.png", "id": 1, "url": "http://localhost/img/c.png"}
+        assert fast.json()["items"][1]["cover"] is None
+
+    def test_dump_json_validates(self):
+        """Тест 2: Проверить, что поля вне модели ответа не попадают в JSON."""
+        items = self.session.exec(select(Item)).all()
+
+        data = json.loads(dump_json(TypeAdapter(list[ItemRead]), items))
+
+        assert data[0]["name"] == "Чехол"
+        assert set(data[0]) == {"name", "description", "price", "id", "brand", "category", "cover", "quantity"}
+
+    def test_standard_path(self):
+        """Тест 3: Проверить, что без FAST_SERIALIZATION результат возвращается без изменений."""
+        content = {"items": [], "total": 0, "pages": 0}
+        with patch("config.FAST_SERIALIZATION", False):
+            assert serialize(self.adapter, content) is content
+
+    def test_response_class(self):
+        """Тест 4: Проверить передачу готовых байтов без повторного кодирования."""
+        response = JSONBytesResponse('{"название":1}'.encode())
+
+        assert response.body == '{"название":1}'.encode()
+        assert response.headers["content-type"] == "application/json"
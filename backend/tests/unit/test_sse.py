@@ -0,0 +1,108 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import HTTPException
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.pool import StaticPool
+
+from api.routs.events import stream_events
+from general.connection_manager import ConnectionManager
+from general.outbox import OutboxDispatcher, add_purchase_event
+from general.sse import SSEConnection, format_event
+from models.item import Item
+
+
+# Лента уведомлений через Server-Sent Events
+class TestSSE:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(self.engine)
+        self.manager = ConnectionManager(coalesce_window=0)
+        self.dispatcher = OutboxDispatcher(self.engine, self.manager)
+        self.user = Mock(username="manager")
+        with patch("api.routs.events.manager", self.manager), patch("api.routs.events.dispatcher", self.dispatcher):
+            yield
+
+    async def open_stream(self, **kwargs):
+        response = await stream_events(current_user=self.user, authorize=True, **kwargs)
+        assert response.media_type == "text/event-stream"
+        stream = response.body_iterator
+        assert await anext(stream) == "retry: 3000\n\n"
+        return stream
+
+    def test_format_event(self):
+        """Тест 1: Проверить формат кадров SSE."""
+        message = json.dumps({"id": 7, "item": "Ноутбук"})
+
+        assert format_event(message) == f"id: 7\ndata: {message}\n\n"
+        message = json.dumps({"item": "Ноутбук"})
+        assert format_event(message) == f"data: {message}\n\n"
+        assert format_event(json.dumps({"type": "ping"})) == ": ping\n\n"
+
+    @pytest.mark.asyncio
+    async def test_stream_events(self):
+        """Тест 2: Проверить доставку событий менеджера в поток SSE и отключение при закрытии."""
+        stream = await self.open_stream(topics="item:1")
+        assert len(self.manager.active_connections) == 1
+
+        await self.manager.deliver_event({"id": 1, "username": "иванов", "item": "Ноутбук", "quantity": 1, "item_id": 1})
+        await self.manager.deliver_event({"id": 2, "username": "иванов", "item": "Смартфон", "quantity": 1, "item_id": 2})
+        await self.manager.deliver_event({"id": 3, "username": "петров", "item": "Ноутбук", "quantity": 2, "item_id": 1})
+
+        frames = [await asyncio.wait_for(anext(stream), 1) for _ in range(2)]
+        assert [frame.split("\n")[0] for frame in frames] == ["id: 1", "id: 3"]
+
+        await stream.aclose()
+        assert self.manager.active_connections == []
+
+    @pytest.mark.asyncio
+    async def test_resume_from_last_event_id(self):
+        """Тест 3: Проверить восстановление пропущенных событий по заголовку Last-Event-ID."""
+        with Session(self.engine) as session:
+            for _ in range(3):
+                item = Item(id=1, name="Ноутбук", description="Описание", price=100, quantity=5, category_id=1, brand_id=1)
+                add_purchase_event(session, "иванов", item, 1)
+            session.commit()
+        await self.dispatcher.dispatch_once()
+
+        stream = await self.open_stream(last_event_id=0, last_event_id_header=1)
+        frames = [await asyncio.wait_for(anext(stream), 1) for _ in range(2)]
+
+        assert [frame.split("\n")[0] for frame in frames] == ["id: 2", "id: 3"]
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_connection_limit(self):
+        """Тест 4: Проверить отказ при превышении числа подключений."""
+        self.manager.max_connections = 0
+
+        with pytest.raises(HTTPException) as exc_info:
+            await self.open_stream()
+
+        assert exc_info.value.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_invalid_topics(self):
+        """Тест 5: Проверить отказ при неизвестной теме подписки."""
+        with pytest.raises(HTTPException) as exc_info:
+            await self.open_stream(topics="category:abc")
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_close_ends_stream(self):
+        """Тест 6: Проверить завершение потока при закрытии подключения менеджером."""
+        connection = SSEConnection()
+        await connection.send_text(json.dumps({"item": "Ноутбук"}))
+        await connection.close(code=1013)
+
+        assert [frame async for frame in connection.frames()] == []
+        assert connection.close_code == 1013
+        with pytest.raises(RuntimeError):
+            await connection.send_text("{}")
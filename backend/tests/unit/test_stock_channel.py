@@ -0,0 +1,135 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock
+from fastapi import HTTPException
+
+from api.routs.stock import stream_stock
+from general.stock_channel import StockChannel
+
+
+def current(quantity: int | None):
+    async def read_quantity():
+        return quantity
+    return read_quantity
+
+
+# Публичная рассылка остатков товаров
+class TestStockChannel:
+    @pytest.mark.asyncio
+    async def test_coalesced_updates(self):
+        """Тест 1: Проверить, что изменения за интервал объединяются в одно обновление."""
+        channel = StockChannel(interval=0.05)
+        stream = channel.subscribe(1, current(10))
+        assert await anext(stream) == 10
+
+        channel.publish(1, 9)
+        channel.publish(1, 7)
+        channel.publish(1, 5)
+
+        assert await asyncio.wait_for(anext(stream), 1) == 5
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_rate_limit(self):
+        """Тест 2: Проверить, что обновления товара отправляются не чаще интервала."""
+        channel = StockChannel(interval=0.1)
+        stream = channel.subscribe(1, current(10))
+        await anext(stream)
+
+        channel.publish(1, 9)
+        assert await asyncio.wait_for(anext(stream), 1) == 9
+        sent_at = asyncio.get_running_loop().time()
+
+        channel.publish(1, 8)
+        assert await asyncio.wait_for(anext(stream), 1) == 8
+        assert asyncio.get_running_loop().time() - sent_at >= 0.09
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_many_viewers_share_update(self):
+        """Тест 3: Проверить доставку одного обновления всем зрителям товара и только им."""
+        channel = StockChannel(interval=0)
+        streams = [channel.subscribe(1, current(10)) for _ in range(100)]
+        other = channel.subscribe(2, current(3))
+        for stream in streams + [other]:
+            await anext(stream)
+        assert channel.items[1].subscribers == 100
+
+        channel.publish(1, 4)
+        values = await asyncio.wait_for(asyncio.gather(*(anext(stream) for stream in streams)), 1)
+        assert values == [4] * 100
+
+        other_update = asyncio.ensure_future(anext(other))
+        await asyncio.sleep(0.01)
+        assert not other_update.done()
+        other_update.cancel()
+
+        for stream in streams:
+            await stream.aclose()
+        assert list(channel.items) == [2]
+
+    @pytest.mark.asyncio
+    async def test_keepalive_and_cleanup(self):
+        """Тест 4: Проверить сигнал keep-alive и удаление товара без зрителей."""
+        channel = StockChannel()
+        stream = channel.subscribe(1, current(10), keepalive=0.01)
+        await anext(stream)
+
+        assert await asyncio.wait_for(anext(stream), 1) is None
+        await stream.aclose()
+
+        assert channel.items == {}
+        # Без зрителей обновление ничего не делает
+        channel.publish(1, 5)
+        assert channel.items == {}
+
+    @pytest.mark.asyncio
+    async def test_stream_stock_route(self):
+        """Тест 5: Проверить поток остатков товара в формате Server-Sent Events."""
+        mock_session = Mock()
+        mock_session.get.return_value = Mock(quantity=7)
+
+        response = await stream_stock(item_id=1, session=mock_session)
+
+        mock_session.get.assert_called_once()
+        assert response.media_type == "text/event-stream"
+        mock_session.close.assert_called_once()
+        chunk = await anext(response.body_iterator)
+        assert chunk.startswith("event: stock\ndata: ")
+        assert json.loads(chunk.split("data: ")[1]) == {"item_id": 1, "quantity": 7}
+        await response.body_iterator.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_stock_not_found(self):
+        """Тест 6: Проверить ответ для несуществующего товара."""
+        mock_session = Mock()
+        mock_session.get.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await stream_stock(item_id=999, session=mock_session)
+
+        assert exc_info.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_update_during_read_not_lost(self):
+        """Тест 7: Проверить, что изменение остатка во время чтения из базы доходит до зрителя."""
+        channel = StockChannel(interval=0)
+
+        async def read_quantity():
+            # Покупка закоммичена и разослана после чтения, но до возврата остатка
+            channel.publish(1, 7)
+            return 10
+
+        stream = channel.subscribe(1, read_quantity)
+        assert await anext(stream) == 10
+        assert await asyncio.wait_for(anext(stream), 1) == 7
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_missing_item_unsubscribed(self):
+        """Тест 8: Проверить, что зритель несуществующего товара снимается с рассылки."""
+        channel = StockChannel()
+
+        assert [value async for value in channel.subscribe(1, current(None))] == []
+        assert channel.items == {}
@@ -0,0 +1,249 @@
+import pytest
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from unittest.mock import patch
+from general.storage import LocalStorage, S3Storage, StorageError
+
+
+class FakeS3:
+    """Минимальная замена S3/MinIO: хранит объекты и multipart-загрузки в памяти"""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.app = Starlette(routes=[
+            Route("/{bucket}/{key:path}", self.handle, methods=["GET", "PUT", "POST", "DELETE", "HEAD"]),
+        ])
+
+    async def handle(self, request: Request):
+        assert request.headers["authorization"].startswith("AWS4-HMAC-SHA256 Credential=key/")
+        assert "x-amz-date" in request.headers
+
+        key = request.path_params["key"]
+        params = request.query_params
+        body = await request.body()
+        self.requests.append((request.method, str(request.url.query)))
+
+        if request.method == "POST" and "uploads" in params:
+            upload_id = f"upload-{len(self.uploads) + 1}"
+            self.uploads[upload_id] = {}
+            xml = f'<InitiateMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/"><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>'
+            return Response(xml, media_type="application/xml")
+        if request.method == "PUT" and "uploadId" in params:
+            self.uploads[params["uploadId"]][int(params["partNumber"])] = body
+            return Response(headers={"ETag": f'"etag-{params["partNumber"]}"'})
+        if request.method == "POST" and "uploadId" in params:
+            parts = self.uploads.pop(params["uploadId"])
+            self.objects[key] = b"".join(parts[n] for n in sorted(parts))
+            return Response("<CompleteMultipartUploadResult/>", media_type="application/xml")
+        if request.method == "DELETE" and "uploadId" in params:
+            self.uploads.pop(params["uploadId"], None)
+            return Response(status_code=204)
+        if request.method == "PUT":
+            self.objects[key] = body
+            return Response()
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return Response(status_code=204)
+        if request.method == "HEAD":
+            return Response(status_code=200 if key in self.objects else 404)
+        if request.method == "GET" and params.get("list-type") == "2":
+            keys = sorted(k for k in self.objects if k > params.get("continuation-token", ""))
+            page = keys[:int(params["max-keys"])]
+            truncated = len(keys) > len(page)
+            contents = "".join(
+                f"<Contents><Key>{k}</Key><LastModified>2025-01-01T00:00:00.000Z</LastModified></Contents>"
+                for k in page
+            )
+            token = f"<NextContinuationToken>{page[-1]}</NextContinuationToken>" if truncated else ""
+            xml = (
+                f'<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">{contents}'
+                f"<IsTruncated>{str(truncated).lower()}</IsTruncated>{token}</ListBucketResult>"
+            )
+            return Response(xml, media_type="application/xml")
+        return Response(status_code=400)
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+# Хранилища изображений
+class TestStorage:
+    def make_s3(self, fake: FakeS3, part_size: int = 4):
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app))
+        return S3Storage(
+            endpoint="http://minio:9000",
+            bucket="img",
+            access_key="key",
+            secret_key="secret",
+            part_size=part_size,
+            client=client,
+        )
+
+    @pytest.mark.asyncio
+    async def test_local_storage_roundtrip(self, tmp_path):
+        """Тест 1: Проверить запись, проверку наличия и удаление файла в локальном хранилище."""
+        storage = LocalStorage(root=str(tmp_path), base_url="http://localhost/img/")
+
+        await storage.put_stream("фото.jpg", chunks(b"abc", b"def"))
+
+        assert (tmp_path / "фото.jpg").read_bytes() == b"abcdef"
+        assert await storage.exists("фото.jpg")
+        assert storage.url("a b.jpg") == "http://localhost/img/a%20b.jpg"
+
+        await storage.delete("фото.jpg")
+
+        assert not await storage.exists("фото.jpg")
+        with pytest.raises(FileNotFoundError):
+            await storage.delete("фото.jpg")
+
+    @pytest.mark.asyncio
+    async def test_local_storage_removes_partial_file(self, tmp_path):
+        """Тест 2: Проверить удаление недописанного файла при ошибке потока."""
+        storage = LocalStorage(root=str(tmp_path))
+
+        async def broken_stream():
+            yield b"abc"
+            raise OSError("обрыв соединения")
+
+        with pytest.raises(OSError):
+            await storage.put_stream("broken.jpg", broken_stream())
+
+        assert not (tmp_path / "broken.jpg").exists()
+
+    @pytest.mark.asyncio
+    async def test_s3_storage_small_file_single_put(self):
+        """Тест 3: Проверить загрузку небольшого файла одним запросом PUT."""
+        fake = FakeS3()
+        storage = self.make_s3(fake, part_size=100)
+
+        await storage.put_stream("small.jpg", chunks(b"abc"))
+
+        assert fake.objects["small.jpg"] == b"abc"
+        assert fake.requests == [("PUT", "")]
+
+    @pytest.mark.asyncio
+    async def test_s3_storage_multipart_upload(self):
+        """Тест 4: Проверить multipart-загрузку большого файла по частям."""
+        fake = FakeS3()
+        storage = self.make_s3(fake, part_size=4)
+
+        await storage.put_stream("big.jpg", chunks(b"abcdef", b"ghij", b"k"))
+
+        assert fake.objects["big.jpg"] == b"abcdefghijk"
+        assert fake.uploads == {}
+        methods = [method for method, _ in fake.requests]
+        assert methods == ["POST", "PUT", "PUT", "PUT", "POST"]
+
+    @pytest.mark.asyncio
+    async def test_s3_storage_aborts_failed_upload(self):
+        """Тест 5: Проверить отмену multipart-загрузки при ошибке потока."""
+        fake = FakeS3()
+        storage = self.make_s3(fake, part_size=4)
+
+        async def broken_stream():
+            yield b"abcdefgh"
+            raise OSError("обрыв соединения")
+
+        with pytest.raises(OSError):
+            await storage.put_stream("broken.jpg", broken_stream())
+
+        assert "broken.jpg" not in fake.objects
+        assert fake.uploads == {}
+
+    @pytest.mark.asyncio
+    async def test_s3_storage_exists_and_delete(self):
+        """Тест 6: Проверить проверку наличия и удаление объекта в S3."""
+        fake = FakeS3()
+        fake.objects["photo.jpg"] = b"data"
+        storage = self.make_s3(fake)
+
+        assert await storage.exists("photo.jpg")
+        assert not await storage.exists("missing.jpg")
+
+        await storage.delete("photo.jpg")
+
+        assert "photo.jpg" not in fake.objects
+        assert storage.url("photo.jpg") == "http://minio:9000/img/photo.jpg"
+
+    @pytest.mark.asyncio
+    async def test_s3_storage_error_status(self):
+        """Тест 7: Проверить ошибку хранилища при неуспешном ответе S3."""
+        async def deny(request: Request):
+            return Response("<Error><Code>AccessDenied</Code></Error>", status_code=403)
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(
+            app=Starlette(routes=[Route("/{path:path}", deny, methods=["PUT"])])
+        ))
+        storage = S3Storage("http://minio:9000", "img", "key", "secret", client=client)
+
+        with pytest.raises(StorageError):
+            await storage.put_stream("photo.jpg", chunks(b"abc"))
+
+    @pytest.mark.asyncio
+    async def test_local_storage_iter_files(self, tmp_path):
+        """Тест 8: Проверить постраничный обход локального каталога."""
+        for i in range(5):
+            (tmp_path / f"{i}.jpg").write_bytes(b"x")
+        (tmp_path / "subdir").mkdir()
+        storage = LocalStorage(root=str(tmp_path))
+
+        with patch("general.storage.LIST_PAGE_SIZE", 2):
+            files = [name async for name, _ in storage.iter_files()]
+
+        assert sorted(files) == [f"{i}.jpg" for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_s3_storage_iter_files(self):
+        """Тест 9: Проверить постраничный обход бакета S3."""
+        fake = FakeS3()
+        for i in range(5):
+            fake.objects[f"{i}.jpg"] = b"x"
+        storage = self.make_s3(fake)
+
+        with patch("general.storage.LIST_PAGE_SIZE", 2):
+            files = [item async for item in storage.iter_files()]
+
+        assert [name for name, _ in files] == [f"{i}.jpg" for i in range(5)]
+        assert files[0][1] == 1735689600.0
+        assert len([m for m, q in fake.requests if m == "GET"]) == 3
+
+    def test_read_models_use_storage_url(self):
+        """Тест 10: Проверить, что ответы с изображениями содержат адрес файла в выбранном хранилище."""
+        from models.cover import CoverRead
+        from models.item import ImageRead
+        storage = S3Storage(endpoint="http://minio:9000", bucket="img", access_key="key", secret_key="secret",
+                            public_url="https://cdn.example.com/img/")
+
+        with patch("general.storage._storage", storage):
+            cover = CoverRead(id=1, name="обложка.jpg").model_dump()
+            image = ImageRead(id=2, name="photo.jpg").model_dump()
+
+        assert cover["url"] == "https://cdn.example.com/img/%D0%BE%D0%B1%D0%BB%D0%BE%D0%B6%D0%BA%D0%B0.jpg"
+        assert image == {"name": "photo.jpg", "id": 2, "url": "https://cdn.example.com/img/photo.jpg"}
+
+    @pytest.mark.asyncio
+    async def test_s3_storage_reuses_client(self):
+        """Тест 11: Проверить, что хранилище S3 использует один клиент HTTP и закрывает его в close()."""
+        fake = FakeS3()
+        clients, client_class = [], httpx.AsyncClient
+
+        def make_client():
+            clients.append(client_class(transport=httpx.ASGITransport(app=fake.app)))
+            return clients[-1]
+
+        storage = S3Storage(endpoint="http://minio:9000", bucket="img", access_key="key", secret_key="secret", part_size=4)
+        with patch("general.storage.httpx.AsyncClient", side_effect=make_client):
+            await storage.put_stream("photo.jpg", chunks(b"0123456789"))
+            assert await storage.exists("photo.jpg")
+            await storage.close()
+
+        assert len(clients) == 1
+        assert clients[0].is_closed
+        assert len(fake.requests) > 3
@@ -0,0 +1,145 @@
+import json
+import logging
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlmodel import create_engine, text
+from sqlmodel.pool import StaticPool
+
+from general import tracing
+from general.tracing import FileExporter, RequestIdFilter, Span, TracingMiddleware, request_id, trace_engine
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+# Трассировка запросов
+class TestTracing:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.exporter = ListExporter()
+        exporter, tracing.tracer.exporter = tracing.tracer.exporter, self.exporter
+
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        trace_engine(self.engine)
+
+        self.app = FastAPI()
+        self.app.add_middleware(TracingMiddleware)
+
+        @self.app.get("/items/{item_id}")
+        def read_item(item_id: int):
+            with tracing.tracer.span("password.verify"):
+                pass
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT :id"), {"id": item_id})
+            return {"id": item_id, "request_id": request_id.get()}
+
+        @self.app.get("/error")
+        def error():
+            raise HTTPException(status_code=503)
+
+        self.client = TestClient(self.app)
+        yield
+        tracing.tracer.exporter = exporter
+
+    def spans(self) -> dict[str, Span]:
+        return {span.name: span for span in self.exporter.spans}
+
+    def test_request_spans(self):
+        """Тест 1: Проверить span запроса, дочерние span и имя по шаблону маршрута."""
+        response = self.client.get("/items/7")
+
+        assert response.status_code == 200
+        spans = self.spans()
+        root = spans["GET /items/{item_id}"]
+        assert root.parent_id is None
+        assert root.attributes["http.route"] == "/items/{item_id}"
+        assert root.attributes["http.response.status_code"] == 200
+        assert spans["password.verify"].parent_id == root.span_id
+        query = spans["db.query"]
+        assert query.parent_id == root.span_id and query.trace_id == root.trace_id
+        assert query.attributes["db.statement"] == "SELECT ?"
+        assert all(span.end >= span.start for span in self.exporter.spans)
+
+    def test_traceparent_continues_trace(self):
+        """Тест 2: Проверить продолжение трассировки из заголовка traceparent."""
+        trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+        self.client.get("/items/1", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+
+        root = self.spans()["GET /items/{item_id}"]
+        assert root.trace_id == trace_id
+        assert root.parent_id == parent_id
+
+    def test_request_id(self):
+        """Тест 3: Проверить идентификатор запроса из X-Request-ID и из trace_id."""
+        response = self.client.get("/items/1", headers={"X-Request-ID": "abc-123"})
+        assert response.headers["x-request-id"] == "abc-123"
+        assert response.json()["request_id"] == "abc-123"
+
+        response = self.client.get("/items/2")
+        assert response.headers["x-request-id"] == self.exporter.spans[-1].trace_id
+
+    def test_error_status(self):
+        """Тест 4: Проверить статус ошибки span при ответе 5xx."""
+        self.client.get("/error")
+
+        root = self.spans()["GET /error"]
+        assert root.status == tracing.STATUS_ERROR
+        assert root.attributes["http.response.status_code"] == 503
+
+    def test_disabled_tracer(self):
+        """Тест 5: Проверить, что без экспортёра span не создаются, а X-Request-ID остаётся."""
+        tracing.tracer.exporter = None
+
+        response = self.client.get("/items/1")
+
+        assert response.status_code == 200
+        assert len(response.headers["x-request-id"]) == 32
+        assert self.exporter.spans == []
+
+
+def test_request_id_filter():
+    """Тест 6: Проверить добавление идентификатора запроса в запись журнала доступа."""
+    record = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 1, '%s - "%s %s"', ("client", "GET", "/"), None)
+    token = request_id.set("abc-123")
+    try:
+        RequestIdFilter(append=True).filter(record)
+        RequestIdFilter(append=True).filter(record)
+    finally:
+        request_id.reset(token)
+
+    assert record.getMessage() == 'client - "GET /" request_id=abc-123'
+    assert record.request_id == "abc-123"
+
+
+def test_file_exporter_otlp(tmp_path):
+    """Тест 7: Проверить запись span в файл в формате OTLP/JSON."""
+    path = tmp_path / "traces.jsonl"
+    exporter = FileExporter(str(path))
+    tracer = tracing.Tracer(exporter)
+    with tracer.span("parent", items=3) as parent:
+        with tracer.span("child"):
+            pass
+    exporter.shutdown()
+
+    spans = [
+        span
+        for line in path.read_text().splitlines()
+        for resource in json.loads(line)["resourceSpans"]
+        for scope in resource["scopeSpans"]
+        for span in scope["spans"]
+    ]
+    by_name = {span["name"]: span for span in spans}
+    assert by_name["child"]["parentSpanId"] == parent.span_id
+    assert by_name["child"]["traceId"] == parent.trace_id
+    assert "parentSpanId" not in by_name["parent"]
+    assert by_name["parent"]["attributes"] == [{"key": "items", "value": {"intValue": "3"}}]
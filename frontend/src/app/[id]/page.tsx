@@ -10,7 +10,7 @@ import Typography from "@mui/material/Typography"
 import Box from "@mui/material/Box"
 import IconButton from "@mui/material/IconButton"
 import ArrowBackIcon from "@mui/icons-material/ArrowBack"
-import { itemsAPI, getURL } from "@/lib/api"
+import { itemsAPI, getStockURL } from "@/lib/api"
 import PageHeader from "@/components/common/PageHeader"
 import { Item, Image } from "@/lib/types"
 import { Button, Card, CardMedia, Chip, Divider, Grid } from "@mui/material"
@@ -39,7 +39,7 @@ export default function ItemPage({ params }: ItemFormProps) {
 
       let imageList: Image[] = []
       if (itemRes.cover)
-        imageList = imageList.concat([{id: itemRes.cover.id, name: itemRes.cover.name}])
+        imageList = imageList.concat([itemRes.cover])
       if (itemRes.images.length > 0)
         imageList = imageList.concat(itemRes.images)
 
@@ -58,6 +58,17 @@ export default function ItemPage({ params }: ItemFormProps) {
     fetchData()
   }, [id, enqueueSnackbar])
 
+  // Остаток товара обновляется после покупок других пользователей
+  useEffect(() => {
+    const source = new EventSource(getStockURL(id))
+    source.addEventListener("stock", (event) => {
+      const { quantity } = JSON.parse((event as MessageEvent).data)
+      setItem((prev) => prev && { ...prev, quantity })
+      setIsOutOfStock(quantity === 0)
+    })
+    return () => source.close()
+  }, [id])
+
   const handleBack = () => {
     router.push("/")
   }
@@ -84,7 +95,7 @@ export default function ItemPage({ params }: ItemFormProps) {
                     <CardMedia
                       component="img"
                       height="300"
-                      image={getURL(image.name)}
+                      image={image.url}
                       alt={`${i}`}
                       sx={{ objectFit: "contain" }}/>
                   </Card>
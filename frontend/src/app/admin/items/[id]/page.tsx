@@ -21,7 +21,7 @@ import CardActions from "@mui/material/CardActions"
 import IconButton from "@mui/material/IconButton"
 import DeleteIcon from "@mui/icons-material/Delete"
 import ArrowBackIcon from "@mui/icons-material/ArrowBack"
-import { itemsAPI, categoriesAPI, brandsAPI, coversAPI, imagesAPI, getURL } from "@/lib/api"
+import { itemsAPI, categoriesAPI, brandsAPI, coversAPI, imagesAPI } from "@/lib/api"
 import type { Item, ItemCreateUpdate, Category, Brand } from "@/lib/types"
 import PageHeader from "@/components/common/PageHeader"
 import ImageUploader from "@/components/common/ImageUploader"
@@ -270,7 +270,7 @@ export default function ItemAdminForm({ params }: ItemFormProps) {
                       </Typography>
                       <Grid size={{xs: 6, sm: 4, md: 3 }}>
                         <Card>
-                          <CardMedia component="img" height="256" image={getURL(item.cover.name)} alt="Обложка" sx={{ objectFit: "contain" }} />
+                          <CardMedia component="img" height="256" image={item.cover.url} alt="Обложка" sx={{ objectFit: "contain" }} />
                           <CardActions>
                             <IconButton color="error" onClick={() => handleDeleteImageClick(true)}>
                               <DeleteIcon />
@@ -293,7 +293,7 @@ export default function ItemAdminForm({ params }: ItemFormProps) {
                       item.images.map((img, index) => (
                         <Grid size={{xs: 6, sm: 4, md: 3 }} key={index}>
                           <Card>
-                            <CardMedia component="img" height="256" image={getURL(img.name)} alt={`Изображение ${index + 1}`} sx={{ objectFit: "contain" }} />
+                            <CardMedia component="img" height="256" image={img.url} alt={`Изображение ${index + 1}`} sx={{ objectFit: "contain" }} />
                             <CardActions>
                               <IconButton color="error" onClick={() => handleDeleteImageClick(false, img.id)}>
                                 <DeleteIcon />
@@ -36,26 +36,28 @@ export default function ImageUploader( { title, isCover, itemId, setItem } : Ima
   const handleFileChange = async (event: React.ChangeEvent<HTMLInputElement>) => {
     const files = event.target.files
     if (!files || files.length === 0) return
-    const file = files[0]
+    const selected = isCover ? [files[0]] : Array.from(files)
 
-    if (!validateFile(file)) {
+    if (!selected.every(validateFile)) {
       event.target.value = ""
       return
     }
 
     setLoading(true)
     const formData = new FormData()
-    formData.append("file", file)
    
     try {
       if (isCover) {
+        formData.append("file", selected[0])
         const newItem = await coversAPI.createCover(itemId, formData) 
         enqueueSnackbar("Обложка добавлена", { variant: "success" })
         setItem(newItem)
       }
       else {
-        const newItem = await imagesAPI.createImage(itemId, formData) 
-        enqueueSnackbar("Изображение добавлено", { variant: "success" })
+        // Все выбранные изображения отправляются одним запросом
+        selected.forEach((file) => formData.append("files", file))
+        const newItem = await imagesAPI.createImages(itemId, formData) 
+        enqueueSnackbar(selected.length > 1 ? "Изображения добавлены" : "Изображение добавлено", { variant: "success" })
         setItem(newItem)
       }
     }
@@ -78,6 +80,7 @@ export default function ImageUploader( { title, isCover, itemId, setItem } : Ima
           ref={fileInputRef}
           type="file"
           accept="image/*"
+          multiple={!isCover}
           onChange={handleFileChange}
           style={{ display: "none" }}
         />
@@ -8,7 +8,6 @@ import Typography from "@mui/material/Typography"
 import Box from "@mui/material/Box"
 import Chip from "@mui/material/Chip"
 import type { Item } from "@/lib/types"
-import { getURL } from "@/lib/api"
 import Button from "@mui/material/Button"
 import CardActionArea from "@mui/material/CardActionArea"
 
@@ -41,7 +40,7 @@ export default function ItemCard({ item, setId, setDialogOpen } : ItemCardProps)
           <CardMedia
           component="img"
           height="200"
-          image={getURL(cover ? cover.name : "")}
+          image={cover ? cover.url : ""}
           alt={name}
           sx={{
               objectFit: "contain",
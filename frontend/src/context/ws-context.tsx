@@ -14,6 +14,8 @@ const WebSocketContext = createContext<WebSocketContextType | null>(null)
 export function WebSocketProvider({ children }: { children: ReactNode }) {
   const { enqueueSnackbar } = useSnackbar()
   const wsRef = useRef<WebSocket | null>(null)
+  // Номер последнего полученного события - при переподключении сервер пришлёт пропущенные
+  const lastEventIdRef = useRef<number | null>(null)
   const [isConnected, setIsConnected] = useState(false)
 
   const cleanupWebSocket = useCallback(() => {
@@ -33,7 +35,10 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
   const connect = useCallback(() => {
     cleanupWebSocket()
 
-    const ws = new WebSocket(WS_URL)
+    const url = lastEventIdRef.current === null
+      ? WS_URL
+      : `${WS_URL}?last_event_id=${lastEventIdRef.current}`
+    const ws = new WebSocket(url)
     wsRef.current = ws
 
     ws.onopen = () => {
@@ -43,7 +48,18 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
 
     ws.onmessage = (event) => {
       const data = JSON.parse(event.data)
-      const message = `Пользователь ${data.username} приобрёл ${data.item} в количестве ${data.quantity} шт.`
+      // Проверка соединения сервером: без ответа подключение будет закрыто
+      if (data.type === 'ping') {
+        ws.send('pong')
+        return
+      }
+      if (typeof data.id === 'number') {
+        lastEventIdRef.current = Math.max(lastEventIdRef.current ?? 0, data.id)
+      }
+      // Покупки одного товара за окно агрегации приходят одним сообщением
+      const message = data.purchases > 1
+        ? `${data.item}: ${data.purchases} покупок на ${data.quantity} шт. (покупателей: ${data.buyers}, последние: ${data.last_buyers.join(', ')})`
+        : `Пользователь ${data.username} приобрёл ${data.item} в количестве ${data.quantity} шт.`
       enqueueSnackbar(message, { variant: 'info' })
     }
 
@@ -2,12 +2,10 @@
 const API_URL = "http://localhost:8000"
 // URL для websocket-соединения
 export const WS_URL = 'ws://localhost:8000/ws'
-// URL папки с изображениями
-const IMG_URL = "http://localhost/img/"
 
-// Возвращает URL изображения
-export function getURL(filename: string) {
-  return IMG_URL + filename
+// URL потока остатка товара (Server-Sent Events)
+export function getStockURL(id: number) {
+  return `${API_URL}/items/${id}/stock`
 }
 
 // Общая функция для выполнения запросов
@@ -111,6 +109,12 @@ export const imagesAPI = {
       body: imageData,
     }, true);
   },
+  createImages: async (id: number, imagesData: any) => {
+    return fetchAPI(`/items/images/batch/${id}`, {
+      method: "POST",
+      body: imagesData,
+    }, true);
+  },
   deleteImage: async (id: number) => {
     return fetchAPI(`/items/images/${id}`, {
       method: "DELETE",
@@ -35,11 +35,15 @@ export interface Brand {
 export interface Cover {
   id: number
   name: string
+  // Адрес файла в хранилище изображений
+  url: string
 }
 
 export interface Image {
   id: number
   name: string
+  // Адрес файла в хранилище изображений
+  url: string
 }
 
 export interface PaginationData {